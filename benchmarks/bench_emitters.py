@@ -0,0 +1,75 @@
+"""
+Benchmark of the code emission step of 'pyggest transform'.
+
+Compares the ways a transformed module can be turned into something the interpreter can run:
+  * astor.to_source            (the previous emitter, only measured if astor is installed)
+  * ast.unparse                (source emitted by 'pyggest transform')
+  * ast.unparse + compile      (what the interpreter does with the transformed file)
+  * compile                    (code object emitted by the import hook, 'pyggest run')
+
+Usage:
+    python benchmarks/bench_emitters.py [--repeat N]
+
+pyggester must be importable (pip install . or PYTHONPATH=.).
+"""
+
+import argparse
+import ast
+import copy
+import time
+from typing import Callable, Dict, List
+from bench_transformations import build_module
+from pyggester.observable_transformations import transform_tree
+
+try:
+    import astor
+except ImportError:
+    astor = None
+
+
+def unparse_and_compile(tree: ast.AST):
+    return compile(ast.unparse(tree), "<bench>", "exec")
+
+
+def compile_tree(tree: ast.AST):
+    return compile(ast.fix_missing_locations(tree), "<bench>", "exec")
+
+
+EMITTERS: Dict[str, Callable[[ast.AST], object]] = {
+    "ast.unparse": ast.unparse,
+    "unparse+compile": unparse_and_compile,
+    "compile": compile_tree,
+}
+if astor is not None:
+    EMITTERS = {"astor.to_source": astor.to_source, **EMITTERS}
+
+
+def measure(emit: Callable[[ast.AST], object], tree: ast.AST, repeat: int) -> float:
+    """Best time (in seconds) of `repeat` emissions of copies of the transformed tree."""
+    timings: List[float] = []
+    for _ in range(repeat):
+        tree_ = copy.deepcopy(tree)
+        start = time.perf_counter()
+        emit(tree_)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1].strip())
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'lines':>8}" + "".join(f" {name + ' (ms)':>22}" for name in EMITTERS))
+    for functions in (10, 100, 500, 2000):
+        code = build_module(functions)
+        tree = transform_tree(ast.parse(code), run_observables=True)
+        timings = [measure(emit, tree, args.repeat) for emit in EMITTERS.values()]
+        print(
+            f"{code.count(chr(10)):>8}"
+            + "".join(f" {timing * 1000:>22.2f}" for timing in timings)
+        )
+
+
+if __name__ == "__main__":
+    main()
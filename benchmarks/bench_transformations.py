@@ -0,0 +1,97 @@
+"""
+Benchmark of the AST transformation step of 'pyggest transform'.
+
+Compares the multi-pass pipeline (two add_imports passes, apply_wrappers and
+apply_observable_collector_modifications, nine walks over the module) with the single pass
+ObservableTransformer, on synthetic modules of growing size.
+Parsing and code emission are not part of the measured time.
+
+Usage:
+    python benchmarks/bench_transformations.py [--repeat N]
+"""
+
+import argparse
+import ast
+import time
+from typing import Callable, List
+from pyggester.module_importer import add_imports
+from pyggester.observable_transformations import (
+    apply_observable_collector_modifications,
+    transform_tree,
+)
+from pyggester.wrappers import apply_wrappers, get_wrappers_as_strings
+
+MODULE_HEADER = """
+import numpy as np
+import pandas as pd
+from collections import namedtuple
+
+Point = namedtuple("Point", ["x", "y"])
+"""
+
+FUNCTION_TEMPLATE = """
+def function_{index}(values, extra=None):
+    items = [1, 2, 3, {index}]
+    lookup = {{"key": {index}, "other": values}}
+    unique = {{1, 2, {index}}}
+    pair = ({index}, "{index}")
+    copied = list(values)
+    point = Point({index}, {index})
+    arr = np.array([1, 2, {index}])
+    frame = pd.DataFrame({{"a": [1, 2], "b": [3, 4]}})
+    for value in values:
+        if value in items:
+            items.append(value)
+        lookup[value] = [value, value * 2]
+    return items, lookup, unique, pair, copied, point, arr, frame
+"""
+
+
+def build_module(functions: int) -> str:
+    return MODULE_HEADER + "".join(
+        FUNCTION_TEMPLATE.format(index=index) for index in range(functions)
+    )
+
+
+def multi_pass_transform(tree: ast.AST) -> ast.AST:
+    tree = add_imports(tree, "pyggester.observables", get_wrappers_as_strings())
+    tree = add_imports(tree, "pyggester.observable_collector", ["OBSERVABLE_COLLECTOR"])
+    tree = apply_wrappers(tree)
+    return apply_observable_collector_modifications(tree, run_observables=True)
+
+
+def single_pass_transform(tree: ast.AST) -> ast.AST:
+    return transform_tree(tree, run_observables=True)
+
+
+def measure(transform: Callable[[ast.AST], ast.AST], code: str, repeat: int) -> float:
+    """Best time (in seconds) of `repeat` transformations of freshly parsed trees."""
+    timings: List[float] = []
+    for _ in range(repeat):
+        tree = ast.parse(code)
+        start = time.perf_counter()
+        transform(tree)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1].strip())
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(
+        f"{'lines':>8} {'multi-pass (ms)':>16} {'single pass (ms)':>17} {'speedup':>8}"
+    )
+    for functions in (10, 100, 500, 2000):
+        code = build_module(functions)
+        multi_pass = measure(multi_pass_transform, code, args.repeat)
+        single_pass = measure(single_pass_transform, code, args.repeat)
+        print(
+            f"{code.count(chr(10)):>8} {multi_pass * 1000:>16.2f} "
+            f"{single_pass * 1000:>17.2f} {multi_pass / single_pass:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
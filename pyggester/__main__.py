@@ -0,0 +1,4 @@
+from pyggester.main import main
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+"""
+Statistics of numpy arrays, computed in a single pass and shared by the checks of
+ObservableNumpyArray.
+
+The array is walked once, in chunks of whole lines along its last axis (or pieces of a line, for
+very long lines). Chunks are views of the array, so the only extra memory are the temporaries of a
+single chunk (comparisons, hashes): chunks are sized so that they fit in the memory budget
+(PYGGESTER_ARRAY_MEMORY, 64MB by default), whatever the size of the array.
+The number of distinct values comes from a KMinValues sketch: it is exact up to
+DISTINCT_SKETCH_SIZE distinct values and an estimate above that, instead of sorting the array.
+
+Memory mapped arrays (numpy.memmap, numpy.load(..., mmap_mode=...)) are read from the file chunk
+by chunk, and the pages of each chunk are handed back to the kernel once the chunk is done, so
+checking an array larger than the RAM doesn't page the whole file in.
+"""
+
+import math
+import mmap
+import os
+from typing import Any, Callable, Iterator, List, NamedTuple, Optional, Tuple
+import numpy
+from pyggester.helpers import parse_size
+from pyggester.sketches import KMinValues, hash_array
+
+try:
+    from numpy.lib.array_utils import byte_bounds
+except ImportError:  # numpy < 2
+    from numpy import byte_bounds
+
+__all__: List[str] = [
+    "ArrayStats",
+    "compute_array_stats",
+    "iter_chunks",
+    "get_chunk_size",
+    "is_symmetric",
+]
+
+ARRAY_MEMORY_ENV: str = "PYGGESTER_ARRAY_MEMORY"
+MEMORY_BUDGET: int = parse_size(os.environ.get(ARRAY_MEMORY_ENV, "64MB"))
+DISTINCT_SKETCH_SIZE: int = 1024
+
+
+class ArrayStats(NamedTuple):
+    size: int
+    # None for arrays that are not numeric
+    min: Any
+    max: Any
+    nonzero: int
+    nan: bool
+    # Monotonic along the last axis
+    increasing: bool
+    decreasing: bool
+    constant: bool
+    symmetric: bool
+    # None when the elements can't be hashed
+    distinct: Optional[float]
+    distinct_exact: bool
+
+
+def get_chunk_size(arr: numpy.ndarray, memory_budget: int = MEMORY_BUDGET) -> int:
+    """
+    Number of elements of a chunk whose temporaries fit in the memory budget.
+    Per element: the chunk itself (mapped pages or a contiguous copy), the float copy and the
+    padded words of hash_array, the hashes, their mixing temporary and sorted copy, and a few
+    boolean masks.
+    """
+    itemsize = arr.dtype.itemsize
+    per_element = 2 * itemsize + math.ceil(itemsize / 8) * 8 + 3 * 8 + 4
+    return max(1, memory_budget // per_element)
+
+
+def iter_planes(arr: numpy.ndarray) -> Iterator[numpy.ndarray]:
+    """
+    Yield 2-D views (lines along the last axis) that together hold every element of the array.
+    """
+    if arr.ndim == 2:
+        yield arr
+    elif arr.ndim < 2 or arr.flags.c_contiguous:
+        yield arr.reshape(-1, arr.shape[-1])
+    else:
+        # Reshaping a non contiguous array would copy it
+        for index in numpy.ndindex(*arr.shape[:-2]):
+            yield arr[index]
+
+
+def iter_chunks(
+    arr: numpy.ndarray, chunk_size: int
+) -> Iterator[Tuple[bool, numpy.ndarray]]:
+    """
+    Yield views of at most `chunk_size` elements: 2-D blocks of whole lines (along the last axis)
+    or, when a single line is longer than `chunk_size`, 1-D pieces of a line. The flag tells
+    whether the chunk continues the line of the previous chunk.
+    """
+    for lines in iter_planes(arr):
+        width = lines.shape[1]
+        if width <= chunk_size:
+            rows = chunk_size // max(width, 1)
+            for start in range(0, len(lines), rows):
+                yield False, lines[start : start + rows]
+            continue
+        for line in lines:
+            for start in range(0, width, chunk_size):
+                yield start > 0, line[start : start + chunk_size]
+
+
+def get_page_releaser(
+    arr: numpy.ndarray,
+) -> Optional[Callable[[numpy.ndarray], None]]:
+    """
+    For arrays backed by a shared memory mapped file, return a function that hands the pages
+    of a view back to the kernel (they are read from the file again when accessed).
+    Copy on write mappings (mode 'c') are left alone, their pages might hold the only copy
+    of the changes.
+    """
+    if not hasattr(mmap, "MADV_DONTNEED"):
+        return None
+    root = arr
+    while isinstance(root, numpy.ndarray) and not isinstance(root.base, mmap.mmap):
+        root = root.base
+    if not isinstance(root, numpy.memmap) or root.mode == "c":
+        return None
+    mapping = root.base
+    # numpy.memmap maps the file from the allocation granularity boundary before its offset
+    start = root.ctypes.data - root.offset % mmap.ALLOCATIONGRANULARITY
+
+    def release(view: numpy.ndarray) -> None:
+        low, high = byte_bounds(view)
+        low = (low - start) // mmap.PAGESIZE * mmap.PAGESIZE
+        mapping.madvise(mmap.MADV_DONTNEED, low, high - start - low)
+
+    return release
+
+
+def is_symmetric(
+    arr: numpy.ndarray,
+    chunk_size: int,
+    release: Optional[Callable[[numpy.ndarray], None]] = None,
+) -> bool:
+    """
+    Whether a square matrix equals its transpose, compared tile by tile. Reading square tiles
+    keeps both the memory and the reads of memory mapped files bounded, while comparing whole
+    rows to whole columns would read the entire file for every chunk of rows.
+    """
+    tile = max(1, math.isqrt(chunk_size // 2))
+    for i in range(0, len(arr), tile):
+        for j in range(i, len(arr), tile):
+            block, mirror = (
+                arr[i : i + tile, j : j + tile],
+                arr[j : j + tile, i : i + tile],
+            )
+            if not numpy.array_equal(block, mirror.T):
+                return False
+            if release is not None:
+                release(block)
+                release(mirror)
+    return True
+
+
+def compute_array_stats(
+    arr: numpy.ndarray,
+    chunk_size: Optional[int] = None,
+    sketch_size: int = DISTINCT_SKETCH_SIZE,
+    memory_budget: int = MEMORY_BUDGET,
+) -> Optional[ArrayStats]:
+    """
+    Compute every statistic of the array in one chunked pass (square matrices get a second,
+    tiled pass for the symmetry). Returns None for empty arrays.
+
+    Args:
+        arr (numpy.ndarray): The array, possibly memory mapped.
+        chunk_size (Optional[int]): Number of elements of a chunk, derived from the memory
+            budget by default (see get_chunk_size).
+        sketch_size (int): Size of the sketch that counts the distinct values.
+        memory_budget (int): Bytes the temporaries of a chunk may use.
+    """
+    if arr.size == 0:
+        return None
+    if arr.ndim == 0:
+        arr = arr.reshape(1)
+    if chunk_size is None:
+        chunk_size = get_chunk_size(arr, memory_budget)
+    release = get_page_releaser(arr)
+    numeric = arr.dtype.kind in "biuf"
+    first = arr[(0,) * arr.ndim]
+    minimum = maximum = None
+    nonzero = 0
+    nan = False
+    increasing = decreasing = True
+    constant = True
+    sketch: Optional[KMinValues] = KMinValues(sketch_size)
+    previous = None
+
+    for continued, chunk in iter_chunks(arr, chunk_size):
+        if numeric:
+            low, high = chunk.min(), chunk.max()
+            # numpy.minimum/maximum propagate NaN, just like numpy.min/max of the whole array
+            minimum = low if minimum is None else numpy.minimum(minimum, low)
+            maximum = high if maximum is None else numpy.maximum(maximum, high)
+        elif constant:
+            constant = bool((chunk == first).all())
+        if arr.dtype.kind in "fc" and not nan:
+            nan = bool(numpy.isnan(chunk).any())
+        nonzero += int(numpy.count_nonzero(chunk))
+
+        if increasing or decreasing:
+            try:
+                if continued:
+                    increasing = increasing and bool(chunk[0] >= previous)
+                    decreasing = decreasing and bool(chunk[0] <= previous)
+                previous = chunk[-1] if chunk.ndim == 1 else None
+                increasing = increasing and bool(
+                    (chunk[..., 1:] >= chunk[..., :-1]).all()
+                )
+                decreasing = decreasing and bool(
+                    (chunk[..., 1:] <= chunk[..., :-1]).all()
+                )
+            except TypeError:
+                # Elements without an order
+                increasing = decreasing = False
+
+        if sketch is not None and arr.dtype.kind == "O":
+            try:
+                for item in chunk.reshape(-1).tolist():
+                    sketch.add(item)
+            except TypeError:
+                sketch = None
+        elif sketch is not None:
+            sketch.add_hashes(hash_array(chunk))
+
+        if release is not None:
+            release(chunk)
+
+    if numeric:
+        constant = bool(minimum == maximum)
+    symmetric = (
+        arr.ndim == 2
+        and arr.shape[0] == arr.shape[1]
+        and is_symmetric(arr, chunk_size, release)
+    )
+    return ArrayStats(
+        size=arr.size,
+        min=minimum,
+        max=maximum,
+        nonzero=nonzero,
+        nan=nan,
+        increasing=increasing,
+        decreasing=decreasing,
+        constant=constant,
+        symmetric=symmetric,
+        distinct=None if sketch is None else sketch.estimate(),
+        distinct_exact=sketch is not None and sketch.exact,
+    )
@@ -5,13 +5,15 @@ The structure of this CLI app based on typer:
             Options: ...
         dynamic - subcommand
             Options: ...
+        run - subcommand
+            Options: ...
 """
 
 from functools import lru_cache
 from typing import List
 import typer
 from typing_extensions import Annotated
-from pyggester.command_handlers import PyggestTransform
+from pyggester.command_handlers import PyggestRun, PyggestTransform
 from pyggester.helpers import not_implemented
 
 __all__: List[str] = ["get_app"]
@@ -75,6 +77,29 @@ def static_analysis(
 @app.command(no_args_is_help=True, name="transform")
 def dynamic_transformation(
     path_: Annotated[str, typer.Argument(help="path to file/files")] = ".",
+    jobs_: Annotated[
+        int,
+        typer.Option(
+            "--jobs",
+            "-j",
+            min=0,
+            help="Number of worker processes used to transform directories (0 uses all cpus)",
+        ),
+    ] = 1,
+    cache_: Annotated[
+        bool,
+        typer.Option(
+            "--cache/--no-cache",
+            help="Reuse the transformed code of files that didn't change since the last run",
+        ),
+    ] = True,
+    profile_: Annotated[
+        bool,
+        typer.Option(
+            "--profile",
+            help="Print the time spent reading, parsing, transforming, emitting and writing each file",
+        ),
+    ] = False,
     help_: Annotated[
         bool, typer.Option("--help", help="Get full documentation")
     ] = False,
@@ -82,7 +107,64 @@ def dynamic_transformation(
     """
     Perform dynamic transformation using PyggesterDynamic.
     """
-    command_handler = PyggestTransform(path_=path_, help_=help_)
+    command_handler = PyggestTransform(
+        path_=path_, help_=help_, jobs_=jobs_, cache_=cache_, profile_=profile_
+    )
+    command_handler.process()
+
+
+@app.command(
+    no_args_is_help=True,
+    name="run",
+    context_settings={"allow_extra_args": True, "ignore_unknown_options": True},
+)
+def hook_run(
+    ctx: typer.Context,
+    path_: Annotated[str, typer.Argument(help="path to the main file")] = None,
+    include_: Annotated[
+        List[str],
+        typer.Option(
+            "--include",
+            help="Glob of module names to transform while importing them (repeatable)",
+        ),
+    ] = None,
+    exclude_: Annotated[
+        List[str],
+        typer.Option(
+            "--exclude",
+            help="Glob of module names that should never be transformed (repeatable)",
+        ),
+    ] = None,
+    sample_: Annotated[
+        str,
+        typer.Option(
+            "--sample",
+            help="Only observe a sample of the allocations of each site, e.g. 'every=10', 'fraction=0.1' or 'max=100'",
+        ),
+    ] = None,
+    verify_: Annotated[
+        bool,
+        typer.Option(
+            "--verify",
+            help="Measure the speedup and memory difference of the suggestions on the observed data (slow)",
+        ),
+    ] = False,
+    help_: Annotated[
+        bool, typer.Option("--help", help="Get full documentation")
+    ] = False,
+):
+    """
+    Run a file with the pyggester import hook, without writing transformed copies.
+    """
+    command_handler = PyggestRun(
+        path_=path_,
+        args_=ctx.args,
+        include_=include_ or [],
+        exclude_=exclude_ or [],
+        help_=help_,
+        sample_=sample_,
+        verify_=verify_,
+    )
     command_handler.process()
 
 
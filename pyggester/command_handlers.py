@@ -9,8 +9,9 @@ from enum import Enum, auto
 from pyggester.text_formatters import custom_print
 from pyggester.helpers import get_help_files_dir
 from pyggester.pyggester import PyggesterDynamic
+from pyggester import hook, sampling, verify
 
-__all__: List[str] = ["PyggestTransform"]
+__all__: List[str] = ["PyggestTransform", "PyggestRun"]
 
 README_FILES_DIR: pathlib.Path = get_help_files_dir()
 
@@ -69,12 +70,15 @@ class PyggestTransform(CommandHandler):
         pyggest dynamic
     """
 
-    __slots__: ClassVar[tuple[str]] = "path_", "help_"
+    __slots__: ClassVar[tuple[str]] = "path_", "help_", "jobs_", "cache_", "profile_"
 
-    def __init__(self, path_, help_) -> None:
+    def __init__(self, path_, help_, jobs_=1, cache_=True, profile_=False) -> None:
         self.README = pathlib.Path("dynamic_helper.md")
         self.path_ = path_
         self.help_ = help_
+        self.jobs_ = jobs_
+        self.cache_ = cache_
+        self.profile_ = profile_
 
         super().__init__()
 
@@ -82,10 +86,66 @@ class PyggestTransform(CommandHandler):
         try:
             if self.help_:
                 self.handle_help_()
-            pyggester = PyggesterDynamic(self.path_)
+            pyggester = PyggesterDynamic(
+                self.path_,
+                jobs_=self.jobs_,
+                cache_=self.cache_,
+                profile_=self.profile_,
+            )
             pyggester.run()
 
         except Exception as ex:
             if isinstance(ex, typer.Exit):
                 raise ex
             print(ex)
+
+
+class PyggestRun(CommandHandler):
+    """
+    This class handles the variations of options supported under:
+        pyggest run
+    """
+
+    __slots__: ClassVar[tuple[str]] = (
+        "path_",
+        "args_",
+        "include_",
+        "exclude_",
+        "help_",
+        "sample_",
+        "verify_",
+    )
+
+    def __init__(
+        self, path_, args_, include_, exclude_, help_, sample_=None, verify_=False
+    ) -> None:
+        self.README = pathlib.Path("run_helper.md")
+        self.path_ = path_
+        self.args_ = args_
+        self.include_ = include_
+        self.exclude_ = exclude_
+        self.help_ = help_
+        self.sample_ = sample_
+        self.verify_ = verify_
+
+        super().__init__()
+
+    def process(self) -> None:
+        if self.help_:
+            self.handle_help_()
+        if not self.path_:
+            self.handle_no_valid_combination()
+        if self.sample_:
+            try:
+                sampling.configure(self.sample_)
+            except ValueError as ex:
+                custom_print(str(ex), border_style="red", title="EXIT INFO")
+                raise typer.Exit(code=1)
+        if self.verify_:
+            verify.configure("1")
+        hook.run(
+            self.path_,
+            argv=self.args_,
+            include=self.include_ or ("*",),
+            exclude=self.exclude_,
+        )
@@ -0,0 +1,198 @@
+"""
+Growth history of containers, for the preallocation suggestions.
+
+Lists record their peak length and the append/extend/insert calls that grew them, and numpy arrays
+know whether they were rebuilt from themselves (`arr = np.append(arr, x)`,
+`arr = np.concatenate((arr, chunk))`, ...). When an observable is evaluated, its growth is added
+to the GrowthSummary of its allocation site, which tells how much the final size of the instances
+varies and how much the growth cost:
+
+    lists       the reallocations of a list grown one element at a time (following the growth
+                pattern of CPython) move its elements again and again, and the last one leaves
+                unused capacity behind. A list of a known size is allocated once, by [None] * n.
+    arrays      every rebuild copies the whole array, so building an array of n elements this way
+                copies O(n**2) elements. numpy.empty(n) is allocated once and filled by index.
+
+Preallocation only fits sizes that are known in advance, so lists only get the suggestion when
+at least MIN_PREDICTED_INSTANCES instances of their site grew to final sizes that are predictable
+(they vary by at most PREDICTABLE_SPREAD). Never once a list shrank below its peak length, or got
+elements removed from or inserted at its front (the deque suggestion fits those queues).
+"""
+
+import sys
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+from pyggester.savings import Saving
+
+__all__: List[str] = ["Growth", "GrowthSummary", "get_reallocations"]
+
+# Largest (max - min) / max of the final sizes of a site for which the size counts as predictable
+PREDICTABLE_SPREAD: float = 0.1
+# Grown instances needed to tell that a site's final size is predictable (one always is)
+MIN_PREDICTED_INSTANCES: int = 2
+# Growth calls (per instance, on average) below which reallocations are not worth a suggestion
+MIN_GROWTH_OPERATIONS: int = 100
+# Rebuilds of the arrays of a site below which they are not worth a suggestion
+MIN_REBUILDS: int = 10
+
+_POINTER_SIZE: int = 8 if sys.maxsize > 2**32 else 4
+
+
+class Growth(NamedTuple):
+    # Final and peak number of elements
+    size: int
+    peak: int
+    # Calls that added elements (append, extend, insert), or 1 for a rebuilt array
+    operations: int
+    # Whether the instance is an array rebuilt from the previous one (np.append & co.)
+    rebuilt: bool = False
+    # Whether elements got removed from or inserted at the front of the list
+    queued: bool = False
+
+
+def get_reallocations(size: int) -> Tuple[int, int, int]:
+    """
+    Reallocations of a list grown from empty to `size` elements one append at a time, following
+    the over-allocation of CPython's list_resize: the number of reallocations, the elements they
+    moved (at most, realloc() can sometimes grow in place) and the final capacity.
+    """
+    allocated = reallocations = moved = 0
+    while allocated < size:
+        moved += allocated
+        reallocations += 1
+        new_size = allocated + 1
+        allocated = (new_size + (new_size >> 3) + 6) & ~3
+    return reallocations, moved, allocated
+
+
+class GrowthSummary:
+    """
+    Aggregated growth of the instances of a single allocation site. Only counters are kept,
+    like in SiteSummary.
+    """
+
+    __slots__: Tuple[str] = (
+        "grown",
+        "shrunk",
+        "queued",
+        "operations",
+        "min_size",
+        "max_size",
+        "total_size",
+        "moved",
+        "slack",
+        "rebuilds",
+        "copied",
+        "max_rebuilt",
+    )
+
+    def __init__(self) -> None:
+        # Lists that grew, the ones among them that shrank below their peak length and the
+        # ones used as queues
+        self.grown: int = 0
+        self.shrunk: int = 0
+        self.queued: int = 0
+        # Of the other lists: growth calls, final sizes, elements moved by
+        # reallocations and bytes of unused capacity
+        self.operations: int = 0
+        self.min_size: Optional[int] = None
+        self.max_size: Optional[int] = None
+        self.total_size: int = 0
+        self.moved: int = 0
+        self.slack: int = 0
+        # Rebuilt arrays, the elements their rebuilds copied and the largest of them
+        self.rebuilds: int = 0
+        self.copied: int = 0
+        self.max_rebuilt: int = 0
+
+    def add(self, growth: Growth) -> None:
+        if growth.rebuilt:
+            self.rebuilds += 1
+            self.copied += growth.size
+            self.max_rebuilt = max(self.max_rebuilt, growth.size)
+            return
+        self.grown += 1
+        if growth.peak > growth.size:
+            self.shrunk += 1
+            return
+        if growth.queued:
+            self.queued += 1
+            return
+        size = growth.size
+        self.operations += growth.operations
+        self.min_size = size if self.min_size is None else min(self.min_size, size)
+        self.max_size = size if self.max_size is None else max(self.max_size, size)
+        self.total_size += size
+        _, moved, allocated = get_reallocations(size)
+        self.moved += moved
+        self.slack += (allocated - size) * _POINTER_SIZE
+
+    @property
+    def spread(self) -> float:
+        """
+        How much the final sizes of the lists vary: (max - min) / max.
+        """
+        if not self.max_size:
+            return 0.0
+        return (self.max_size - self.min_size) / self.max_size
+
+    def check_list(self) -> Optional[Tuple[str, int, Saving]]:
+        """
+        The preallocation suggestion of the lists of the site, with the number of instances it
+        applies to and its saving: the unused capacity and the moved elements.
+        """
+        grown = self.grown - self.shrunk - self.queued
+        if (
+            grown < MIN_PREDICTED_INSTANCES
+            or self.shrunk
+            or self.queued
+            or self.operations < grown * MIN_GROWTH_OPERATIONS
+            or self.spread > PREDICTABLE_SPREAD
+        ):
+            return None
+        sizes = (
+            f"{self.max_size} elements"
+            if self.min_size == self.max_size
+            else f"{self.min_size}-{self.max_size} elements (sizes vary by {self.spread:.0%})"
+        )
+        message = (
+            f"The list grew to {sizes} through ~{self.operations / grown:.0f} append/extend/insert calls per instance. "
+            "The final size is predictable: consider preallocating the list with [None] * n and assigning the elements by index"
+        )
+        return message, grown, Saving(nbytes=self.slack, operations=self.moved)
+
+    def check_array(self) -> Optional[Tuple[str, int, Saving]]:
+        """
+        The preallocation suggestion of arrays rebuilt from themselves: filling an array of the
+        final size writes every element once, instead of copying all of them on every rebuild.
+        """
+        if self.rebuilds < MIN_REBUILDS:
+            return None
+        message = (
+            f"The array was rebuilt {self.rebuilds} times with np.append/np.concatenate, copying {self.copied} elements to reach {self.max_rebuilt} elements. "
+            "Consider preallocating it with np.empty(n) and filling it by index, or collecting the parts in a list and concatenating them once"
+        )
+        return (
+            message,
+            self.rebuilds,
+            Saving(operations=max(0, self.copied - self.max_rebuilt)),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "grown": self.grown,
+            "shrunk": self.shrunk,
+            "queued": self.queued,
+            "operations": self.operations,
+            "sizes": (
+                None
+                if self.min_size is None
+                else {
+                    "min": self.min_size,
+                    "mean": self.total_size / (self.grown - self.shrunk - self.queued),
+                    "max": self.max_size,
+                }
+            ),
+            "spread": self.spread,
+            "rebuilds": self.rebuilds,
+            "copied": self.copied,
+        }
@@ -1,6 +1,10 @@
 import pathlib
 import os
+import re
 from functools import lru_cache
+from importlib import metadata
+
+SIZE_UNITS = {"": 1, "B": 1, "KB": 1 << 10, "MB": 1 << 20, "GB": 1 << 30, "TB": 1 << 40}
 
 
 @lru_cache
@@ -24,6 +28,43 @@ def get_help_files_dir() -> pathlib.Path:
     return help_files_dir
 
 
+@lru_cache
+def get_pyggester_version() -> str:
+    """
+    Get the version of the installed pyggester package.
+
+    When pyggester is used straight from a source checkout (not installed), the version is
+    read from the VERSION file at the root of the repository.
+
+    Returns:
+        str: The pyggester version, or "unknown" if it can't be determined.
+    """
+    try:
+        return metadata.version("pyggester")
+    except metadata.PackageNotFoundError:
+        version_file = pathlib.Path(__file__).parent.parent / "VERSION"
+        if version_file.exists():
+            return version_file.read_text(encoding="UTF-8").strip()
+        return "unknown"
+
+
+def parse_size(spec: str) -> int:
+    """
+    Parse a memory size, like '512MB', '1.5GB' or '4096' (bytes). Units are powers of 1024.
+
+    Raises:
+        ValueError: If the size can't be parsed.
+    """
+    match = re.fullmatch(r"\s*(\d+(?:\.\d*)?)\s*([KMGT]?B?)\s*", spec, re.IGNORECASE)
+    if match is None:
+        raise ValueError(f"Invalid size '{spec}', use for example 512MB or 2GB.")
+    number, unit = match.groups()
+    unit = unit.upper()
+    if unit and not unit.endswith("B"):
+        unit += "B"
+    return int(float(number) * SIZE_UNITS[unit])
+
+
 class PathMissingSourceCodeConversionError(Exception):
     """
     Exception Class to be thrown when path misses for source code conversion to str
@@ -0,0 +1,240 @@
+"""
+Import hook mode of pyggester.
+
+Instead of materializing a '<dir>_transformed' copy of a project, a meta path finder is installed
+that transforms the matching modules in memory, while they get imported. The transformed modules
+are compiled straight to code objects and cached in their own bytecode files
+(__pycache__/<module>.<tag>.opt-pyggester.pyc), next to the regular ones, so unchanged modules
+are loaded from the cache on the next start.
+
+python -m pyggester run app.py
+"""
+
+import ast
+import fnmatch
+import hashlib
+import importlib.abc
+import importlib.machinery
+import importlib.util
+import marshal
+import os
+import pathlib
+import site
+import sys
+import tempfile
+import types
+from typing import List, Optional, Sequence, Tuple
+from pyggester.observable_transformations import compile_observable_transformations
+from pyggester.transform_cache import get_cache_salt
+
+__all__: List[str] = [
+    "ObservableFinder",
+    "ObservableLoader",
+    "install",
+    "uninstall",
+    "run",
+]
+
+BYTECODE_OPTIMIZATION_TAG: str = "pyggester"
+EXCLUDED_MODULES: Tuple[str] = ("pyggester", "pyggester.*")
+
+
+def get_environment_dirs() -> List[pathlib.Path]:
+    """
+    Directories of the Python installation and of the installed packages (the prefixes of the
+    interpreter and of its virtual environment, and the site-packages directories). A project
+    local virtual environment lives under the script's directory, but its packages are not part
+    of the project.
+    """
+    dirs = [sys.prefix, sys.base_prefix, sys.exec_prefix, sys.base_exec_prefix]
+    try:
+        dirs.extend(site.getsitepackages())
+        dirs.append(site.getusersitepackages())
+    except AttributeError:
+        # site of some virtualenv versions doesn't define them
+        pass
+    return list(dict.fromkeys(pathlib.Path(path).absolute() for path in dirs))
+
+
+def get_bytecode_cache_path(source_path: str) -> str:
+    """
+    Get the path of the pyggester bytecode cache of a module.
+    It lives in the regular __pycache__ directory, but with its own optimization tag, so it never
+    gets mixed with the bytecode of the untransformed module.
+    """
+    return importlib.util.cache_from_source(
+        source_path, optimization=BYTECODE_OPTIMIZATION_TAG
+    )
+
+
+class ObservableLoader(importlib.machinery.SourceFileLoader):
+    """
+    Source loader that applies the pyggester transformations to a module before executing it.
+
+    The cached bytecode is validated with a hash of the source code, the pyggester version, the set of
+    active wrappers, the source code of the transformations (see transform_cache.get_cache_salt)
+    and the interpreter's bytecode magic number, instead of the source mtime.
+    """
+
+    def __init__(self, fullname: str, path: str, run_observables: bool = False) -> None:
+        super().__init__(fullname, path)
+        self.run_observables = run_observables
+
+    def get_cache_key(self, source_bytes: bytes) -> bytes:
+        digest = hashlib.sha256(get_cache_salt())
+        digest.update(importlib.util.MAGIC_NUMBER)
+        digest.update(f"{sys.flags.optimize}|{self.run_observables}".encode("UTF-8"))
+        digest.update(source_bytes)
+        return digest.digest()
+
+    def get_code(self, fullname: str) -> types.CodeType:
+        source_path = self.get_filename(fullname)
+        source_bytes = self.get_data(source_path)
+        cache_path = get_bytecode_cache_path(source_path)
+        header = importlib.util.MAGIC_NUMBER + self.get_cache_key(source_bytes)
+
+        try:
+            with open(cache_path, "rb") as f_stream:
+                data = f_stream.read()
+            if data[: len(header)] == header:
+                return marshal.loads(data[len(header) :])
+        except (OSError, EOFError, ValueError, TypeError):
+            pass
+
+        code = compile_observable_transformations(
+            ast.parse(source_bytes, filename=source_path),
+            source_path,
+            run_observables=self.run_observables,
+        )
+        if not sys.dont_write_bytecode:
+            self._write_bytecode_cache(cache_path, header + marshal.dumps(code))
+        return code
+
+    @staticmethod
+    def _write_bytecode_cache(cache_path: str, data: bytes) -> None:
+        """
+        Write the cached bytecode atomically. Failing to write the cache is never an error,
+        the module just gets transformed again on the next start.
+        """
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(
+                dir=os.path.dirname(cache_path), suffix=".tmp"
+            )
+            with os.fdopen(fd, "wb") as f_stream:
+                f_stream.write(data)
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            pass
+
+
+class ObservableFinder(importlib.abc.MetaPathFinder):
+    """
+    Meta path finder that hands the modules matching the include/exclude globs over to ObservableLoader.
+
+    Args:
+        root (Optional[pathlib.Path]): Only modules whose source lives under this directory get transformed.
+        include (Sequence[str]): Globs of module names that get transformed (every module by default).
+        exclude (Sequence[str]): Globs of module names that never get transformed. pyggester itself is
+            always excluded.
+        excluded_dirs (Optional[Sequence[pathlib.Path]]): Modules whose source lives under these
+            directories never get transformed, the installation and site-packages directories by
+            default (see get_environment_dirs). Directories that contain the root are ignored.
+    """
+
+    __slots__: Tuple[str] = ("root", "include", "exclude", "excluded_dirs")
+
+    def __init__(
+        self,
+        root: Optional[pathlib.Path] = None,
+        include: Sequence[str] = ("*",),
+        exclude: Sequence[str] = (),
+        excluded_dirs: Optional[Sequence[pathlib.Path]] = None,
+    ) -> None:
+        self.root = pathlib.Path(root).absolute() if root is not None else None
+        self.include = tuple(include) or ("*",)
+        self.exclude = tuple(exclude) + EXCLUDED_MODULES
+        if excluded_dirs is None:
+            excluded_dirs = get_environment_dirs()
+        self.excluded_dirs = tuple(
+            path
+            for path in map(pathlib.Path, excluded_dirs)
+            if self.root is None or not (path == self.root or path in self.root.parents)
+        )
+
+    def matches(self, fullname: str) -> bool:
+        return any(
+            fnmatch.fnmatchcase(fullname, pattern) for pattern in self.include
+        ) and not any(
+            fnmatch.fnmatchcase(fullname, pattern) for pattern in self.exclude
+        )
+
+    def find_spec(self, fullname, path, target=None):
+        if not self.matches(fullname):
+            return None
+        spec = importlib.machinery.PathFinder.find_spec(fullname, path)
+        if (
+            spec is None
+            or not isinstance(spec.loader, importlib.machinery.SourceFileLoader)
+            or not spec.origin
+        ):
+            return None
+        parents = pathlib.Path(spec.origin).parents
+        if self.root is not None and self.root not in parents:
+            return None
+        if any(path in parents for path in self.excluded_dirs):
+            return None
+
+        spec.loader = ObservableLoader(fullname, spec.origin)
+        spec.cached = get_bytecode_cache_path(spec.origin)
+        return spec
+
+
+def install(
+    root: Optional[pathlib.Path] = None,
+    include: Sequence[str] = ("*",),
+    exclude: Sequence[str] = (),
+) -> ObservableFinder:
+    """
+    Install the pyggester import hook. Every module imported from now on that matches
+    the given root/globs, gets transformed in memory.
+    """
+    finder = ObservableFinder(root=root, include=include, exclude=exclude)
+    sys.meta_path.insert(0, finder)
+    return finder
+
+
+def uninstall(finder: ObservableFinder) -> None:
+    if finder in sys.meta_path:
+        sys.meta_path.remove(finder)
+
+
+def run(
+    script_path: str,
+    argv: Sequence[str] = (),
+    include: Sequence[str] = ("*",),
+    exclude: Sequence[str] = (),
+) -> None:
+    """
+    Run a script as __main__ with the import hook installed.
+
+    The script itself is transformed so that it runs the observables at its end, every module
+    it imports from its own directory (and its subdirectories) is transformed to collect its
+    observables. The include/exclude globs only narrow these modules down, modules outside of
+    the script's directory are never transformed.
+    """
+    script_path = pathlib.Path(script_path).absolute()
+    if not script_path.is_file():
+        raise FileNotFoundError(f"The path '{script_path}' does not exist.")
+
+    install(root=script_path.parent, include=include, exclude=exclude)
+    sys.argv = [str(script_path), *argv]
+    sys.path.insert(0, str(script_path.parent))
+
+    loader = ObservableLoader("__main__", str(script_path), run_observables=True)
+    main_module = types.ModuleType("__main__")
+    main_module.__file__ = str(script_path)
+    main_module.__loader__ = loader
+    main_module.__builtins__ = __builtins__
+    sys.modules["__main__"] = main_module
+    exec(loader.get_code("__main__"), main_module.__dict__)
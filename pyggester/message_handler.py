@@ -1,9 +1,10 @@
 """
-    Message Handler by default should stream messages into the standard console, but it would be 
-    better if we add the capability of streaming the messages/suggestions into files with different formats
+Message Handler collects the suggestions of a single observable and emits them to the report
+sinks (see pyggester.sinks): the standard console by default, plain text or JSON lines files
 """
+
 from typing import List, Tuple
-from pyggester.text_formatters import custom_print
+from pyggester.sinks import REPORT_WRITER, Report
 
 
 class MessageHandler:
@@ -20,4 +21,14 @@ class MessageHandler:
             messages__.append(f"{self.line_nr} | Suggestions({self.file_path}):")
             for message in self.messages:
                 messages__.append(f"    [*] {message}")
-            custom_print("\n".join(messages__), border_style="green")
+            REPORT_WRITER.emit(
+                Report(
+                    "\n".join(messages__),
+                    {
+                        "type": "observable",
+                        "file_path": self.file_path,
+                        "line_nr": self.line_nr,
+                        "messages": list(self.messages),
+                    },
+                )
+            )
@@ -1,5 +1,5 @@
 import ast
-from typing import Any, Tuple, Set
+from typing import Any, Dict, Iterable, Tuple, Set
 
 
 class ImportsVisitor(ast.NodeVisitor):
@@ -95,7 +95,9 @@ class ImportModuleTransformer(ast.NodeTransformer):
             if self.names:
                 import_stmt = ast.ImportFrom(
                     module=self.module_name,
-                    names=[ast.alias(name=name, asname=None) for name in self.names],
+                    names=[
+                        ast.alias(name=name, asname=None) for name in sorted(self.names)
+                    ],
                     level=0,
                 )
             if import_stmt:
@@ -104,7 +106,9 @@ class ImportModuleTransformer(ast.NodeTransformer):
             if self.names:
                 import_stmt = ast.ImportFrom(
                     module=self.module_name,
-                    names=[ast.alias(name=name, asname=None) for name in self.names],
+                    names=[
+                        ast.alias(name=name, asname=None) for name in sorted(self.names)
+                    ],
                     level=0,
                 )
             if import_stmt:
@@ -122,3 +126,48 @@ def add_imports(tree: str, module_, wrappers) -> ast.AST:
     tree = transformer.visit(tree)
 
     return tree
+
+
+def _is_future_import(node: ast.AST) -> bool:
+    return isinstance(node, ast.ImportFrom) and node.module == "__future__"
+
+
+def prepend_imports(tree: ast.Module, imports: Dict[str, Iterable[str]]) -> ast.Module:
+    """
+    Adds a 'from module import names' statement for each module in `imports` at the top of the module,
+    replacing any top-level import of the same modules.
+
+    Unlike add_imports, it only looks at the top-level statements of the module, so it doesn't
+    need an extra walk over the whole tree. The statements are inserted in the order of `imports`.
+    'from __future__' imports must stay the first statements of a module, so in that case the new
+    imports are inserted right after them.
+    """
+    body = []
+    for node in tree.body:
+        if isinstance(node, ast.ImportFrom) and node.module in imports:
+            continue
+        if isinstance(node, ast.Import):
+            node.names = [name_ for name_ in node.names if name_.name not in imports]
+            if not node.names:
+                continue
+        body.append(node)
+
+    index = 0
+    if any(_is_future_import(node) for node in body[:2]):
+        while index < len(body) and (
+            _is_future_import(body[index])
+            or (index == 0 and isinstance(body[index], ast.Expr))
+        ):
+            index += 1
+
+    import_stmts = [
+        ast.ImportFrom(
+            module=module_name,
+            names=[ast.alias(name=name, asname=None) for name in sorted(names)],
+            level=0,
+        )
+        for module_name, names in imports.items()
+        if names
+    ]
+    tree.body = body[:index] + import_stmts + body[index:]
+    return tree
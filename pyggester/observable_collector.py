@@ -1 +1,626 @@
-OBSERVABLE_COLLECTOR = []
+"""
+The collector of every observable created by transformed code.
+
+The collector only keeps weak references, so collecting an observable never extends its lifetime.
+When an observable is about to be garbage collected, it gets evaluated (its checks run) and only
+the suggestions are kept, in a per allocation site summary (only collected observables have a
+__del__, see Observable.collect). Observables that are still alive when
+the main module finishes are evaluated by OBSERVABLE_COLLECTOR.run(), which then reports one entry
+per allocation site, through the report sinks (see pyggester.sinks).
+Memory used by pyggester is therefore bounded by the number of allocation sites, not the number of
+collected observables.
+
+The observables that are still alive at the end can be evaluated concurrently, configured with the
+PYGGESTER_REPORT_WORKERS environment variable:
+
+    threads=N       evaluate observables in N threads (numpy and pandas release the GIL)
+    processes=N     evaluate list/set/tuple/dict observables in N worker processes, which get a
+                    snapshot of each container (see Observable.snapshot)
+
+Results are merged in the order the observables were collected, so reports don't depend on the
+number of workers.
+
+The report can be given a time and memory budget (see pyggester.report_budget). Observables are
+then evaluated by decreasing estimated impact, and the ones left when the budget runs out are
+listed as skipped.
+
+Suggestions carry their estimated saving (see pyggester.savings), summed over the instances of
+each site. PYGGESTER_REPORT_SORT=memory (or time) sorts the report by the bytes (or operations)
+saved, instead of by allocation site.
+
+In verification mode (see pyggester.verify) suggestions also carry the speedup and memory
+difference measured on the data of the largest verified instance.
+
+Some suggestions only come from every instance of a site together (SiteSummary.SITE_CHECKS):
+preallocating lists whose final size is predictable, and arrays rebuilt with np.append in a loop
+(see pyggester.growth), and record types for dicts that all have the same keys (see
+pyggester.schemas).
+"""
+
+import math
+import os
+import random
+import statistics
+import threading
+import weakref
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import (
+    Any,
+    Callable,
+    ClassVar,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+from pyggester.growth import Growth, GrowthSummary
+from pyggester.report_budget import (
+    REPORT_BUDGET_ENV,
+    BudgetTracker,
+    ReportBudget,
+    parse_budget,
+)
+from pyggester.sampling import SAMPLER, parse_options, wilson_interval
+from pyggester.savings import Saving
+from pyggester.schemas import Schema, SchemaSummary
+from pyggester import sites
+from pyggester.sites import get_site
+from pyggester.sinks import REPORT_WRITER, Report
+from pyggester.verify import VERIFIER, Verification
+
+__all__: List[str] = ["ObservableCollector", "SiteSummary", "OBSERVABLE_COLLECTOR"]
+
+REPORT_WORKERS_ENV: str = "PYGGESTER_REPORT_WORKERS"
+REPORT_SORT_ENV: str = "PYGGESTER_REPORT_SORT"
+# Orders of the report: by site, or by decreasing saving (Saving field)
+REPORT_SORTS: Dict[str, Optional[str]] = {
+    "site": None,
+    "memory": "nbytes",
+    "time": "operations",
+}
+
+WORKER_OPTIONS: Dict[str, Tuple[str, Callable, Callable]] = {
+    "threads": ("threads", int, lambda value: value >= 1),
+    "processes": ("processes", int, lambda value: value >= 0),
+}
+
+
+class Measurement(NamedTuple):
+    """
+    Results of evaluating an observable.
+    """
+
+    # (check, suggestion) pairs
+    results: List[Tuple[str, str]]
+    size: Optional[int]
+    # Estimated saving of each check
+    savings: Dict[str, Saving]
+    # Verification of each check, in verification mode
+    verifications: Dict[str, Verification]
+    growth: Optional[Growth] = None
+    schema: Optional[Schema] = None
+
+
+class SiteSummary:
+    """
+    Aggregated results of every evaluated observable of a single allocation site.
+
+    Only counters are kept: the number of instances, how many instances triggered each check
+    (with the first suggestion of that check and the sum of its savings), the size of the
+    instances, their growth (see pyggester.growth) and their key schemas (see
+    pyggester.schemas). The median size
+    comes from a fixed size reservoir sample, so a summary never grows with the number of instances.
+    """
+
+    __slots__: Tuple[str] = (
+        "site_id",
+        "instances",
+        "checks",
+        "messages",
+        "savings",
+        "verifications",
+        "min_size",
+        "max_size",
+        "sized_instances",
+        "size_samples",
+        "random",
+        "growth",
+        "schemas",
+    )
+
+    SIZE_SAMPLES: ClassVar[int] = 1024
+    # Names of the checks that look at every instance of the site together, run by analyze()
+    SITE_CHECKS: ClassVar[Tuple[str]] = (
+        "check_preallocated_list",
+        "check_preallocated_array",
+        "check_record_type",
+    )
+
+    def __init__(self, site_id: int) -> None:
+        self.site_id = site_id
+        self.instances: int = 0
+        self.checks: Dict[str, int] = {}
+        self.messages: Dict[str, str] = {}
+        self.savings: Dict[str, Saving] = {}
+        self.verifications: Dict[str, Verification] = {}
+        self.min_size: Optional[int] = None
+        self.max_size: Optional[int] = None
+        self.sized_instances: int = 0
+        self.size_samples: List[int] = []
+        self.random = random.Random(site_id)
+        self.growth: Optional[GrowthSummary] = None
+        self.schemas: Optional[SchemaSummary] = None
+
+    def add(
+        self,
+        results: List[Tuple[str, str]],
+        size: Optional[int] = None,
+        savings: Optional[Dict[str, Saving]] = None,
+        verifications: Optional[Dict[str, Verification]] = None,
+        growth: Optional[Growth] = None,
+        schema: Optional[Schema] = None,
+    ) -> None:
+        self.instances += 1
+        for check in dict.fromkeys(check for check, _ in results):
+            self.checks[check] = self.checks.get(check, 0) + 1
+        for check, message in results:
+            self.messages.setdefault(check, message)
+        for check, saving in (savings or {}).items():
+            self.savings[check] = self.savings.get(check, Saving()).merge(saving)
+        for check, verification in (verifications or {}).items():
+            # The largest instance is the most representative of the cost of the site
+            kept = self.verifications.get(check)
+            if kept is None or verification.elements > kept.elements:
+                self.verifications[check] = verification
+        if size is not None:
+            self.add_size(size)
+        if growth is not None:
+            if self.growth is None:
+                self.growth = GrowthSummary()
+            self.growth.add(growth)
+        if schema is not None:
+            if self.schemas is None:
+                self.schemas = SchemaSummary()
+            self.schemas.add(schema)
+
+    def add_size(self, size: int) -> None:
+        self.min_size = size if self.min_size is None else min(self.min_size, size)
+        self.max_size = size if self.max_size is None else max(self.max_size, size)
+        self.sized_instances += 1
+        if len(self.size_samples) < self.SIZE_SAMPLES:
+            self.size_samples.append(size)
+        else:
+            # Reservoir sampling (algorithm R) over the sized instances seen so far
+            index = self.random.randrange(self.sized_instances)
+            if index < self.SIZE_SAMPLES:
+                self.size_samples[index] = size
+
+    @property
+    def median_size(self) -> Optional[float]:
+        return statistics.median(self.size_samples) if self.size_samples else None
+
+    def analyze(self) -> None:
+        """
+        Run the site checks. Each one returns its suggestion, the number of instances it applies
+        to and its saving over all of them, or None.
+        """
+        for check in self.SITE_CHECKS:
+            result = getattr(self, check)()
+            if result is None:
+                continue
+            message, triggered, saving = result
+            self.messages[check] = message
+            self.checks[check] = triggered
+            self.savings[check] = saving
+
+    def check_preallocated_list(self) -> Optional[Tuple[str, int, Saving]]:
+        return None if self.growth is None else self.growth.check_list()
+
+    def check_preallocated_array(self) -> Optional[Tuple[str, int, Saving]]:
+        return None if self.growth is None else self.growth.check_array()
+
+    def check_record_type(self) -> Optional[Tuple[str, int, Saving]]:
+        if self.schemas is None:
+            return None
+        return self.schemas.check_records(self.instances)
+
+    def get_saving(self, check: str, allocations: Optional[int] = None) -> Saving:
+        """
+        Estimated saving of a check over every instance (every allocation, when sampled).
+        """
+        saving = self.savings.get(check, Saving())
+        if allocations is not None and self.instances:
+            saving = saving.scale(allocations / self.instances)
+        return saving
+
+    def get_best_saving(self, sort: str, allocations: Optional[int] = None) -> float:
+        """
+        Largest saving field `sort` of the suggestions, which are alternatives to each other
+        (an array.array or a set instead of the same list), so their savings don't add up.
+        """
+        return max(
+            (
+                getattr(self.get_saving(check, allocations), sort)
+                for check in self.messages
+            ),
+            default=0,
+        )
+
+    def get_checks(
+        self, allocations: Optional[int] = None, sort: Optional[str] = None
+    ) -> List[str]:
+        """
+        The checks with a suggestion, in the order they ran or by decreasing saving.
+        """
+        checks = list(self.messages)
+        if sort is not None:
+            checks.sort(
+                key=lambda check: -getattr(self.get_saving(check, allocations), sort)
+            )
+        return checks
+
+    def format(
+        self, allocations: Optional[int] = None, sort: Optional[str] = None
+    ) -> str:
+        """
+        Args:
+            allocations (Optional[int]): Number of allocations of the site, when only a sample of
+                them got observed. The counts of the sample are then extrapolated to every
+                allocation, with a 95% confidence interval.
+            sort (Optional[str]): Saving field ('nbytes' or 'operations') to sort the
+                suggestions by, in decreasing order.
+        """
+        site = get_site(self.site_id)
+        header = f"{site.line_nr} | Suggestions({site.file_path}):"
+        if allocations is None:
+            details = [f"    {self.instances} instance(s) in {site.function}"]
+        else:
+            details = [
+                f"    {self.instances} of {allocations} instance(s) sampled in {site.function}"
+            ]
+        if self.min_size is not None:
+            details[0] += (
+                f", size min/median/max: "
+                f"{self.min_size}/{self.median_size:g}/{self.max_size}"
+            )
+        for check in self.get_checks(allocations, sort):
+            message, triggered = self.messages[check], self.checks[check]
+            if allocations is None:
+                details.append(
+                    f"    [*] {message} ({triggered}/{self.instances} instances)"
+                )
+            else:
+                low, high = wilson_interval(triggered, self.instances)
+                details.append(
+                    f"    [*] {message} ({triggered}/{self.instances} sampled instances, "
+                    f"~{round(triggered / self.instances * allocations)} of {allocations} "
+                    f"estimated, 95% CI {math.floor(low * allocations)}-{math.ceil(high * allocations)})"
+                )
+            if check in self.savings:
+                details.append(
+                    f"        estimated saving: {self.get_saving(check, allocations)}"
+                )
+            if check in self.verifications:
+                details.append(f"        measured: {self.verifications[check]}")
+        return "\n".join([header, *details])
+
+    def to_dict(
+        self, allocations: Optional[int] = None, sort: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        The summary as written by the JSON lines sink.
+        """
+        site = get_site(self.site_id)
+        return {
+            "type": "site",
+            "file_path": site.file_path,
+            "line_nr": site.line_nr,
+            "function": site.function,
+            "instances": self.instances,
+            "allocations": allocations,
+            "sizes": (
+                None
+                if self.min_size is None
+                else {
+                    "min": self.min_size,
+                    "median": self.median_size,
+                    "max": self.max_size,
+                }
+            ),
+            "growth": None if self.growth is None else self.growth.to_dict(),
+            "schemas": None if self.schemas is None else self.schemas.to_dict(),
+            "suggestions": [
+                {
+                    "check": check,
+                    "message": self.messages[check],
+                    "instances": self.checks[check],
+                    "saving": (
+                        self.get_saving(check, allocations)._asdict()
+                        if check in self.savings
+                        else None
+                    ),
+                    "verification": (
+                        self.verifications[check]._asdict()
+                        if check in self.verifications
+                        else None
+                    ),
+                }
+                for check in self.get_checks(allocations, sort)
+            ],
+        }
+
+    def print_messages(
+        self, allocations: Optional[int] = None, sort: Optional[str] = None
+    ) -> None:
+        if self.messages:
+            REPORT_WRITER.emit(
+                Report(self.format(allocations, sort), self.to_dict(allocations, sort))
+            )
+
+
+def init_worker(registered_sites: List[sites.Site]) -> None:
+    """
+    Initializer of the worker processes: messages of the observables need their sites.
+    """
+    sites.SITES[:] = registered_sites
+
+
+def evaluate_snapshot(snapshot: Tuple[type, Any, Dict[str, Any]]) -> Measurement:
+    """
+    Evaluate the snapshot of an observable, in a worker process.
+    """
+    cls, data, state = snapshot
+    return ObservableCollector.measure(cls.from_snapshot(data, state))
+
+
+def get_priority(observable: Any) -> Tuple[float, int]:
+    """
+    Sort key of an observable when the report has a budget: the highest estimated impact
+    (size in bytes times number of accesses) first, the cheapest checks first among equals.
+    """
+    impact = observable.get_nbytes() * observable.get_access_count()
+    return -impact, observable.get_cost()
+
+
+class ObservableCollector:
+    """
+    Weakly referenced collection of observables, see the module docstring.
+
+    It is still iterable (over the observables that are alive), like the plain list it replaces.
+    """
+
+    __slots__: Tuple[str] = (
+        "observables",
+        "summaries",
+        "lock",
+        "threads",
+        "processes",
+        "budget",
+        "sort",
+    )
+
+    def __init__(
+        self,
+        threads: int = 1,
+        processes: int = 0,
+        budget: ReportBudget = ReportBudget(),
+        sort: str = "site",
+    ) -> None:
+        self.observables: Dict[int, weakref.ref] = {}
+        self.summaries: Dict[int, SiteSummary] = {}
+        # Finalizers might run while the collector is being used by the same thread
+        self.lock = threading.RLock()
+        self.threads = threads
+        self.processes = processes
+        self.budget = budget
+        self.sort = sort
+
+    def configure(self, spec: str) -> None:
+        """
+        Set the workers of the report from a spec like 'threads=8,processes=4'.
+        """
+        options = parse_options(spec, WORKER_OPTIONS)
+        self.threads = options.get("threads", 1)
+        self.processes = options.get("processes", 0)
+
+    def append(self, observable: Any) -> None:
+        if not hasattr(observable, "evaluate"):
+            # ObservableNamedTuple(...) and co. might return a plain object
+            return
+        with self.lock:
+            self.observables[id(observable)] = weakref.ref(observable)
+        observable.collect()
+
+    def __iter__(self) -> Iterator[Any]:
+        with self.lock:
+            references = list(self.observables.values())
+        return (obs for obs in (ref() for ref in references) if obs is not None)
+
+    def __len__(self) -> int:
+        return len(self.observables)
+
+    def finalize(self, observable: Any) -> None:
+        """
+        Evaluate a collected observable that is about to be garbage collected, and forget it.
+        Observables that were never collected (or already evaluated) are ignored.
+        The weak reference of an observable in a garbage reference cycle is already cleared
+        when its __del__ runs, but the reference is still registered until then.
+        """
+        with self.lock:
+            reference = self.observables.get(id(observable))
+            if reference is None:
+                return
+            referent = reference()
+            if referent is not None and referent is not observable:
+                return
+            del self.observables[id(observable)]
+        self.evaluate(observable)
+
+    @staticmethod
+    def measure(observable: Any) -> Measurement:
+        results = observable.evaluate()
+        return Measurement(
+            results,
+            observable.get_size(),
+            observable.estimate_savings(results),
+            observable.verify(results) if VERIFIER.enabled else {},
+            observable.get_growth(),
+            observable.get_schema(),
+        )
+
+    def evaluate(self, observable: Any) -> None:
+        self.add(observable.site_id_, *self.measure(observable))
+
+    def add(
+        self,
+        site_id: int,
+        results: List[Tuple[str, str]],
+        size: Optional[int],
+        savings: Optional[Dict[str, Saving]] = None,
+        verifications: Optional[Dict[str, Verification]] = None,
+        growth: Optional[Growth] = None,
+        schema: Optional[Schema] = None,
+    ) -> None:
+        with self.lock:
+            summary = self.summaries.get(site_id)
+            if summary is None:
+                summary = self.summaries[site_id] = SiteSummary(site_id)
+            summary.add(results, size, savings, verifications, growth, schema)
+
+    def measure_all(
+        self, observables: List[Any], tracker: Optional[BudgetTracker] = None
+    ) -> List[Optional[Measurement]]:
+        """
+        Evaluate observables with the configured workers. Measurements are returned in the
+        order of `observables`. Snapshots that can't be evaluated in a worker process (elements
+        that can't be pickled, for example) are evaluated in this process instead.
+        Once the budget of the tracker is exhausted, the remaining observables are skipped
+        (their measurement is None).
+        """
+        if self.threads == 1 and not self.processes:
+            return [
+                (
+                    None
+                    if tracker is not None and tracker.exhausted()
+                    else self.measure(observable)
+                )
+                for observable in observables
+            ]
+        futures: Dict[int, Future] = {}
+        snapshots = set()
+        process_pool = None
+        if self.processes:
+            process_pool = ProcessPoolExecutor(
+                self.processes, initializer=init_worker, initargs=(list(sites.SITES),)
+            )
+            for index, observable in enumerate(observables):
+                if getattr(observable, "BASE_TYPE", None) is not None:
+                    futures[index] = process_pool.submit(
+                        evaluate_snapshot, observable.snapshot()
+                    )
+                    snapshots.add(futures[index])
+        try:
+            with ThreadPoolExecutor(self.threads) as thread_pool:
+                for index, observable in enumerate(observables):
+                    if index not in futures:
+                        futures[index] = thread_pool.submit(self.measure, observable)
+                measurements = []
+                for index, observable in enumerate(observables):
+                    future = futures[index]
+                    if tracker is not None and tracker.exhausted():
+                        future.cancel()
+                        measurements.append(None)
+                    elif future in snapshots:
+                        try:
+                            measurements.append(future.result())
+                        except Exception:
+                            measurements.append(self.measure(observable))
+                    else:
+                        measurements.append(future.result())
+        finally:
+            if process_pool is not None:
+                process_pool.shutdown(cancel_futures=True)
+        return measurements
+
+    def run(self) -> None:
+        """
+        Evaluate every observable that is still alive and report the suggestions of each site.
+        """
+        with self.lock:
+            observables = list(self)
+            self.observables.clear()
+        tracker = None
+        order = range(len(observables))
+        if self.budget != ReportBudget():
+            tracker = BudgetTracker(self.budget)
+            order = sorted(order, key=lambda index: get_priority(observables[index]))
+        measurements = dict(
+            zip(order, self.measure_all([observables[i] for i in order], tracker))
+        )
+        skipped: Dict[int, int] = {}
+        # Merged in collection order, whatever order they got evaluated in
+        for index, observable in enumerate(observables):
+            if measurements[index] is None:
+                skipped[observable.site_id_] = skipped.get(observable.site_id_, 0) + 1
+            else:
+                self.add(observable.site_id_, *measurements[index])
+        for summary in self.summaries.values():
+            summary.analyze()
+        sort = REPORT_SORTS[self.sort]
+        summaries = sorted(self.summaries.items())
+        if sort is not None:
+            summaries.sort(
+                key=lambda item: -item[1].get_best_saving(
+                    sort, SAMPLER.get_allocations(item[0])
+                )
+            )
+        for site_id, summary in summaries:
+            summary.print_messages(SAMPLER.get_allocations(site_id), sort)
+        self.summaries.clear()
+        if skipped:
+            self.print_skipped(skipped, tracker)
+        REPORT_WRITER.flush()
+
+    def print_skipped(self, skipped: Dict[int, int], tracker: BudgetTracker) -> None:
+        lines = [
+            f"Report budget ({self.budget}) ran out of {tracker.reason}: "
+            f"{sum(skipped.values())} observable(s) were not evaluated"
+        ]
+        for site_id, count in sorted(skipped.items()):
+            site = get_site(site_id)
+            lines.append(
+                f"    {site.file_path}:{site.line_nr} in {site.function}: {count} instance(s)"
+            )
+        REPORT_WRITER.emit(
+            Report(
+                "\n".join(lines),
+                {
+                    "type": "budget",
+                    "budget": str(self.budget),
+                    "reason": tracker.reason,
+                    "skipped": [
+                        {
+                            "file_path": get_site(site_id).file_path,
+                            "line_nr": get_site(site_id).line_nr,
+                            "function": get_site(site_id).function,
+                            "instances": count,
+                        }
+                        for site_id, count in sorted(skipped.items())
+                    ],
+                },
+                border_style="red",
+                title="REPORT BUDGET",
+            )
+        )
+
+
+OBSERVABLE_COLLECTOR = ObservableCollector()
+OBSERVABLE_COLLECTOR.configure(os.environ.get(REPORT_WORKERS_ENV, ""))
+OBSERVABLE_COLLECTOR.budget = parse_budget(os.environ.get(REPORT_BUDGET_ENV, ""))
+OBSERVABLE_COLLECTOR.sort = os.environ.get(REPORT_SORT_ENV, "site")
+if OBSERVABLE_COLLECTOR.sort not in REPORT_SORTS:
+    raise ValueError(
+        f"Invalid report sort '{OBSERVABLE_COLLECTOR.sort}', use site, memory or time."
+    )
@@ -1,9 +1,16 @@
 from _ast import Assign, Module
 import ast
-import astor
-from typing import Any, Tuple
-from pyggester.module_importer import add_imports
-from pyggester.wrappers import apply_wrappers, get_wrappers_as_strings
+from types import CodeType
+from typing import Any, List, Literal, Tuple, Union
+from pyggester.module_importer import prepend_imports
+from pyggester.sites import SiteCollector
+from pyggester.wrappers import (
+    WRAPPERS,
+    ObservableNamedTupleWrapper,
+    ObservableNumpyArrayWrapper,
+    ObservablePandasDataFrameWrapper,
+    get_wrappers_as_strings,
+)
 
 
 class ObservableCollectorAppender(ast.NodeTransformer):
@@ -15,7 +22,7 @@ class ObservableCollectorAppender(ast.NodeTransformer):
     import module2
     ...(other import stmts)
 
-    OBSERVABLE_COLLECTOR = []
+    from pyggester.observable_collector import OBSERVABLE_COLLECTOR
     ...(other stmts)
 
     list_ = ObservableList([1,2,3])
@@ -30,7 +37,7 @@ class ObservableCollectorAppender(ast.NodeTransformer):
         Visit each Assign node to find and collect instances of observable types,
         indicated by 'Observable' being part of the function name.
         """
-        if isinstance(node.value, ast.Call):
+        if isinstance(node.value, ast.Call) and isinstance(node.targets[0], ast.Name):
             func_node = node.value.func
             func_name = ""
 
@@ -43,7 +50,7 @@ class ObservableCollectorAppender(ast.NodeTransformer):
                 append_to_list_code = (
                     f"OBSERVABLE_COLLECTOR.append({node.targets[0].id})"
                 )
-                return [node, ast.parse(append_to_list_code)]
+                return [node, ast.parse(append_to_list_code).body[0]]
 
         return node
 
@@ -63,39 +70,284 @@ class ObservableRunner(ast.NodeTransformer):
         ...
         (functions, classes and every possible python construct)
         ...
-        for observable in OBSERVABLE_COLLECTOR:
-            observable.run()
+        OBSERVABLE_COLLECTOR.run()
         -----------------------------------
+        Observables that got garbage collected before that, have already been evaluated
+        by the collector (see pyggester.observable_collector).
     """
 
     __slots__: Tuple[str] = ()
 
     def visit_Module(self, node: Module) -> Any:
-        observable_runner_code = (
-            """for observable in OBSERVABLE_COLLECTOR: observable.run()"""
-        )
+        observable_runner_code = "OBSERVABLE_COLLECTOR.run()"
         observable_runner_parsed = ast.parse(observable_runner_code)
         # We don't need to index the running code of observables because
         # if we just appended, the append method take care of it.
         # It is always going to be inserted at the end of the module in global scope
-        node.body.append(observable_runner_parsed)
+        node.body.extend(observable_runner_parsed.body)
+        return node
+
+
+class ModuleFacts(ast.NodeVisitor):
+    """
+    *   Gathers everything the wrappers need to know about a module in a single walk:
+        namedtuple declarations, numpy imports/aliases and pandas imports/aliases.
+        Each wrapper used to walk the whole module on its own to collect these facts.
+        The collected facts are handed over to the wrappers through their visitors.
+    """
+
+    __slots__: Tuple[str] = (
+        "namedtuple_visitor",
+        "numpy_imports_visitor",
+        "pandas_imports_visitor",
+    )
+
+    def __init__(self) -> None:
+        self.namedtuple_visitor = ObservableNamedTupleWrapper.NamedTupleVisitor()
+        self.numpy_imports_visitor = ObservableNumpyArrayWrapper.NumpyImportsVisitor()
+        self.pandas_imports_visitor = (
+            ObservablePandasDataFrameWrapper.PandasImportsVisitor()
+        )
+
+    def visit_Import(self, node: ast.Import) -> Any:
+        self.numpy_imports_visitor.visit_Import(node)
+        self.pandas_imports_visitor.visit_Import(node)
+
+    def visit_ImportFrom(self, node: ast.ImportFrom) -> Any:
+        self.numpy_imports_visitor.visit_ImportFrom(node)
+        self.pandas_imports_visitor.visit_ImportFrom(node)
+
+    def visit_Assign(self, node: ast.Assign) -> Any:
+        self.namedtuple_visitor.visit_Assign(node)
+
+
+class ObservableTransformer(ast.NodeTransformer):
+    """
+    *   Single pass transformation engine.
+        After one pre-scan (ModuleFacts), a single walk over the module dispatches each node
+        to the wrapper that handles it, collects each observable into the OBSERVABLE_COLLECTOR,
+        prepends the needed imports (prepend_imports) and, if requested, appends the code that
+        runs the observables. The module is walked twice: once by the pre-scan and once by the
+        transformation.
+        On top of that, every wrapped call gets the id of its allocation site and the module registers
+        its sites right after the imports (see pyggester.sites).
+    """
+
+    __slots__: Tuple[str] = (
+        "run_observables",
+        "sites",
+        "standard_wrappers",
+        "wrapping",
+        "assign_wrappers",
+        "collector_appender",
+    )
+
+    def __init__(self, tree: ast.AST, run_observables: bool = False) -> None:
+        facts = ModuleFacts()
+        facts.visit(tree)
+        self.run_observables = run_observables
+        self.sites = SiteCollector()
+        self.standard_wrappers = {
+            name: wrapper(sites=self.sites)
+            for name, wrapper in WRAPPERS["standard_containers"].items()
+        }
+        # Standard wrappers that still reach the visited node, in the order of the pipeline
+        self.wrapping: Tuple[str, ...] = tuple(self.standard_wrappers)
+        self.assign_wrappers = (
+            ObservableNamedTupleWrapper(
+                namedtuple_visitor=facts.namedtuple_visitor, sites=self.sites
+            ),
+            ObservableNumpyArrayWrapper(
+                imports_visitor=facts.numpy_imports_visitor, sites=self.sites
+            ),
+            ObservablePandasDataFrameWrapper(
+                imports_visitor=facts.pandas_imports_visitor, sites=self.sites
+            ),
+        )
+        self.collector_appender = ObservableCollectorAppender()
+
+    def visit_scope(self, node: ast.AST, name: str) -> ast.AST:
+        """
+        Visit a class/function/lambda while keeping track of the enclosing scopes of the sites.
+        """
+        self.sites.scopes.append(name)
+        try:
+            return self.generic_visit(node)
+        finally:
+            self.sites.scopes.pop()
+
+    def visit_FunctionDef(self, node: ast.FunctionDef) -> ast.AST:
+        return self.visit_scope(node, node.name)
+
+    def visit_AsyncFunctionDef(self, node: ast.AsyncFunctionDef) -> ast.AST:
+        return self.visit_scope(node, node.name)
+
+    def visit_ClassDef(self, node: ast.ClassDef) -> ast.AST:
+        return self.visit_scope(node, node.name)
+
+    def visit_Lambda(self, node: ast.Lambda) -> ast.AST:
+        return self.visit_scope(node, "<lambda>")
+
+    def visit_container(self, node: ast.AST, name: str) -> ast.AST:
+        """
+        Wrap a container literal, then visit its elements the way the multi-pass pipeline
+        (apply_wrappers) reached them: each standalone wrapper stops at the containers it
+        wraps, and the later ones stop at the wrapping call. So only the wrappers that come
+        before this one still wrap the nested containers.
+        """
+        wrapping = self.wrapping
+        if name not in wrapping:
+            return self.generic_visit(node)
+        new_node = getattr(
+            self.standard_wrappers[name], f"visit_{type(node).__name__}"
+        )(node)
+        if new_node is node:
+            # Unpacking targets are left alone by their wrapper, but not by the other ones
+            self.wrapping = tuple(other for other in wrapping if other != name)
+        else:
+            self.wrapping = wrapping[: wrapping.index(name)]
+        try:
+            self.generic_visit(node)
+        finally:
+            self.wrapping = wrapping
+        return new_node
+
+    def visit_List(self, node: ast.List) -> ast.AST:
+        return self.visit_container(node, "list")
+
+    def visit_Dict(self, node: ast.Dict) -> ast.AST:
+        return self.visit_container(node, "dict")
+
+    def visit_Set(self, node: ast.Set) -> ast.AST:
+        return self.visit_container(node, "set")
+
+    def visit_Tuple(self, node: ast.Tuple) -> ast.AST:
+        return self.visit_container(node, "tuple")
+
+    def visit_Call(self, node: ast.Call) -> ast.AST:
+        """
+        list(), dict(), set() and tuple() calls get wrapped. Just like in the standalone wrappers,
+        the arguments of a call are never visited.
+        """
+        for name in self.wrapping:
+            new_node = self.standard_wrappers[name].visit_Call(node)
+            if new_node is not node:
+                return new_node
+        return node
+
+    def visit_Assign(self, node: ast.Assign) -> Union[ast.AST, List[ast.AST]]:
+        """
+        Wrap the containers of the assigned value first, then let the namedtuple/numpy/pandas wrappers
+        add their wrapper statements and finally collect every assigned observable.
+        """
+        self.generic_visit(node)
+        statements = [node]
+        for wrapper in self.assign_wrappers:
+            wrapped = wrapper.visit_Assign(node)
+            if isinstance(wrapped, list):
+                statements.extend(wrapped[1:])
+
+        collected_statements = []
+        for statement in statements:
+            collected = self.collector_appender.visit_Assign(statement)
+            if isinstance(collected, list):
+                collected_statements.extend(collected)
+            else:
+                collected_statements.append(statement)
+
+        if len(collected_statements) == 1:
+            return node
+        for statement in collected_statements[1:]:
+            # Added statements point to the line of the assignment they come from,
+            # which keeps tracebacks of compiled modules meaningful
+            for node_ in ast.walk(statement):
+                ast.copy_location(node_, node)
+        return collected_statements
+
+    def visit_Module(self, node: ast.Module) -> ast.Module:
+        self.generic_visit(node)
+        prepend_imports(
+            node,
+            {
+                "pyggester.observable_collector": ["OBSERVABLE_COLLECTOR"],
+                "pyggester.observables": get_wrappers_as_strings(),
+                "pyggester.sites": ["register_sites"] if self.sites.sites else [],
+            },
+        )
+        if self.sites.sites:
+            index = next(
+                index
+                for index, statement in enumerate(node.body)
+                if isinstance(statement, ast.ImportFrom)
+                and statement.module == "pyggester.sites"
+            )
+            node.body.insert(index + 1, self.sites.registration())
+        if self.run_observables:
+            node = ObservableRunner().visit_Module(node)
         return node
 
 
 def apply_observable_collector_transformations(
-    tree: ast.AST, run_observables=False
-) -> str:
+    tree: ast.AST,
+    run_observables=False,
+    emit: Literal["source", "code"] = "source",
+    filename: str = "<pyggester>",
+) -> Union[str, CodeType]:
     """
     Basically does anything needed for pyggester to do its analysis and returns the modified
     code. The result of this function should be stored into a new file that replicates the original
     one.
+
+    Args:
+        tree (ast.AST): The module to transform.
+        run_observables (bool): Whether the code that runs the observables gets added.
+        emit (str): "source" returns the transformed source code (ast.unparse),
+            "code" compiles the transformed tree straight into a code object, which skips both
+            generating the source and parsing it again.
+        filename (str): File name of the compiled code object (only used with emit="code").
+
+    Returns:
+        Union[str, CodeType]: The transformed source code or code object.
+    """
+    tree = transform_tree(tree, run_observables=run_observables)
+
+    return emit_tree(tree, emit=emit, filename=filename)
+
+
+def emit_tree(
+    tree: ast.AST,
+    emit: Literal["source", "code"] = "source",
+    filename: str = "<pyggester>",
+) -> Union[str, CodeType]:
+    """
+    Turns an already transformed tree into source code or into a code object
+    (see apply_observable_collector_transformations).
     """
-    tree = add_imports(tree, "pyggester.observables", get_wrappers_as_strings())
-    tree = add_imports(tree, "pyggester.observable_collector", ["OBSERVABLE_COLLECTOR"])
-    tree = apply_wrappers(tree)
-    tree = apply_observable_collector_modifications(tree, run_observables)
+    if emit == "code":
+        tree = ast.fix_missing_locations(tree)
+        return compile(tree, filename, "exec", dont_inherit=True)
+    if emit == "source":
+        return ast.unparse(tree) + "\n"
+    raise ValueError(f"Unknown emit mode '{emit}', use 'source' or 'code'.")
 
-    return astor.to_source(tree)
+
+def transform_tree(tree: ast.AST, run_observables=False) -> ast.AST:
+    """
+    Applies every pyggester transformation to the tree, in a single pass (see ObservableTransformer).
+    """
+    return ObservableTransformer(tree, run_observables=run_observables).visit(tree)
+
+
+def compile_observable_transformations(
+    tree: ast.AST, filename: str, run_observables=False
+) -> CodeType:
+    """
+    Same as apply_observable_collector_transformations, but the transformed tree is compiled
+    straight into a code object, without going through source code.
+    """
+    return apply_observable_collector_transformations(
+        tree, run_observables=run_observables, emit="code", filename=filename
+    )
 
 
 def apply_observable_collector_modifications(tree: ast.AST, run_observables) -> ast.AST:
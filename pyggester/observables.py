@@ -1,24 +1,397 @@
 from _collections_abc import dict_items, dict_keys, dict_values
-from typing import List, Tuple, Dict, Any, Iterable
+import array
+import collections
+import os
+import sys
+from collections import _count_elements
+from itertools import compress
+from typing import (
+    AbstractSet,
+    List,
+    Tuple,
+    Dict,
+    Any,
+    Callable,
+    Iterable,
+    Iterator,
+    Sequence,
+    Sized,
+)
 from collections import namedtuple
 import numpy
 from pyggester.message_handler import MessageHandler
-import array
-import scipy.sparse as sp
-import inspect
-from typing import List, Dict, Any, Tuple, Set, NamedTuple
+from typing import List, Dict, Any, Tuple, Set, NamedTuple, Optional, ClassVar
+from pyggester.array_stats import ArrayStats, compute_array_stats
+from pyggester.growth import Growth
+from pyggester.observable_collector import OBSERVABLE_COLLECTOR
+from pyggester.sampling import CONTENT_SAMPLER, SAMPLER, ContentSample
+from pyggester.savings import Saving, get_footprint
+from pyggester.schemas import Schema, get_schema
+from pyggester.sites import get_caller_site_id, get_site
+from pyggester.sketches import KMinValues
+from pyggester.verify import VERIFIER, Trial, Verification
 
 # TODO MIGHT CONSIDER CREATING AN OBSERVABLE ABSTRACT BASE CLASS,
 # TO MAKE EACH OBSERVABLE FOLLOW A SPECIFIC CONTRACT
 
 
-class ObservableList(list):
+class Observable:
+    """
+    Behaviour shared by every observable.
+
+    Observables only store the id of their allocation site (see pyggester.sites). The transformed
+    code passes it as `site_id_`, so constructing an observable doesn't inspect any frame.
+    The MessageHandler is only created once a check has something to report.
+    Each observable declares the 'site_id_' and 'message_handler_' slots on its own, because
+    built-in base types like list don't allow non-empty slots on a second base class.
+
+    In sampling mode (see pyggester.sampling), allocations that are not sampled don't create
+    an observable at all: the wrapped container is returned as a plain BASE_TYPE object
+    (None for observables that only analyze an existing object).
+    """
+
+    __slots__: Tuple[str] = ()
+
+    BASE_TYPE: ClassVar[Optional[type]] = None
+    # Observable class of the subclasses of collected observables (see collect)
+    OBSERVABLE_TYPE: ClassVar[Optional[type]] = None
+
+    # Names of the check methods, in the order they run.
+    # Added checkers should be listed here in sequence. Might need to refactor this to add priority
+    # levels and maybe only give a single suggestion, but that needs way more specific analysis
+    CHECKS: ClassVar[Tuple[str]] = ()
+    # Attributes that track the operations done on the observed data
+    ACCESS_COUNTERS: ClassVar[Tuple[str]] = ()
+    # Check name -> name of the method estimating the saving of its suggestion (see pyggester.savings)
+    SAVINGS: ClassVar[Dict[str, str]] = {}
+    # Check name -> name of the method returning the Trial of its suggestion (see pyggester.verify)
+    VERIFICATIONS: ClassVar[Dict[str, str]] = {}
+
+    def __new__(cls, *args, site_id_: Optional[int] = None, **kwargs):
+        if site_id_ is not None and not SAMPLER.sample(site_id_):
+            return cls.unsampled(*args, **kwargs)
+        return super().__new__(cls)
+
+    @classmethod
+    def unsampled(cls, *args, **kwargs) -> Any:
+        if cls.BASE_TYPE is None:
+            return None
+        if len(args) == 1 and not kwargs and type(args[0]) is cls.BASE_TYPE:
+            # The wrapped literal/constructor call already is the plain container
+            return args[0]
+        return cls.BASE_TYPE(*args, **kwargs)
+
+    def init_site(self, site_id_: Optional[int]) -> None:
+        if site_id_ is None:
+            # Constructed without the transformations (by hand or by an older transformed
+            # module), so the site comes from the caller of the observable's constructor
+            site_id_ = get_caller_site_id(depth=3)
+        self.site_id_ = site_id_
+        self.message_handler_ = None
+
+    @property
+    def message_handler(self) -> MessageHandler:
+        if self.message_handler_ is None:
+            site = get_site(self.site_id_)
+            self.message_handler_ = MessageHandler(
+                line_nr=site.line_nr, file_path=site.file_path
+            )
+        return self.message_handler_
+
+    def print_messages(self) -> None:
+        if self.message_handler_ is not None:
+            self.message_handler_.print_messages()
+
+    def evaluate(self) -> List[Tuple[str, str]]:
+        """
+        Run every check and return the (check name, suggestion) pairs they produced.
+        """
+        results = []
+        for check in self.CHECKS:
+            handler = self.message_handler_
+            start = 0 if handler is None else len(handler.messages)
+            getattr(self, check)()
+            if self.message_handler_ is not None:
+                results.extend(
+                    (check, message)
+                    for message in self.message_handler_.messages[start:]
+                )
+        return results
+
+    def estimate_savings(self, results: List[Tuple[str, str]]) -> Dict[str, Saving]:
+        """
+        Estimated saving of the suggestion of every check in `results` that has an estimator.
+        """
+        savings = {}
+        for check in dict.fromkeys(check for check, _ in results):
+            estimator = self.SAVINGS.get(check)
+            if estimator is None:
+                continue
+            try:
+                savings[check] = getattr(self, estimator)()
+            except Exception:
+                # An estimate is never worth losing the suggestion for
+                pass
+        return savings
+
+    def verify(self, results: List[Tuple[str, str]]) -> Dict[str, Verification]:
+        """
+        Measured speedup and memory difference of the suggestion of every check in `results`
+        that has a trial.
+        """
+        verifications = {}
+        for check in dict.fromkeys(check for check, _ in results):
+            trial = self.VERIFICATIONS.get(check)
+            if trial is None:
+                continue
+            try:
+                verifications[check] = VERIFIER.verify(getattr(self, trial)())
+            except Exception:
+                # Data that can't be copied or doesn't fit the suggested structure
+                pass
+        return verifications
+
+    def get_size(self) -> Optional[int]:
+        """
+        Size of the observed data (number of elements), reported in the per site summary.
+        """
+        try:
+            return len(self)
+        except TypeError:
+            return None
+
+    def get_nbytes(self) -> int:
+        """
+        Size in bytes of the observed container itself (not of its elements).
+        """
+        return sys.getsizeof(self)
+
+    def get_growth(self) -> Optional[Growth]:
+        """
+        How the observed container grew, aggregated per site for the preallocation suggestions
+        (see pyggester.growth). None for containers that don't track their growth.
+        """
+        return None
+
+    def get_schema(self) -> Optional[Schema]:
+        """
+        The key schema of a record-like container, aggregated per site for the record type
+        suggestion (see pyggester.schemas).
+        """
+        return None
+
+    def get_access_count(self) -> int:
+        """
+        Number of tracked operations done on the observed data (at least 1).
+        """
+        return 1 + sum(int(getattr(self, name)) for name in self.ACCESS_COUNTERS)
+
+    def get_cost(self) -> int:
+        """
+        Estimated number of elements the checks look at (see get_content_sample).
+        """
+        size = self.get_size() or 0
+        return size if size <= CONTENT_SAMPLER.threshold else CONTENT_SAMPLER.size
+
+    def get_content_sample(self, items: Iterable) -> ContentSample:
+        """
+        The elements of `items` that checks looking at every element should use: all of them,
+        or a deterministic sample for large containers (see pyggester.sampling.ContentSampler).
+        """
+        return CONTENT_SAMPLER.sample(items, self.get_size(), seed=self.site_id_)
+
+    def snapshot(self) -> Tuple[type, Any, Dict[str, Any]]:
+        """
+        Compact picklable copy of a container observable: its class, the plain container and
+        the tracked state. Used to evaluate observables in worker processes.
+        """
+        state = dict(getattr(self, "__dict__", {}))
+        for cls in type(self).__mro__:
+            for name in getattr(cls, "__slots__", ()):
+                if name not in ("__weakref__", "message_handler_"):
+                    state[name] = getattr(self, name)
+        state.pop("message_handler_", None)
+        # copy() doesn't go through the overridden __iter__, which would count as a scan
+        copy = getattr(self.BASE_TYPE, "copy", self.BASE_TYPE)
+        return self.get_observable_type(), copy(self), state
+
+    @classmethod
+    def from_snapshot(cls, data: Any, state: Dict[str, Any]) -> "Observable":
+        """
+        Rebuild an observable from a snapshot, without going through sampling or collection.
+        """
+        observable = cls.BASE_TYPE.__new__(cls, data)
+        if cls.BASE_TYPE is not tuple:
+            # The overridden methods would track the elements once more
+            cls.BASE_TYPE.__init__(observable, data)
+        for name, value in state.items():
+            setattr(observable, name, value)
+        observable.message_handler_ = None
+        return observable
+
+    def __reduce_ex__(self, protocol: int) -> Any:
+        """
+        Pickle (and copy) container observables as their snapshot. The default protocol would
+        replay the elements through the overridden methods (append, __setitem__, ...) before
+        the tracked state got restored.
+        """
+        if self.BASE_TYPE is None:
+            return super().__reduce_ex__(protocol)
+        cls, data, state = self.snapshot()
+        return cls.from_snapshot, (data, state)
+
+    def run(self) -> None:
+        """
+        Run every check and print the suggestions of this observable straight away.
+        """
+        self.evaluate()
+        self.print_messages()
+
+    def get_observable_type(self) -> type:
+        """
+        The observable class of this instance, also for collected observables (see collect).
+        """
+        return type(self).OBSERVABLE_TYPE or type(self)
+
+    def collect(self) -> None:
+        """
+        Evaluate the final state of the observable when it is about to be garbage collected
+        (see ObservableCollector.finalize).
+        Only collected observables get a __del__, which every instance would otherwise call on
+        deallocation: their class is swapped for a subclass that adds nothing else.
+        """
+        cls = type(self)
+        if cls.OBSERVABLE_TYPE is not None:
+            return
+        finalized = FINALIZED_TYPES.get(cls)
+        if finalized is None:
+            finalized = FINALIZED_TYPES[cls] = type(
+                cls.__name__,
+                (FinalizedObservable, cls),
+                {
+                    "__slots__": (),
+                    "__module__": cls.__module__,
+                    "__qualname__": cls.__qualname__,
+                    "OBSERVABLE_TYPE": cls,
+                },
+            )
+        self.__class__ = finalized
+
+
+class FinalizedObservable:
+    """
+    Base of the classes of collected observables (see Observable.collect).
+    """
+
+    __slots__: Tuple[str] = ()
+
+    def __del__(self) -> None:
+        # The observable is about to be garbage collected, so its final state gets evaluated
+        try:
+            OBSERVABLE_COLLECTOR.finalize(self)
+        except Exception:
+            pass
+
+
+# Observable class -> its subclass for collected observables
+FINALIZED_TYPES: Dict[type, type] = {}
+
+
+# Kinds of list elements tracked by ObservableList
+INT, FLOAT, CHAR, LIST, OTHER = range(5)
+_ELEMENT_KINDS: Dict[type, int] = {int: INT, bool: INT, float: FLOAT, list: LIST}
+# Bytes per element of the array.array suggested for each kind ('q', 'd' and 'w' typecodes)
+ARRAY_ITEMSIZES: Dict[int, int] = {INT: 8, FLOAT: 8, CHAR: 4}
+ARRAY_TYPECODES: Dict[int, str] = {
+    INT: "q",
+    FLOAT: "d",
+    CHAR: "w" if "w" in array.typecodes else "u",
+}
+# Lookups (and front operations) replayed by the trials, at most
+MAX_REPLAYED_LOOKUPS: int = 1000
+# Elements changed since the last full scan of a list, up to which the next scan counts as a
+# rescan: a heap would take a push or pop per change instead (replacing the smallest element
+# takes one removal and one addition)
+MAX_RESCAN_CHANGES: int = 2
+
+
+def get_element_kind(item: Any) -> int:
+    kind = _ELEMENT_KINDS.get(type(item))
+    if kind is not None:
+        return kind
+    if isinstance(item, str):
+        return CHAR if len(item) == 1 else OTHER
+    return get_type_kind(type(item))
+
+
+def get_type_kind(cls: type) -> int:
+    """
+    Kind of the elements of a type other than str, whose kind depends on their length.
+    """
+    kind = _ELEMENT_KINDS.get(cls)
+    if kind is not None:
+        return kind
+    if issubclass(cls, int):
+        return INT
+    if issubclass(cls, float):
+        return FLOAT
+    if issubclass(cls, list):
+        return LIST
+    return OTHER
+
+
+def count_kinds(
+    items: Sequence[Any], iterate: Callable[[Sequence[Any]], Iterator[Any]] = iter
+) -> List[int]:
+    """
+    Number of elements of each kind in `items`, counted per type without a Python level loop.
+    Strings take a second pass, for their length.
+
+    Args:
+        items (Sequence[Any]): The elements to count.
+        iterate (Callable): Iterates over `items`, list.__iter__ for an ObservableList (whose own
+            __iter__ counts the scans).
+    """
+    kinds = [0] * 5
+    types: Dict[type, int] = {}
+    _count_elements(types, map(type, iterate(items)))
+    strings = set()
+    for cls, count in types.items():
+        if issubclass(cls, str):
+            strings.add(cls)
+            kinds[OTHER] += count
+        else:
+            kinds[get_type_kind(cls)] += count
+    if strings:
+        lengths: Dict[int, int] = {}
+        is_string = map(strings.__contains__, map(type, iterate(items)))
+        _count_elements(lengths, map(len, compress(iterate(items), is_string)))
+        kinds[CHAR] += lengths.get(1, 0)
+        kinds[OTHER] -= lengths.get(1, 0)
+    return kinds
+
+
+class ObservableList(Observable, list):
     """
     The ObservableList is an enhanced version of a list that
     preserves the full original functionality of a list, but
     adds more features to it so that we keep track of anything that
     potentially happens in order to do dynamic analysis to each declared
     list.
+
+    Every tracked operation has a counter, and the lookups (`in`, count() and index()) add up
+    the number of elements they compared, at the size the list had at the time.
+    Operations at the front of the list (pop(0), insert(0, x), del items[0], ...) are counted
+    apart, with the number of elements they shifted.
+    The list also knows whether it is sorted (since its last sort(), until an element gets added or
+    replaced) and counts the full scans (iterations, like min() and max() do) that follow a change
+    of one or two elements, for the bisect and heapq suggestions. Its peak length is kept for the preallocation
+    suggestion of its site (see get_growth).
+    Besides the operation counters, the list keeps a running count of its elements per kind
+    (INT, FLOAT, CHAR, LIST, OTHER), updated by every mutating method. The array.array, numpy and
+    set checks are answered from these counters, instead of scanning the whole list at exit.
+    The counters are only set once they change (see DEFAULTS), and the kinds are first counted
+    when a check or a mutation needs them, so creating a list doesn't pay for any of them.
     """
 
     __slots__: Tuple[str] = (
@@ -28,51 +401,320 @@ class ObservableList(list):
         "removed",
         "count_",
         "in_operator_used",
-        "message_handler",
+        "index_",
+        "scanned",
+        "front_removed",
+        "front_inserted",
+        "shifted",
+        "sorts",
+        "resorts",
+        "added_since_sort",
+        "sorted_",
+        "sorted_lookups",
+        "bisect_saved",
+        "changes",
+        "rescans",
+        "rescanned",
+        "peak",
+        "kinds",
+        "site_id_",
+        "message_handler_",
+        "__weakref__",
     )
 
-    def __init__(self, *args, **kwargs) -> None:
+    BASE_TYPE: ClassVar[type] = list
+    CHECKS: ClassVar[Tuple[str]] = (
+        # First, before the other checks iterate over the list (which counts as a scan)
+        "check_heapq_instead_of_list",
+        "check_array_instead_of_list",
+        "check_numpy_array_instead_of_list",
+        "check_set_instead_of_list",
+        "check_Counter_insteaf_of_list",
+        "check_deque_instead_of_list",
+        "check_bisect_instead_of_sort",
+    )
+    SAVINGS: ClassVar[Dict[str, str]] = {
+        "check_array_instead_of_list": "saving_array_instead_of_list",
+        "check_numpy_array_instead_of_list": "saving_numpy_array_instead_of_list",
+        "check_set_instead_of_list": "saving_set_instead_of_list",
+        "check_Counter_insteaf_of_list": "saving_Counter_instead_of_list",
+        "check_deque_instead_of_list": "saving_deque_instead_of_list",
+        "check_heapq_instead_of_list": "saving_heapq_instead_of_list",
+        "check_bisect_instead_of_sort": "saving_bisect_instead_of_sort",
+    }
+    VERIFICATIONS: ClassVar[Dict[str, str]] = {
+        "check_array_instead_of_list": "trial_array_instead_of_list",
+        "check_set_instead_of_list": "trial_set_instead_of_list",
+        "check_deque_instead_of_list": "trial_deque_instead_of_list",
+    }
+    ACCESS_COUNTERS: ClassVar[Tuple[str]] = (
+        "appended",
+        "extended",
+        "inserted",
+        "removed",
+        "count_",
+        "in_operator_used",
+        "index_",
+        "front_removed",
+        "front_inserted",
+        "sorts",
+        "rescans",
+    )
+
+    # Values of the tracked state until it is first set. Most lists only go through a few
+    # of the tracked operations, so their counters are only set (and their slots filled) by
+    # the operations that happen to them.
+    DEFAULTS: ClassVar[Dict[str, Any]] = {
+        # The following counters keep track of base list methods, how many times each was called
+        "appended": 0,
+        "extended": 0,
+        "inserted": 0,
+        "removed": 0,
+        "count_": 0,
+        "in_operator_used": 0,
+        "index_": 0,
+        # Elements compared by `in`, count() and index()
+        "scanned": 0,
+        # Elements removed from and inserted at the front, and the elements that shifted for them
+        "front_removed": 0,
+        "front_inserted": 0,
+        "shifted": 0,
+        # sort() calls, and the ones that sorted again a sorted list after elements got added
+        "sorts": 0,
+        "resorts": 0,
+        "added_since_sort": 0,
+        # Lookups while sorted, and the comparisons bisect would have saved (also on resorts)
+        "sorted_lookups": 0,
+        "bisect_saved": 0,
+        # Full scans after a few changes (see MAX_RESCAN_CHANGES), and the elements they went
+        # through
+        "rescans": 0,
+        "rescanned": 0,
+        # Largest length the list had, kept once its length changes
+        "peak": 0,
+    }
+
+    def __init__(self, *args, site_id_: Optional[int] = None, **kwargs) -> None:
         super().__init__(*args, **kwargs)
-        # The following methods keep track of base list methods.
-        # False if not used(ever), True if used
-        self.appended: bool = False
-        self.extended: bool = False
-        self.inserted: bool = False
-        self.removed: bool = False
-        self.count_: bool = False
-        self.in_operator_used: bool = False
+        # Read by every lookup and iteration, so they are always set
+        # Whether the list is still sorted since its last sort()
+        self.sorted_: bool = False
+        # Elements added, removed or replaced since the last full scan
+        self.changes: int = 0
+        self.init_site(site_id_)
+
+    def __getattr__(self, name: str) -> Any:
+        """
+        Tracked state that was never set (see DEFAULTS). The kinds of the elements are counted
+        the first time they are needed, by a check or by a mutation (before it happens), and
+        kept up to date from then on.
+        """
+        if name == "kinds":
+            # Counted without going through __iter__, which would count as a scan
+            self.kinds = count_kinds(self, list.__iter__)
+            return self.kinds
+        try:
+            return self.DEFAULTS[name]
+        except KeyError:
+            raise AttributeError(
+                f"'{type(self).__name__}' object has no attribute '{name}'"
+            ) from None
+
+    def track(self, items: Sequence[Any]) -> None:
+        kinds = self.kinds
+        for kind, count in enumerate(count_kinds(items)):
+            kinds[kind] += count
+
+    def untrack(self, items: Sequence[Any]) -> None:
+        kinds = self.kinds
+        for kind, count in enumerate(count_kinds(items)):
+            kinds[kind] -= count
+
+    def track_peak(self, size: int) -> None:
         """
-        Get the context of the current list being analyzed
+        Keep the peak length, given the length of the list after it grew or before it shrank.
         """
-        caller_frame = inspect.currentframe().f_back
-        line_number: int = caller_frame.f_lineno
-        file_path: str = caller_frame.f_globals["__file__"]
+        if size > self.peak:
+            self.peak = size
+
+    def track_addition(self, added: int = 1) -> None:
+        self.added_since_sort += added
+        self.sorted_ = False
+        self.changes += added
+        self.track_peak(len(self))
 
-        self.message_handler = MessageHandler(line_nr=line_number, file_path=file_path)
+    def track_lookup(self, scanned: int) -> None:
+        """
+        Count the elements compared by a lookup; bisect needs about log2(n) comparisons on
+        a sorted list.
+        """
+        self.scanned += scanned
+        if self.sorted_:
+            self.sorted_lookups += 1
+            self.bisect_saved += scanned - len(self).bit_length()
 
     def append(self, item) -> None:
+        kinds = self.kinds
         super().append(item)
-        self.appended = True
+        kinds[get_element_kind(item)] += 1
+        self.appended += 1
+        self.track_addition()
 
     def extend(self, iterable) -> None:
-        super().extend(iterable)
-        self.extended = True
+        items = iterable if type(iterable) in (list, tuple) else list(iterable)
+        self.track(items)
+        super().extend(items)
+        self.extended += 1
+        self.track_addition(len(items))
+
+    def __iadd__(self, iterable) -> "ObservableList":
+        self.extend(iterable)
+        return self
+
+    def __imul__(self, n: int) -> "ObservableList":
+        size = len(self)
+        self.kinds = [count * max(n, 0) for count in self.kinds]
+        self.track_peak(size)
+        super().__imul__(n)
+        if len(self) > size:
+            self.track_addition(len(self) - size)
+        elif len(self) < size:
+            # Emptied (n <= 0), like clear()
+            self.added_since_sort = 0
+            self.changes += size
+        return self
 
     def insert(self, index, item) -> None:
+        size = len(self)
+        kinds = self.kinds
         super().insert(index, item)
-        self.inserted = True
+        kinds[get_element_kind(item)] += 1
+        self.inserted += 1
+        self.track_addition()
+        if size and index <= -size or index == 0:
+            self.front_inserted += 1
+            self.shifted += size
+
+    def track_front_removal(self, index: int, size: int, removed: int = 1) -> None:
+        """
+        Count the removal of `removed` elements at `index` (normalized) of a list of `size`.
+        Removals keep a sorted list sorted.
+        """
+        self.changes += removed
+        self.track_peak(size)
+        if index == 0:
+            self.front_removed += removed
+            self.shifted += size - removed
 
     def remove(self, item) -> None:
-        super().remove(item)
-        self.removed = True
+        # Elements that compare equal can be of different kinds (1 == 1.0),
+        # so the removed element itself is untracked
+        try:
+            index = super().index(item)
+        except ValueError:
+            raise ValueError("list.remove(x): x not in list") from None
+        self.kinds[get_element_kind(super().__getitem__(index))] -= 1
+        super().__delitem__(index)
+        self.removed += 1
+        self.track_front_removal(index, len(self) + 1)
+
+    def pop(self, index: int = -1) -> Any:
+        size = len(self)
+        kinds = self.kinds
+        item = super().pop(index)
+        kinds[get_element_kind(item)] -= 1
+        self.track_front_removal(index % size, size)
+        return item
+
+    def clear(self) -> None:
+        size = len(self)
+        self.track_peak(size)
+        super().clear()
+        self.kinds = [0] * 5
+        self.added_since_sort = 0
+        self.changes += size
+
+    def sort(self, *, key=None, reverse=False) -> None:
+        size = len(self)
+        super().sort(key=key, reverse=reverse)
+        self.sorts += 1
+        if self.sorts > 1 and self.added_since_sort:
+            # Sorting a sorted list with a few new elements compares every element at least once,
+            # bisect.insort finds the place of each new element with a binary search
+            self.resorts += 1
+            self.bisect_saved += size - 1 - self.added_since_sort * size.bit_length()
+        self.added_since_sort = 0
+        # `in`, count() and index() compare the elements themselves, bisect can only look them
+        # up in a list ordered by their own value
+        self.sorted_ = key is None and not reverse
+        self.changes += 1
+
+    def __iter__(self) -> Iterator[Any]:
+        changes = self.changes
+        if changes:
+            self.changes = 0
+            # Iterating over a list that was just built (or refilled) is a single scan
+            if changes <= MAX_RESCAN_CHANGES:
+                self.rescans += 1
+                self.rescanned += len(self)
+        return super().__iter__()
+
+    def __setitem__(self, index, value) -> None:
+        kinds = self.kinds
+        if isinstance(index, slice):
+            value = list(value)
+            removed = super().__getitem__(index)
+            self.track_peak(len(self))
+            super().__setitem__(index, value)
+            self.untrack(removed)
+            self.track(value)
+            self.track_addition(len(value))
+        else:
+            removed = super().__getitem__(index)
+            super().__setitem__(index, value)
+            kinds[get_element_kind(removed)] -= 1
+            kinds[get_element_kind(value)] += 1
+            self.track_addition()
+
+    def __delitem__(self, index) -> None:
+        size = len(self)
+        kinds = self.kinds
+        removed = super().__getitem__(index)
+        super().__delitem__(index)
+        if isinstance(index, slice):
+            self.untrack(removed)
+            self.track_peak(size)
+            positions = range(size)[index]
+            if positions.step == 1 and positions:
+                self.track_front_removal(positions.start, size, len(positions))
+        else:
+            kinds[get_element_kind(removed)] -= 1
+            self.track_front_removal(index % size, size)
 
     def count(self, __value: Any) -> int:
-        self.count_ = True
+        self.count_ += 1
+        self.track_lookup(len(self))
         return super().count(__value)
 
+    def index(self, __value: Any, start: int = 0, stop: int = sys.maxsize) -> int:
+        self.index_ += 1
+        try:
+            index = super().index(__value, start, stop)
+        except ValueError:
+            self.track_lookup(len(range(len(self))[start:stop]))
+            raise
+        self.track_lookup(index + 1 - range(len(self))[start:stop].start)
+        return index
+
     def __contains__(self, __key: object) -> bool:
-        self.in_operator_used = True
-        return super().__contains__(__key)
+        self.in_operator_used += 1
+        # index() compares the same elements as `in`, and tells how many of them
+        try:
+            self.track_lookup(super().index(__key) + 1)
+        except ValueError:
+            self.track_lookup(len(self))
+            return False
+        return True
 
     def get_list_dimension(self, lst):
         """ """
@@ -85,10 +727,14 @@ class ObservableList(list):
     def check_numpy_array_instead_of_list(self):
         """ """
         try:
-            if self.get_list_dimension(self) >= 2:
-                numpy.array(self)
+            # Nested lists (a dimension of at least 2)
+            if self.kinds[LIST]:
+                sample = self.get_content_sample(self)
+                numpy.array(sample.items)
                 self.message_handler.messages.append(
-                    "Consider using a numpy array instead of a list, for faster computations and optimized memory utilization"
+                    sample.mark(
+                        "Consider using a numpy array instead of a list, for faster computations and optimized memory utilization"
+                    )
                 )
         except Exception:
             pass
@@ -106,40 +752,52 @@ class ObservableList(list):
         Returns:
             bool: True if the list can be converted, False otherwise.
         """
-        if all(isinstance(item, int) for item in self):
-            return True
-        elif all(isinstance(item, float) for item in self):
-            return True
-        elif all(isinstance(item, str) and len(item) == 1 for item in self):
-            try:
-                array.array("u", self)
-                return True
-            except ValueError:
-                return False
-        else:
-            return False
-
-    def check_list_to_set_conversion(self):
+        size = len(self)
+        return (
+            self.kinds[INT] == size
+            or self.kinds[FLOAT] == size
+            or self.kinds[CHAR] == size
+        )
+
+    def check_list_to_set_conversion(self, sample: Optional[ContentSample] = None):
         """
         Check if the list can be converted to a set.
 
+        Args:
+            sample (Optional[ContentSample]): The elements to check, the whole list by default.
+                Duplicates inside a sample are duplicates of the list, but a sample without
+                duplicates only suggests that the list has none.
+
         Returns:
             bool: True if the list can be converted, False otherwise.
         """
-        if self.get_list_dimension(self) == 1:
-            if len(self) == len(set(list(self))):
-                return True
+        if self.kinds[LIST]:
+            return False
+        items = (sample or self.get_content_sample(self)).items
+        try:
+            return len(items) == len(set(items))
+        except TypeError:
+            # Unhashable elements
             return False
 
     def check_set_instead_of_list(self):
-        if self.check_list_to_set_conversion():
-            if self.in_operator_used:
+        """
+        Existence checking is only worth a set when the lookups compared more elements than
+        building the set hashes.
+        """
+        sample = self.get_content_sample(self)
+        if self.check_list_to_set_conversion(sample):
+            if self.scanned > len(self):
                 self.message_handler.messages.append(
-                    "Consider using a set instead of a list, because of unique elements and element existence checking"
+                    sample.mark(
+                        "Consider using a set instead of a list, because of unique elements and element existence checking"
+                    )
                 )
             else:
                 self.message_handler.messages.append(
-                    "Consider using a set instead of a list, because of unique elements"
+                    sample.mark(
+                        "Consider using a set instead of a list, because of unique elements"
+                    )
                 )
 
     def check_Counter_insteaf_of_list(self):
@@ -148,6 +806,189 @@ class ObservableList(list):
                 "Consider using a collections.Counter, to count occurences of elements"
             )
 
+    def saving_array_instead_of_list(self) -> Saving:
+        """
+        The list and its elements, against an array.array of 8 byte numbers or 4 byte characters.
+        """
+        kind = next(
+            kind for kind in (INT, FLOAT, CHAR) if self.kinds[kind] == len(self)
+        )
+        footprint = get_footprint(self, self.get_content_sample(self))
+        array_size = sys.getsizeof(array.array("b")) + len(self) * ARRAY_ITEMSIZES[kind]
+        return Saving(nbytes=footprint - array_size)
+
+    def saving_numpy_array_instead_of_list(self) -> Saving:
+        """
+        The nested lists and their elements, against the numpy array built from them.
+        """
+        sample = self.get_content_sample(self)
+        arr = numpy.array(sample.items)
+        array_size = sys.getsizeof(numpy.empty(0)) + arr.nbytes * (
+            sample.size / len(sample.items)
+        )
+        return Saving(nbytes=get_footprint(self, sample) - array_size)
+
+    def saving_set_instead_of_list(self) -> Saving:
+        """
+        The lookups compared `scanned` elements of the list, a set does a single hash lookup
+        for each of them (count() of unique elements is a lookup too).
+        The elements are shared, only the containers differ in size.
+        """
+        sample = self.get_content_sample(self)
+        set_size = sys.getsizeof(set(sample.items)) * (
+            sample.size / max(len(sample.items), 1)
+        )
+        lookups = self.in_operator_used + self.count_ + self.index_
+        return Saving(
+            nbytes=sys.getsizeof(self) - set_size,
+            operations=max(0, self.scanned - lookups),
+        )
+
+    def saving_Counter_instead_of_list(self) -> Saving:
+        """
+        Every count() scans the list, a Counter is built with a single scan.
+        """
+        calls = self.count_
+        return Saving(operations=max(0, calls * len(self) - len(self) - calls))
+
+    def get_trial_data(self) -> List[Any]:
+        return list(self.get_content_sample(self).items[: VERIFIER.size])
+
+    def trial_array_instead_of_list(self) -> Trial:
+        """
+        Iterate over the elements of the list and of the array.array.
+        """
+        kind = next(
+            kind for kind in (INT, FLOAT, CHAR) if self.kinds[kind] == len(self)
+        )
+        typecode = ARRAY_TYPECODES[kind]
+
+        def replay(structure):
+            for _ in structure:
+                pass
+
+        data = self.get_trial_data()
+        return Trial(
+            data,
+            original=lambda items: items,
+            suggested=lambda items: array.array(typecode, items),
+            replay=replay,
+            elements=len(data),
+        )
+
+    def trial_set_instead_of_list(self) -> Trial:
+        """
+        The `in` checks of the list, looking up elements spread over the data.
+        """
+        data = self.get_trial_data()
+        lookups = min(max(self.in_operator_used, 1), MAX_REPLAYED_LOOKUPS)
+        # Spread over the data, an average lookup scans half of the list
+        probes = [
+            data[(2 * i + 1) * len(data) // (2 * lookups)] for i in range(lookups)
+        ]
+
+        def replay(structure):
+            for probe in probes:
+                probe in structure
+
+        return Trial(
+            data,
+            original=lambda items: items,
+            suggested=set,
+            replay=replay,
+            elements=len(data),
+        )
+
+    def check_deque_instead_of_list(self):
+        """
+        The list is used as a queue when elements get removed from (or inserted at) its front,
+        shifting more elements than the list holds in the end.
+        """
+        if (self.front_removed or self.front_inserted) and self.shifted > len(self):
+            self.message_handler.messages.append(
+                f"The list is used as a queue: {self.front_removed} removal(s) from and "
+                f"{self.front_inserted} insertion(s) at its front shifted {self.shifted} elements. "
+                "Consider using a collections.deque, which adds and removes elements at both ends without shifting"
+            )
+
+    def saving_deque_instead_of_list(self) -> Saving:
+        """
+        A deque doesn't shift any element, it does one operation per front removal/insertion.
+        """
+        front_operations = self.front_removed + self.front_inserted
+        return Saving(operations=max(0, self.shifted - front_operations))
+
+    def trial_deque_instead_of_list(self) -> Trial:
+        """
+        The front removals and insertions, keeping the size of the data (pop() and append()
+        at the end are cheap for both structures).
+        """
+        removals = min(self.front_removed, MAX_REPLAYED_LOOKUPS)
+        insertions = min(self.front_inserted, MAX_REPLAYED_LOOKUPS)
+
+        def replay(structure):
+            for _ in range(removals):
+                structure.append(structure[0])
+                del structure[0]
+            for _ in range(insertions):
+                structure.insert(0, structure.pop())
+
+        data = self.get_trial_data()
+        return Trial(
+            data,
+            original=lambda items: items,
+            suggested=collections.deque,
+            replay=replay,
+            elements=len(data),
+        )
+
+    def check_heapq_instead_of_list(self):
+        """
+        A list that gets scanned in full after every single insertion or removal, again and
+        again, is often searched for its smallest (or largest) element, which a heap keeps at
+        its front.
+        """
+        if self.rescans >= 2 and self.saving_heapq_instead_of_list().operations > len(
+            self
+        ):
+            self.message_handler.messages.append(
+                f"The list was scanned in full {self.rescans} times right after an element got added or removed ({self.rescanned} elements). "
+                "If you are looking for its smallest or largest element (min()/max()), consider keeping it as a heap with heapq.heappush and heapq.heappop"
+            )
+
+    def saving_heapq_instead_of_list(self) -> Saving:
+        """
+        A heap finds its smallest element with about log2(n) comparisons instead of a full scan.
+        """
+        return Saving(
+            operations=max(0, self.rescanned - self.rescans * len(self).bit_length())
+        )
+
+    def check_bisect_instead_of_sort(self):
+        """
+        Sorting a list again after adding a few elements, and looking up elements of a sorted
+        list, compare more elements than keeping the list sorted with bisect.
+        """
+        if self.bisect_saved > len(self):
+            self.message_handler.messages.append(
+                f"The list was sorted again {self.resorts} time(s) after adding elements and looked up {self.sorted_lookups} time(s) while sorted. "
+                "Consider keeping it sorted with bisect.insort and looking elements up with bisect.bisect_left"
+            )
+
+    def saving_bisect_instead_of_sort(self) -> Saving:
+        return Saving(operations=self.bisect_saved)
+
+    def get_growth(self) -> Optional[Growth]:
+        operations = self.appended + self.extended + self.inserted
+        if not operations:
+            return None
+        return Growth(
+            size=len(self),
+            peak=self.peak,
+            operations=operations,
+            queued=bool(self.front_removed or self.front_inserted),
+        )
+
     def check_tuple_instead_of_list(self):
         all__ = []
         for x in self:
@@ -162,23 +1003,8 @@ class ObservableList(list):
                 "Consider using a tuple since all elements seem to be constants, because the list was never modified"
             )
 
-    def run(self):
-        """
-        Only run checkers so that we offer a better running interface
-        for each observable.
-
-        Added checkers should be called here in sequence
-        Might need to refactor this to add priority levels and maybe
-        only give a single suggestion, but that needs way more specific analysis
-        """
-        self.check_array_instead_of_list()
-        self.check_numpy_array_instead_of_list()
-        self.check_set_instead_of_list()
-        self.check_Counter_insteaf_of_list()
-        self.message_handler.print_messages()
-
 
-class ObservableSet(set):
+class ObservableSet(Observable, set):
     """
     The ObservableSet is an enhanced version of a set that
     preserves the full original functionality of a set, but
@@ -192,42 +1018,96 @@ class ObservableSet(set):
         "removed",
         "added",
         "updated",
-        "message_handler",
-        "if_it_was_a_list",
+        "site_id_",
+        "message_handler_",
+        "insert_attempts",
+        "insertions",
+        "sketch",
     )
 
-    def __init__(self, iterable=None) -> None:
-        super().__init__(iterable)
-        self.poped: bool = False
-        self.removed: bool = False
-        self.added: bool = False
-        self.updated: bool = False
-        self.if_it_was_a_list: List[Any] = []
-
-        caller_frame = inspect.currentframe().f_back
-        line_number: int = caller_frame.f_lineno
-        file_path: str = caller_frame.f_globals["__file__"]
+    BASE_TYPE: ClassVar[type] = set
+    CHECKS: ClassVar[Tuple[str]] = (
+        "check_frozenset_instead_of_set",
+        "check_list_instead_of_set",
+    )
+    SAVINGS: ClassVar[Dict[str, str]] = {
+        "check_list_instead_of_set": "saving_list_instead_of_set",
+    }
+    ACCESS_COUNTERS: ClassVar[Tuple[str]] = (
+        "poped",
+        "removed",
+        "insert_attempts",
+    )
+    # Size of the KMinValues sketch that estimates how many distinct elements were offered
+    # to the set, even if they got removed in between (0 disables it). Without it, duplicates
+    # are the offered elements that were already in the set at the time.
+    SKETCH_SIZE: ClassVar[int] = int(os.environ.get("PYGGESTER_SET_SKETCH", "0"))
 
-        self.message_handler = MessageHandler(line_nr=line_number, file_path=file_path)
+    def __init__(self, iterable=None, *, site_id_: Optional[int] = None) -> None:
+        super().__init__(iterable)
+        # How many times each modification was called
+        self.poped: int = 0
+        self.removed: int = 0
+        self.added: int = 0
+        self.updated: int = 0
+        # Elements offered by add/update/|= and how many of them were new to the set
+        self.insert_attempts: int = 0
+        self.insertions: int = 0
+        self.sketch: Optional[KMinValues] = None
+        if self.SKETCH_SIZE:
+            self.sketch = KMinValues(self.SKETCH_SIZE)
+
+        self.init_site(site_id_)
 
     def add(self, element: Any) -> None:
+        size = len(self)
         super().add(element)
-        self.added = True
-        self.if_it_was_a_list.append(element)
+        self.added += 1
+        self.insert_attempts += 1
+        self.insertions += len(self) - size
+        if self.sketch is not None:
+            self.sketch.add(element)
 
     def pop(self) -> Any:
-        self.poped = True
+        self.poped += 1
         return super().pop()
 
     def remove(self, element: Any) -> None:
         super().remove(element)
-        self.removed = True
+        self.removed += 1
 
     def update(self, *others: Iterable) -> None:
+        others = [
+            other if isinstance(other, Sized) else list(other) for other in others
+        ]
+        size = len(self)
         super().update(*others)
-        self.updated = True
-        for elem_ in others:
-            self.if_it_was_a_list.append(elem_)
+        self.updated += 1
+        self.insert_attempts += sum(len(other) for other in others)
+        self.insertions += len(self) - size
+        if self.sketch is not None:
+            for other in others:
+                for element in other:
+                    self.sketch.add(element)
+
+    def __ior__(self, other: AbstractSet) -> "ObservableSet":
+        # Like set |=, which only takes sets (update() takes any iterable)
+        if not isinstance(other, (set, frozenset)):
+            return NotImplemented
+        self.update(other)
+        return self
+
+    def get_duplicate_rate(self) -> float:
+        """
+        Fraction of the offered elements that were duplicates.
+        """
+        if not self.insert_attempts:
+            return 0.0
+        if self.sketch is None:
+            duplicates = self.insert_attempts - self.insertions
+        else:
+            duplicates = max(0.0, self.insert_attempts - self.sketch.estimate())
+        return duplicates / self.insert_attempts
 
     def check_frozenset_instead_of_set(self):
         if not any([self.added, self.removed, self.updated, self.poped]):
@@ -238,22 +1118,26 @@ class ObservableSet(set):
     def check_list_instead_of_set(self):
         """
         The suggestion here is quite subjective.
+        More than 1 in 6 offered elements being duplicates, means that 20% more elements
+        were offered to the set than it kept.
         NOTE: Might need to refactor this one
         """
-        if len(self.if_it_was_a_list) > 1.2 * len(self) and any(
+        if self.get_duplicate_rate() > 1 / 6 and any(
             [self.added, self.removed, self.updated, self.poped]
         ):
             self.message_handler.messages.append(
                 "If you inteded to keep duplicates use a list instead, because we noticed a lot of duplicates entered the set"
             )
 
-    def run(self):
-        self.check_frozenset_instead_of_set()
-        self.check_list_instead_of_set()
-        self.message_handler.print_messages()
+    def saving_list_instead_of_set(self) -> Saving:
+        """
+        The set, against a list that keeps every offered element.
+        """
+        list_size = sys.getsizeof([]) + 8 * self.insert_attempts
+        return Saving(nbytes=sys.getsizeof(self) - list_size)
 
 
-class ObservableTuple(tuple):
+class ObservableTuple(Observable, tuple):
     """
     The ObservableTuple is an enhanced version of a tuple that
     preserves the full original functionality of a tuple, but
@@ -262,18 +1146,27 @@ class ObservableTuple(tuple):
     tuple.
     """
 
-    def __new__(cls, *args, **kwargs):
-        return super().__new__(cls, *args)
+    def __new__(cls, *args, site_id_: Optional[int] = None, **kwargs):
+        if site_id_ is not None and not SAMPLER.sample(site_id_):
+            return cls.unsampled(*args)
+        return tuple.__new__(cls, *args)
 
-    def __init__(self, *args: Any, **kwargs) -> None:
+    BASE_TYPE: ClassVar[type] = tuple
+    CHECKS: ClassVar[Tuple[str]] = (
+        "check_mutable_inside_tuple",
+        "check_tuple_multiplication",
+        "check_set_instead_of_tuple",
+    )
+    SAVINGS: ClassVar[Dict[str, str]] = {
+        "check_set_instead_of_tuple": "saving_set_instead_of_tuple",
+    }
+    ACCESS_COUNTERS: ClassVar[Tuple[str]] = ("mul_",)
+
+    def __init__(self, *args: Any, site_id_: Optional[int] = None, **kwargs) -> None:
         super().__init__()
         self.mul_: bool = False
 
-        caller_frame = inspect.currentframe().f_back
-        line_number: int = caller_frame.f_lineno
-        file_path: str = caller_frame.f_globals["__file__"]
-
-        self.message_handler = MessageHandler(line_nr=line_number, file_path=file_path)
+        self.init_site(site_id_)
 
     def __mul__(self, n: int) -> "ObservableTuple":
         self.mul_ = True
@@ -296,20 +1189,17 @@ class ObservableTuple(tuple):
         except Exception:
             pass
 
+    def saving_set_instead_of_tuple(self) -> Saving:
+        return Saving(nbytes=sys.getsizeof(self) - sys.getsizeof(set(self)))
+
     def check_tuple_multiplication(self) -> None:
         if self.mul_:
             self.message_handler.messages.append(
                 "You multipled the tuple with a scalar value. If you inteded to multiply each element by that value, use a numpy array instead of a tuple."
             )
 
-    def run(self) -> None:
-        self.check_mutable_inside_tuple()
-        self.check_tuple_multiplication()
-        self.check_set_instead_of_tuple()
-        self.message_handler.print_messages()
-
 
-class ObservableDict(dict):
+class ObservableDict(Observable, dict):
     """
     The ObservableDict is an enhanced version of a dict that
     preserves the full original functionality of a dict, but
@@ -328,54 +1218,79 @@ class ObservableDict(dict):
         "items_",
         "clear_",
         "values_",
-        "message_handler",
+        "site_id_",
+        "message_handler_",
+        "__weakref__",
     )
 
-    def __init__(self, *args, **kwargs) -> None:
+    BASE_TYPE: ClassVar[type] = dict
+    CHECKS: ClassVar[Tuple[str]] = (
+        "check_Counter_instead_of_dict",
+        "check_dict_get_method",
+        "check_list_instead_of_dict",
+    )
+    SAVINGS: ClassVar[Dict[str, str]] = {
+        "check_list_instead_of_dict": "saving_list_instead_of_dict",
+    }
+    VERIFICATIONS: ClassVar[Dict[str, str]] = {
+        "check_Counter_instead_of_dict": "trial_Counter_instead_of_dict",
+    }
+    ACCESS_COUNTERS: ClassVar[Tuple[str]] = (
+        "keys_",
+        "update_",
+        "setitem_",
+        "delitem_",
+        "getitem_",
+        "pop_",
+        "items_",
+        "clear_",
+        "values_",
+    )
+
+    def __init__(self, *args, site_id_: Optional[int] = None, **kwargs) -> None:
         super().__init__(*args, **kwargs)
-        self.keys_: bool = False
-        self.update_: bool = False
-        self.setitem_: bool = False
-        self.delitem_: bool = False
-        self.getitem_: bool = False
-        self.pop_: bool = False
-        self.items_: bool = False
-        self.clear_: bool = False
-        self.values_: bool = False
-
-        caller_frame = inspect.currentframe().f_back
-        line_number: int = caller_frame.f_lineno
-        file_path: str = caller_frame.f_globals["__file__"]
-
-        self.message_handler = MessageHandler(line_nr=line_number, file_path=file_path)
+        # How many times each method was called
+        self.keys_: int = 0
+        self.update_: int = 0
+        self.setitem_: int = 0
+        self.delitem_: int = 0
+        self.getitem_: int = 0
+        self.pop_: int = 0
+        self.items_: int = 0
+        self.clear_: int = 0
+        self.values_: int = 0
+
+        self.init_site(site_id_)
 
     def __setitem__(self, key, value) -> None:
         super().__setitem__(key, value)
-        self.setitem_ = True
+        self.setitem_ += 1
 
     def __delitem__(self, key) -> None:
         super().__delitem__(key)
-        self.delitem_ = True
+        self.delitem_ += 1
 
     def __getitem__(self, __key: Any) -> Any:
-        self.getitem_ = True
+        self.getitem_ += 1
         return super().__getitem__(__key)
 
     def clear(self) -> None:
         super().clear()
-        self.clear_ = True
+        self.clear_ += 1
 
-    def pop(self, key, default=None) -> "ObservableDict":
-        result = super().pop(key, default)
+    def pop(self, key, *default) -> "ObservableDict":
+        result = super().pop(key, *default)
+        self.pop_ += 1
         return result
 
     def popitem(self) -> "ObservableDict":
         result = super().popitem()
+        self.pop_ += 1
         return result
 
     def update(self, *args, **kwargs) -> None:
         super().update(*args, **kwargs)
-        self.update_ = True
+        self.update_ += 1
 
     def setdefault(self, key, default=None) -> "ObservableDict":
         result = super().setdefault(key, default)
@@ -386,23 +1301,49 @@ class ObservableDict(dict):
         return result
 
     def keys(self) -> dict_keys:
-        self.keys_ = True
+        self.keys_ += 1
         return super().keys()
 
     def values(self) -> dict_values:
-        self.values_ = True
+        self.values_ += 1
         return super().values()
 
     def items(self) -> dict_items:
-        self.items_ = True
+        self.items_ += 1
         return super().items()
 
+    def get_schema(self) -> Optional[Schema]:
+        return get_schema(self, mutated=bool(self.setitem_ or self.update_))
+
     def check_Counter_instead_of_dict(self) -> None:
-        if all([True for value in self.values() if isinstance(value, int)]):
+        # dict.values, so the check itself isn't recorded as a usage of values()
+        sample = self.get_content_sample(dict.values(self))
+        if all(isinstance(value, int) for value in sample.items):
             self.message_handler.messages.append(
-                "If you are using this dict to store occurences of elements, consider using a collections.Counter"
+                sample.mark(
+                    "If you are using this dict to store occurences of elements, consider using a collections.Counter"
+                )
             )
 
+    def trial_Counter_instead_of_dict(self) -> Trial:
+        """
+        Increment the count of every key, in the dict and in the Counter.
+        """
+        data = dict(self.get_content_sample(dict.items(self)).items[: VERIFIER.size])
+        keys = list(data)
+
+        def replay(structure):
+            for key in keys:
+                structure[key] += 1
+
+        return Trial(
+            data,
+            original=lambda items: items,
+            suggested=collections.Counter,
+            replay=replay,
+            elements=len(data),
+        )
+
     def check_dict_get_method(self) -> None:
         if self.getitem_:
             self.message_handler.messages.append(
@@ -420,125 +1361,275 @@ class ObservableDict(dict):
                 "It seems like you never used this dict for anything otherthan somehow using the values, use a list/array"
             )
 
-    def run(self) -> None:
-        self.check_Counter_instead_of_dict()
-        self.check_dict_get_method()
-        self.check_list_instead_of_dict()
-        self.message_handler.print_messages()
+    def saving_list_instead_of_dict(self) -> Saving:
+        """
+        The dict and its keys, against a list of the values.
+        """
+        footprint = get_footprint(self, self.get_content_sample(dict.keys(self)))
+        return Saving(nbytes=footprint - (sys.getsizeof([]) + 8 * len(self)))
 
 
-class ObservableNumpyArray:
+class ObservableNumpyArray(Observable):
     """
     The ObservableNumpyArray is a numpy analyzer that takes the declared numpy array
     and does internal attribute and value checkings for potential improvement suggestions.
+
+    The transformations pass `rebuilt_=True` when the array was rebuilt from the previous value of
+    its variable (`arr = np.append(arr, x)`), so its site can suggest preallocation.
     """
 
-    __slots__: Tuple[str] = ("arr__", "message_handler")
+    __slots__: Tuple[str] = (
+        "arr__",
+        "stats_",
+        "rebuilt_",
+        "site_id_",
+        "message_handler_",
+        "__weakref__",
+    )
 
-    def __init__(self, arr__) -> None:
+    CHECKS: ClassVar[Tuple[str]] = (
+        "check_array_data_type",
+        "check_array_sparsity",
+        "check_for_categorical_data",
+        "check_for_constant_values",
+        "check_for_nan_values",
+        "check_for_monotonicity",
+        "check_for_symmetry",
+    )
+    SAVINGS: ClassVar[Dict[str, str]] = {
+        "check_array_data_type": "saving_array_data_type",
+        "check_array_sparsity": "saving_array_sparsity",
+        "check_for_categorical_data": "saving_categorical_data",
+        "check_for_constant_values": "saving_constant_values",
+        "check_for_symmetry": "saving_symmetry",
+    }
+    VERIFICATIONS: ClassVar[Dict[str, str]] = {
+        "check_array_data_type": "trial_array_data_type",
+    }
+
+    def __init__(
+        self, arr__, *, site_id_: Optional[int] = None, rebuilt_: bool = False
+    ) -> None:
         self.arr__ = arr__
+        self.stats_: Optional[ArrayStats] = None
+        self.rebuilt_ = rebuilt_
+
+        self.init_site(site_id_)
 
-        caller_frame = inspect.currentframe().f_back
-        line_number: int = caller_frame.f_lineno
-        file_path: str = caller_frame.f_globals["__file__"]
+    def get_size(self) -> Optional[int]:
+        return self.arr__.size
 
-        self.message_handler = MessageHandler(line_nr=line_number, file_path=file_path)
+    def get_nbytes(self) -> int:
+        return self.arr__.nbytes
+
+    def get_cost(self) -> int:
+        return self.arr__.size
+
+    def get_growth(self) -> Optional[Growth]:
+        if not self.rebuilt_:
+            return None
+        return Growth(
+            size=self.arr__.size, peak=self.arr__.size, operations=1, rebuilt=True
+        )
+
+    @property
+    def stats(self) -> Optional[ArrayStats]:
+        """
+        Statistics the checks are answered from, computed by a single chunked pass over the array
+        (see pyggester.array_stats). None for empty arrays, which get no suggestions.
+        """
+        if self.stats_ is None:
+            self.stats_ = compute_array_stats(self.arr__)
+        return self.stats_
+
+    def evaluate(self) -> List[Tuple[str, str]]:
+        # The array might have changed since the previous evaluation
+        self.stats_ = None
+        return super().evaluate()
+
+    def get_min_dtype(self) -> Optional[numpy.dtype]:
+        """
+        Smallest integer dtype that holds every value of an integer array.
+        """
+        stats = self.stats
+        if stats is None or self.arr__.dtype.kind not in "iu":
+            return None
+        if stats.min >= 0:
+            return numpy.min_scalar_type(stats.max)
+        return next(
+            numpy.dtype(dtype)
+            for dtype in (numpy.int8, numpy.int16, numpy.int32, numpy.int64)
+            if numpy.iinfo(dtype).min <= stats.min
+            and stats.max <= numpy.iinfo(dtype).max
+        )
 
     def check_array_data_type(self) -> None:
         """ """
         current_dtype = self.arr__.dtype
-        min_dtype = numpy.min_scalar_type(numpy.max(self.arr__))
-        max_number = numpy.max(self.arr__)
+        min_dtype = self.get_min_dtype()
+        if min_dtype is None:
+            return
+        max_number = self.stats.max
         if current_dtype != min_dtype:
             self.message_handler.messages.append(
                 f"Array was initiated with {current_dtype} integers, but values do not exceed {max_number}. Consider using {min_dtype} for optimization."
             )
 
+    def saving_array_data_type(self) -> Saving:
+        return Saving(
+            nbytes=self.arr__.nbytes - self.arr__.size * self.get_min_dtype().itemsize
+        )
+
+    def trial_array_data_type(self) -> Trial:
+        """
+        Sum the elements of the array and of its downcast copy.
+        """
+        min_dtype = self.get_min_dtype()
+        data = numpy.array(self.arr__.reshape(-1)[: VERIFIER.size])
+        return Trial(
+            data,
+            original=lambda arr: arr,
+            suggested=lambda arr: arr.astype(min_dtype),
+            replay=numpy.sum,
+            elements=data.size,
+        )
+
+    def saving_array_sparsity(self) -> Saving:
+        """
+        Against a COO sparse array: the non zero values and their coordinates (int64).
+        """
+        arr = self.arr__
+        sparse_size = self.stats.nonzero * (arr.itemsize + 8 * arr.ndim)
+        return Saving(nbytes=arr.nbytes - sparse_size)
+
+    def saving_categorical_data(self) -> Saving:
+        """
+        Against the smallest integer codes plus one copy of every category.
+        """
+        arr, distinct = self.arr__, self.stats.distinct
+        codes_itemsize = numpy.min_scalar_type(int(distinct)).itemsize
+        return Saving(
+            nbytes=arr.nbytes - (arr.size * codes_itemsize + distinct * arr.itemsize)
+        )
+
+    def saving_constant_values(self) -> Saving:
+        return Saving(nbytes=self.arr__.nbytes - self.arr__.itemsize)
+
+    def saving_symmetry(self) -> Saving:
+        """
+        Against packed storage of the upper triangle.
+        """
+        n = len(self.arr__)
+        return Saving(nbytes=self.arr__.nbytes - n * (n + 1) // 2 * self.arr__.itemsize)
+
     def check_array_sparsity(self, threshold: float = 0.8) -> None:
         """Suggests using sparse arrays for highly sparse data to save memory."""
-
-        sparsity = 1.0 - numpy.count_nonzero(self.arr__) / float(self.arr__.size)
+        stats = self.stats
+        # scipy.sparse only handles numeric arrays of up to 2 dimensions
+        if stats is None or self.arr__.ndim > 2 or self.arr__.dtype.kind not in "biufc":
+            return
+        sparsity = 1.0 - stats.nonzero / float(stats.size)
         if sparsity > threshold:
-            try:
-                _ = sp.csr_matrix(self.arr__)
-                self.message_handler.messages.append(
-                    f"The array is highly sparse (sparsity: {sparsity:.2%}). Consider using a sparse array representation for memory efficiency."
-                )
-            except Exception:
-                pass
+            self.message_handler.messages.append(
+                f"The array is highly sparse (sparsity: {sparsity:.2%}). Consider using a sparse array representation for memory efficiency."
+            )
 
     def check_for_nan_values(self) -> None:
         """Suggests using masked arrays or handling NaN values."""
 
-        if numpy.isnan(self.arr__).any():
-            try:
-                _ = numpy.ma.masked_array(self.arr__, mask=numpy.isnan(self.arr__))
-                self.message_handler.messages.append(
-                    "The array contains NaN values. Consider using masked arrays or handling NaN values appropriately."
-                )
-            except Exception:
-                pass
+        if self.stats is not None and self.stats.nan:
+            self.message_handler.messages.append(
+                "The array contains NaN values. Consider using masked arrays or handling NaN values appropriately."
+            )
 
     def check_for_monotonicity(self) -> None:
         """Suggests using specialized algorithms or data structures for monotonic arrays."""
-
-        if numpy.all(numpy.diff(self.arr__) >= 0) or numpy.all(
-            numpy.diff(self.arr__) <= 0
-        ):
+        stats = self.stats
+        if stats is not None and (stats.increasing or stats.decreasing):
             self.message_handler.messages.append(
                 "The array is monotonic. Consider using specialized algorithms or data structures for monotonic arrays."
             )
 
     def check_for_categorical_data(self) -> None:
         """Suggests using categorical data types for arrays with a small number of unique values."""
-
-        unique_values_count = len(numpy.unique(self.arr__))
-        if unique_values_count < len(self.arr__) / 2:
+        stats = self.stats
+        if stats is None or stats.distinct is None:
+            return
+        if stats.distinct < stats.size / 2:
+            unique_values_count = (
+                int(stats.distinct)
+                if stats.distinct_exact
+                else f"~{stats.distinct:.0f}"
+            )
             self.message_handler.messages.append(
                 f"The array contains categorical data with {unique_values_count} unique values. Consider using categorical data types for efficiency, like pd.Categorical()"
             )
 
     def check_for_symmetry(self) -> None:
         """Suggests using specialized algorithms or data structures for symmetric arrays."""
-        if numpy.array_equal(self.arr__, self.arr__.T):
+        if self.stats is not None and self.stats.symmetric:
             self.message_handler.messages.append(
                 "The array is symmetric. Consider using specialized algorithms to operate on symmetric arrays, for example functions from scipy"
             )
 
     def check_for_constant_values(self) -> None:
         """Suggests using a single value or a constant data type if all elements are the same."""
-        if numpy.all(self.arr__ == self.arr__[0]):
+        if self.stats is not None and self.stats.constant:
             self.message_handler.messages.append(
                 "All elements in the array are the same. Consider using a single value, a constant or collections.Counter for memory efficiency."
             )
 
-    def run(self) -> None:
-        self.check_array_data_type()
-        self.check_array_sparsity()
-        self.check_for_categorical_data()
-        self.check_for_constant_values()
-        self.check_for_nan_values()
-        self.check_for_monotonicity()
-        self.check_for_symmetry()
-        self.message_handler.print_messages()
-
 
-class ObservablePandasDataFrame:
+class ObservablePandasDataFrame(Observable):
     """
     The ObservablePandasDataFrame is a Pandas DataFrame analyzer that takes the declared DataFrame
     and does internal attribute and value checkings for potential improvement suggestions.
     """
 
-    __slots__ = ("df__", "message_handler")
+    __slots__ = ("df__", "site_id_", "message_handler_", "__weakref__")
 
-    def __init__(self, df__) -> None:
+    CHECKS: ClassVar[Tuple[str]] = (
+        "check_for_constant_columns",
+        "check_for_duplicate_rows",
+        "check_for_missing_values",
+        "check_numpy_instead_of_dataframe",
+        "check_series_insteafd_of_dataframe",
+    )
+    SAVINGS: ClassVar[Dict[str, str]] = {
+        "check_for_constant_columns": "saving_constant_columns",
+        "check_for_duplicate_rows": "saving_duplicate_rows",
+        "check_numpy_instead_of_dataframe": "saving_numpy_instead_of_dataframe",
+    }
+
+    def __init__(self, df__, *, site_id_: Optional[int] = None) -> None:
         self.df__ = df__
 
-        caller_frame = inspect.currentframe().f_back
-        line_number: int = caller_frame.f_lineno
-        file_path: str = caller_frame.f_globals["__file__"]
+        self.init_site(site_id_)
+
+    def get_size(self) -> Optional[int]:
+        return len(self.df__.index)
+
+    def get_nbytes(self) -> int:
+        return int(self.df__.memory_usage(index=True).sum())
 
-        self.message_handler = MessageHandler(line_nr=line_number, file_path=file_path)
+    def get_cost(self) -> int:
+        return self.df__.size
+
+    def saving_constant_columns(self) -> Saving:
+        constant_columns = self.df__.columns[self.df__.nunique() == 1]
+        return Saving(
+            nbytes=int(self.df__[constant_columns].memory_usage(index=False).sum())
+        )
+
+    def saving_duplicate_rows(self) -> Saving:
+        duplicates = int(self.df__.duplicated().sum())
+        return Saving(nbytes=self.get_nbytes() * duplicates / len(self.df__.index))
+
+    def saving_numpy_instead_of_dataframe(self) -> Saving:
+        """
+        The index, which a numpy array doesn't need.
+        """
+        return Saving(nbytes=int(self.df__.memory_usage(index=True)["Index"]))
 
     def check_for_missing_values(self) -> None:
         """Suggests handling missing values appropriately."""
@@ -579,16 +1670,8 @@ class ObservablePandasDataFrame:
                 "Consider using a NumPy array or a specialized data structure if you have a large number of rows and a small number of columns."
             )
 
-    def run(self) -> None:
-        self.check_for_constant_columns()
-        self.check_for_duplicate_rows()
-        self.check_for_missing_values()
-        self.check_numpy_instead_of_dataframe()
-        self.check_series_insteafd_of_dataframe()
-        self.message_handler.print_messages()
-
 
-class ObservableNamedTuple:
+class ObservableNamedTuple(Observable):
     """
     The ObservableNamedTuple is an enhanced version of a namedtuple that
     preserves the full original functionality of a namedtuple, but
@@ -597,16 +1680,23 @@ class ObservableNamedTuple:
     namedtuple.
     """
 
-    __slots__: Tuple[set] = ("namedtuple__", "message_handler")
+    __slots__: Tuple[set] = (
+        "namedtuple__",
+        "site_id_",
+        "message_handler_",
+        "__weakref__",
+    )
+
+    CHECKS: ClassVar[Tuple[str]] = (
+        "check_for_ignoring_type_annotations",
+        "check_for_ignoring_namedtuple_advantages",
+        "check_for_excessive_nesting",
+    )
 
-    def __init__(self, namedtuple__) -> None:
+    def __init__(self, namedtuple__, *, site_id_: Optional[int] = None) -> None:
         self.namedtuple__ = namedtuple__
 
-        caller_frame = inspect.currentframe().f_back
-        line_number: int = caller_frame.f_lineno
-        file_path: str = caller_frame.f_globals["__file__"]
-
-        self.message_handler = MessageHandler(line_nr=line_number, file_path=file_path)
+        self.init_site(site_id_)
 
     def check_for_excessive_nesting(self) -> None:
         """Suggests avoiding excessive nesting of namedtuples."""
@@ -633,9 +1723,3 @@ class ObservableNamedTuple:
             self.message_handler.messages.append(
                 "Consider using namedtuples for simpler data structures with fewer fields for better readability."
             )
-
-    def run(self):
-        self.check_for_ignoring_type_annotations()
-        self.check_for_ignoring_namedtuple_advantages()
-        self.check_for_excessive_nesting()
-        self.message_handler.print_messages()
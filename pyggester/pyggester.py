@@ -1,12 +1,93 @@
 import ast
 import os
 import shutil
-from typing import List, Tuple
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, NamedTuple, Optional, Tuple
 import pathlib
-from pyggester.observable_transformations import (
-    apply_observable_collector_transformations,
-)
-from pyggester.text_formatters import custom_print
+from pyggester.observable_transformations import emit_tree, transform_tree
+from pyggester.text_formatters import custom_print, print_transform_profiles
+from pyggester.transform_cache import CACHE_DIR_NAME, TransformCache
+
+
+class TransformProfile(NamedTuple):
+    """
+    Time (in seconds) spent on each step of transforming a single file.
+    A file restored from the transformation cache is only read and written.
+    """
+
+    file_path: pathlib.Path
+    read: float = 0.0
+    parse: float = 0.0
+    transform: float = 0.0
+    emit: float = 0.0
+    write: float = 0.0
+    cached: bool = False
+
+    @property
+    def total(self) -> float:
+        return self.read + self.parse + self.transform + self.emit + self.write
+
+
+def transform_file(
+    file_path: pathlib.Path,
+    transformed_file_path: pathlib.Path,
+    run_observable: bool,
+    cache_dir: Optional[pathlib.Path] = None,
+) -> TransformProfile:
+    """
+    Transforms a single file and writes the result straight to `transformed_file_path`.
+
+    This is a module level function (instead of a method), so that it can be pickled and
+    sent to the worker processes used by `pyggest transform --jobs N`.
+
+    When a `cache_dir` is given, files whose content didn't change since the last
+    transformation are not transformed again, their transformed code comes from the cache.
+
+    Args:
+        file_path (pathlib.Path): The path to the file to be transformed.
+        transformed_file_path (pathlib.Path): Where the transformed code should be written.
+        run_observable (bool): Indicates whether to run observables in the file.
+        cache_dir (Optional[pathlib.Path]): Directory of the transformation cache.
+
+    Returns:
+        TransformProfile: Timings of each step, shown by `pyggest transform --profile`.
+    """
+    start = time.perf_counter()
+    code = file_path.read_text()
+    cache = key = None
+    if cache_dir is not None:
+        cache = TransformCache(cache_dir)
+        key = cache.key(code, run_observable)
+    read_done = time.perf_counter()
+
+    if cache is not None and cache.restore(key, transformed_file_path):
+        return TransformProfile(
+            file_path,
+            read=read_done - start,
+            write=time.perf_counter() - read_done,
+            cached=True,
+        )
+
+    tree = ast.parse(code)
+    parse_done = time.perf_counter()
+    tree = transform_tree(tree, run_observables=run_observable)
+    transform_done = time.perf_counter()
+    transformed_code = emit_tree(tree)
+    emit_done = time.perf_counter()
+    transformed_file_path.write_text(transformed_code)
+    if cache is not None:
+        cache.put(key, transformed_code)
+    write_done = time.perf_counter()
+
+    return TransformProfile(
+        file_path,
+        read=read_done - start,
+        parse=parse_done - read_done,
+        transform=transform_done - parse_done,
+        emit=emit_done - transform_done,
+        write=write_done - emit_done,
+    )
 
 
 class PyggesterDynamic:
@@ -16,9 +97,17 @@ class PyggesterDynamic:
 
     Args:
         path_ (str): The path to the file or directory to be transformed.
+        jobs_ (int): Number of worker processes used to transform directories.
+            1 (default) transforms every file serially, 0 uses one process per cpu.
+        cache_ (bool): Whether unchanged files are taken from the transformation cache.
+        profile_ (bool): Whether a per-file breakdown of the transformation time gets printed.
 
     Attributes:
         path_ (pathlib.Path): The absolute path to the file or directory.
+        jobs_ (int): Number of worker processes used to transform directories.
+        cache_dir (Optional[pathlib.Path]): Directory of the transformation cache, stored
+            next to the transformed output. None if caching is disabled.
+        profile_ (bool): Whether a per-file breakdown of the transformation time gets printed.
 
     Methods:
         run(): Runs the transformation process based on the type of path provided.
@@ -26,10 +115,15 @@ class PyggesterDynamic:
         _transform_directory(): Transforms all files in a directory.
     """
 
-    __slots__ = ("path_",)
+    __slots__ = ("path_", "jobs_", "cache_dir", "profile_")
 
-    def __init__(self, path_: str) -> None:
+    def __init__(
+        self, path_: str, jobs_: int = 1, cache_: bool = True, profile_: bool = False
+    ) -> None:
         self.path_ = pathlib.Path(path_).absolute()
+        self.jobs_ = jobs_ or os.cpu_count() or 1
+        self.cache_dir = self.path_.parent / CACHE_DIR_NAME if cache_ else None
+        self.profile_ = profile_
 
     def run(self):
         """
@@ -39,13 +133,20 @@ class PyggesterDynamic:
             raise FileNotFoundError(f"The path '{self.path_}' does not exist.")
 
         if self.path_.is_file():
-            self._transform_file(self.path_, run_observable=True)
+            profiles = [self._transform_file(self.path_, run_observable=True)]
             custom_print("File transformed successfully!", border_style="green")
         elif self.path_.is_dir():
-            self._transform_directory()
+            profiles = self._transform_directory()
             custom_print("Directory transformed successfully!", border_style="green")
+        else:
+            return
+
+        if self.profile_:
+            print_transform_profiles(profiles, root=self.path_.parent)
 
-    def _transform_file(self, file_path: pathlib.Path, run_observable: bool) -> None:
+    def _transform_file(
+        self, file_path: pathlib.Path, run_observable: bool
+    ) -> TransformProfile:
         """
         Transforms a single file by applying observable collector transformations.
 
@@ -61,18 +162,16 @@ class PyggesterDynamic:
             run_observable (bool): Indicates whether to run observables in the file.
 
         Returns:
-            None
+            TransformProfile: Timings of each transformation step.
         """
-        code = file_path.read_text()
-        transformed_code = apply_observable_collector_transformations(
-            ast.parse(code), run_observables=run_observable
-        )
         transformed_file_path = (
             file_path.parent / f"{file_path.stem}_transformed{file_path.suffix}"
         )
-        transformed_file_path.write_text(transformed_code)
+        return transform_file(
+            file_path, transformed_file_path, run_observable, cache_dir=self.cache_dir
+        )
 
-    def _transform_directory(self) -> None:
+    def _transform_directory(self) -> List[TransformProfile]:
         """
         Transforms all files in a directory.
 
@@ -84,14 +183,18 @@ class PyggesterDynamic:
         the file is considered as the main file and is transformed with the `run_observable` flag set to True.
         Otherwise, the file is transformed with the `run_observable` flag set to False.
 
-        The transformed file is then moved to the corresponding location in the transformed directory, while
-        preserving the directory structure.
+        The transformed file is written straight to the corresponding location in the transformed directory,
+        while preserving the directory structure. Non python files are copied as they are.
+        Python files that didn't change since the last run are restored from the transformation cache.
+
+        When `self.jobs_` is bigger than 1, python files are transformed in a pool of worker processes.
+        Every file is transformed independently, so the output is identical to the serial run.
 
         Args:
             None
 
         Returns:
-            None
+            List[TransformProfile]: Timings of each transformed python file, in walk order.
         """
         main_file_name = input("Enter the name of the main file: ")
         main_file_path = self.path_ / main_file_name
@@ -102,33 +205,45 @@ class PyggesterDynamic:
         transformed_dir_path = self.path_.parent / f"{self.path_.name}_transformed"
         os.makedirs(transformed_dir_path, exist_ok=True)
 
-        excluded_dirs = {"__pycache__", ".git", ".venv"}
+        excluded_dirs = {"__pycache__", ".git", ".venv", CACHE_DIR_NAME}
+        transformations: List[
+            Tuple[pathlib.Path, pathlib.Path, bool, Optional[pathlib.Path]]
+        ] = []
 
         for root, dirs, files in os.walk(self.path_):
             dirs[:] = [d for d in dirs if d not in excluded_dirs]
+            relative_root = pathlib.Path(root).relative_to(self.path_)
             for dir_name in dirs:
-                os.makedirs(transformed_dir_path / dir_name, exist_ok=True)
+                os.makedirs(
+                    transformed_dir_path / relative_root / dir_name, exist_ok=True
+                )
             for file_name in files:
+                file_path = pathlib.Path(root) / file_name
+                transformed_file_path = transformed_dir_path / relative_root / file_name
                 if file_name.endswith(".py"):
-                    file_path = pathlib.Path(root) / file_name
                     run_observable = file_path == main_file_path
-                    self._transform_file(file_path, run_observable=run_observable)
-
-                    relative_path = file_path.relative_to(self.path_)
-                    transformed_file_path = transformed_dir_path / relative_path
-                    transformed_file_path.parent.mkdir(parents=True, exist_ok=True)
-                    shutil.move(
-                        file_path.with_name(
-                            f"{file_path.stem}_transformed{file_path.suffix}"
-                        ),
-                        transformed_file_path,
+                    transformations.append(
+                        (
+                            file_path,
+                            transformed_file_path,
+                            run_observable,
+                            self.cache_dir,
+                        )
                     )
                 else:
-                    file_path = pathlib.Path(root) / file_name
-                    relative_path = file_path.relative_to(self.path_)
-                    transformed_file_path = transformed_dir_path / relative_path
-                    transformed_file_path.parent.mkdir(parents=True, exist_ok=True)
                     shutil.copy(
                         file_path,
                         transformed_file_path,
                     )
+
+        if self.jobs_ > 1 and len(transformations) > 1:
+            with ProcessPoolExecutor(max_workers=self.jobs_) as executor:
+                # Consuming the results re-raises any exception from the workers
+                return list(
+                    executor.map(
+                        transform_file,
+                        *zip(*transformations),
+                        chunksize=max(1, len(transformations) // (self.jobs_ * 4)),
+                    )
+                )
+        return [transform_file(*transformation) for transformation in transformations]
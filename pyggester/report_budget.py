@@ -0,0 +1,98 @@
+"""
+Time and memory budget of the report made when a transformed program exits.
+
+Evaluating the observables that are still alive at exit can take long on big programs, so
+the report can be given a budget with the PYGGESTER_REPORT_BUDGET environment variable,
+for example PYGGESTER_REPORT_BUDGET=5s,512MB:
+
+    <number>s / ms / m      wall clock time the report may take
+    <number>KB / MB / GB    memory the process may grow by while the report runs
+
+The collector evaluates the observables with the highest estimated impact first and stops once
+the budget is spent, reporting which observables were skipped.
+"""
+
+import os
+import re
+import time
+from typing import List, NamedTuple, Optional, Tuple
+from pyggester.helpers import parse_size
+
+__all__: List[str] = ["ReportBudget", "BudgetTracker", "parse_budget", "get_rss"]
+
+REPORT_BUDGET_ENV: str = "PYGGESTER_REPORT_BUDGET"
+
+TIME_UNITS = {"ms": 0.001, "s": 1, "m": 60}
+
+
+class ReportBudget(NamedTuple):
+    seconds: Optional[float] = None
+    memory: Optional[int] = None
+
+    def __str__(self) -> str:
+        limits = []
+        if self.seconds is not None:
+            limits.append(f"{self.seconds:g}s")
+        if self.memory is not None:
+            limits.append(f"{self.memory / (1 << 20):g}MB")
+        return ", ".join(limits) or "unlimited"
+
+
+def parse_budget(spec: str) -> ReportBudget:
+    """
+    Parse a budget like '5s,512MB'. Either limit can be left out, an empty spec has no limit.
+    """
+    seconds = memory = None
+    for limit in filter(None, (limit.strip() for limit in spec.split(","))):
+        match = re.fullmatch(r"(\d+(?:\.\d*)?)\s*(ms|s|m)", limit, re.IGNORECASE)
+        if match is not None:
+            seconds = float(match.group(1)) * TIME_UNITS[match.group(2).lower()]
+            continue
+        try:
+            memory = parse_size(limit)
+        except ValueError:
+            raise ValueError(
+                f"Invalid report budget '{limit}', use for example 5s,512MB."
+            ) from None
+    return ReportBudget(seconds, memory)
+
+
+def get_rss() -> Optional[int]:
+    """
+    Resident memory of the process in bytes, None where /proc isn't available.
+    """
+    try:
+        with open("/proc/self/statm", "rb") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class BudgetTracker:
+    """
+    Tracks how much of a budget the report has spent since the tracker was created.
+    """
+
+    __slots__: Tuple[str] = ("budget", "start", "start_rss", "reason")
+
+    def __init__(self, budget: ReportBudget) -> None:
+        self.budget = budget
+        self.start = time.perf_counter()
+        self.start_rss = get_rss() if budget.memory is not None else None
+        # What ran out, once something did
+        self.reason: Optional[str] = None
+
+    def exhausted(self) -> bool:
+        if self.reason is not None:
+            return True
+        budget = self.budget
+        if (
+            budget.seconds is not None
+            and time.perf_counter() - self.start >= budget.seconds
+        ):
+            self.reason = "time"
+        elif budget.memory is not None and self.start_rss is not None:
+            rss = get_rss()
+            if rss is not None and rss - self.start_rss >= budget.memory:
+                self.reason = "memory"
+        return self.reason is not None
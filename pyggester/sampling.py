@@ -0,0 +1,328 @@
+"""
+Sampling instrumentation mode.
+
+Instead of observing every container, only a sample of the allocations of each site is observed.
+The decision is made at the allocation site (in the observable's constructor), so unsampled
+containers stay plain list/dict/set/tuple objects without any instrumentation overhead.
+Reports extrapolate the results of the sampled instances to every allocation of the site,
+with a confidence interval.
+
+Sampling is configured with the PYGGESTER_SAMPLING environment variable (or `pyggest run --sample`):
+
+    every=N         observe every Nth allocation of each site
+    fraction=F      observe a random fraction F (0 < F <= 1) of the allocations of each site
+    max=K           observe at most K instances per site
+
+Options can be combined with commas (every=10,max=100). Per site policies follow the default one,
+separated by semicolons, as <policy>@<file glob>[:<line>], for example:
+
+    PYGGESTER_SAMPLING="every=10;max=5@*/handlers.py:42;fraction=0.5@*/jobs/*"
+
+Content sampling is the other half of this module: checks that look at every element of a
+container (is it unique, can it become a numpy array, are all values ints...) get a bounded,
+deterministic random sample of the elements, plus the exact length, once the container holds more
+than a threshold number of elements (ContentSampler). Suggestions made from a sample are marked as
+such. It is configured with the PYGGESTER_CONTENT_SAMPLING environment variable:
+
+    threshold=N     containers with more than N elements get sampled (100000 by default)
+    size=K          number of sampled elements (10000 by default)
+"""
+
+import fnmatch
+import itertools
+import math
+import os
+import random
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+from pyggester.sites import get_site
+
+__all__: List[str] = [
+    "SamplingPolicy",
+    "Sampler",
+    "SAMPLER",
+    "parse_policy",
+    "configure",
+    "wilson_interval",
+    "ContentSample",
+    "ContentSampler",
+    "CONTENT_SAMPLER",
+    "configure_content_sampling",
+]
+
+SAMPLING_ENV: str = "PYGGESTER_SAMPLING"
+CONTENT_SAMPLING_ENV: str = "PYGGESTER_CONTENT_SAMPLING"
+CONTENT_THRESHOLD: int = 100_000
+CONTENT_SAMPLE_SIZE: int = 10_000
+_MISSING = object()
+
+
+class SamplingPolicy(NamedTuple):
+    every: int = 1
+    fraction: float = 1.0
+    max_instances: Optional[int] = None
+
+
+POLICY_OPTIONS: Dict[str, Tuple[str, Callable, Callable]] = {
+    "every": ("every", int, lambda value: value >= 1),
+    "fraction": ("fraction", float, lambda value: 0 < value <= 1),
+    "max": ("max_instances", int, lambda value: value >= 0),
+}
+
+
+CONTENT_OPTIONS: Dict[str, Tuple[str, Callable, Callable]] = {
+    "threshold": ("threshold", int, lambda value: value >= 0),
+    "size": ("size", int, lambda value: value >= 1),
+}
+
+
+def parse_options(
+    spec: str, options: Dict[str, Tuple[str, Callable, Callable]]
+) -> Dict[str, Any]:
+    """
+    Parse comma separated name=value options, like 'every=10,max=100', into keyword arguments.
+    """
+    parsed = {}
+    for option in filter(None, (option.strip() for option in spec.split(","))):
+        name, _, value = option.partition("=")
+        if name.strip() not in options:
+            usage = ", ".join(f"{name}=..." for name in options)
+            raise ValueError(f"Unknown sampling option '{option}', use {usage}.")
+        field, type_, is_valid = options[name.strip()]
+        try:
+            parsed[field] = type_(value)
+        except ValueError:
+            parsed[field] = None
+        if parsed[field] is None or not is_valid(parsed[field]):
+            raise ValueError(f"Invalid sampling option '{option}'.")
+    return parsed
+
+
+def parse_policy(spec: str) -> SamplingPolicy:
+    """
+    Parse a comma separated policy, like 'every=10,max=100'. An empty spec observes everything.
+    """
+    return SamplingPolicy(**parse_options(spec, POLICY_OPTIONS))
+
+
+def parse_sampling(
+    spec: str,
+) -> Tuple[SamplingPolicy, List[Tuple[str, Optional[int], SamplingPolicy]]]:
+    """
+    Parse the value of PYGGESTER_SAMPLING into the default policy and the per site policies.
+    """
+    default = SamplingPolicy()
+    overrides = []
+    for part in filter(None, (part.strip() for part in spec.split(";"))):
+        policy, _, selector = part.partition("@")
+        if not selector:
+            default = parse_policy(policy)
+            continue
+        pattern, _, line_nr = selector.rpartition(":")
+        if not line_nr.isdigit():
+            pattern, line_nr = selector, None
+        overrides.append(
+            (pattern, int(line_nr) if line_nr else None, parse_policy(policy))
+        )
+    return default, overrides
+
+
+class Sampler:
+    """
+    Decides which allocations get observed and counts the allocations of each site.
+    Without any policy every allocation is observed and nothing is counted.
+    """
+
+    __slots__: Tuple[str] = (
+        "enabled",
+        "default",
+        "overrides",
+        "policies",
+        "allocations",
+        "sampled",
+        "random",
+    )
+
+    def __init__(self, spec: str = "", seed: int = 0) -> None:
+        self.configure(spec, seed)
+
+    def configure(self, spec: str, seed: int = 0) -> None:
+        self.default, self.overrides = parse_sampling(spec)
+        self.enabled = self.default != SamplingPolicy() or bool(self.overrides)
+        self.policies: Dict[int, SamplingPolicy] = {}
+        self.allocations: Dict[int, int] = {}
+        self.sampled: Dict[int, int] = {}
+        self.random = random.Random(seed)
+
+    def get_policy(self, site_id: int) -> SamplingPolicy:
+        policy = self.policies.get(site_id)
+        if policy is None:
+            site = get_site(site_id)
+            policy = self.default
+            for pattern, line_nr, override in self.overrides:
+                if fnmatch.fnmatch(site.file_path, pattern) and line_nr in (
+                    None,
+                    site.line_nr,
+                ):
+                    policy = override
+                    break
+            self.policies[site_id] = policy
+        return policy
+
+    def sample(self, site_id: int) -> bool:
+        """
+        Whether the current allocation of the site gets observed.
+        """
+        if not self.enabled:
+            return True
+        policy = self.get_policy(site_id)
+        allocations = self.allocations[site_id] = self.allocations.get(site_id, 0) + 1
+        sampled = self.sampled.get(site_id, 0)
+        if policy.max_instances is not None and sampled >= policy.max_instances:
+            return False
+        if (allocations - 1) % policy.every:
+            return False
+        if policy.fraction < 1 and self.random.random() >= policy.fraction:
+            return False
+        self.sampled[site_id] = sampled + 1
+        return True
+
+    def get_allocations(self, site_id: int) -> Optional[int]:
+        """
+        Number of allocations of the site, None if every allocation was observed.
+        """
+        if self.allocations.get(site_id, 0) == self.sampled.get(site_id, 0):
+            return None
+        return self.allocations[site_id]
+
+
+def wilson_interval(
+    successes: int, trials: int, z: float = 1.96
+) -> Tuple[float, float]:
+    """
+    Wilson score interval of a proportion (95% by default).
+    """
+    if not trials:
+        return 0.0, 1.0
+    proportion = successes / trials
+    denominator = 1 + z**2 / trials
+    center = (proportion + z**2 / (2 * trials)) / denominator
+    margin = (
+        z
+        * math.sqrt(proportion * (1 - proportion) / trials + z**2 / (4 * trials**2))
+        / denominator
+    )
+    return max(0.0, center - margin), min(1.0, center + margin)
+
+
+class ContentSample(NamedTuple):
+    """
+    The elements a check looks at, and the exact number of elements of the container.
+    """
+
+    items: List[Any]
+    size: int
+
+    @property
+    def sampled(self) -> bool:
+        return len(self.items) < self.size
+
+    def mark(self, message: str) -> str:
+        """
+        Mark a suggestion as made from a sample or from every element.
+        """
+        if self.sampled:
+            return f"{message} [sampled: {len(self.items)} of {self.size} elements]"
+        return f"{message} [exact]"
+
+
+def _uniform(random_: random.Random) -> float:
+    # random() might return 0.0, which has no logarithm
+    while True:
+        value = random_.random()
+        if value:
+            return value
+
+
+def reservoir_sample(
+    iterable: Iterable, size: int, random_: random.Random
+) -> List[Any]:
+    """
+    Uniform random sample of `size` elements of an iterable of unknown length, in one pass
+    (reservoir sampling, algorithm L). The skipped elements are consumed by islice, so the
+    python level work only grows with the logarithm of the length of the iterable.
+    """
+    iterator = iter(iterable)
+    reservoir = list(itertools.islice(iterator, size))
+    if len(reservoir) < size:
+        return reservoir
+    weight = math.exp(math.log(_uniform(random_)) / size)
+    while True:
+        skip = math.floor(math.log(_uniform(random_)) / math.log(1 - weight))
+        item = next(itertools.islice(iterator, skip, None), _MISSING)
+        if item is _MISSING:
+            return reservoir
+        reservoir[random_.randrange(size)] = item
+        weight *= math.exp(math.log(_uniform(random_)) / size)
+
+
+class ContentSampler:
+    """
+    Hands the elements of a container to the checks: every element of small containers, a
+    bounded random sample of the elements of containers with more than `threshold` elements.
+    Samples are deterministic for a given seed (observables use their site id), so the same
+    program always gets the same suggestions.
+    """
+
+    __slots__: Tuple[str] = ("threshold", "size")
+
+    def __init__(
+        self, threshold: int = CONTENT_THRESHOLD, size: int = CONTENT_SAMPLE_SIZE
+    ) -> None:
+        self.threshold = threshold
+        self.size = size
+
+    def configure(self, spec: str) -> None:
+        options = parse_options(spec, CONTENT_OPTIONS)
+        self.threshold = options.get("threshold", CONTENT_THRESHOLD)
+        self.size = options.get("size", CONTENT_SAMPLE_SIZE)
+
+    def sample(self, items: Iterable, length: int, seed: int = 0) -> ContentSample:
+        """
+        Args:
+            items (Iterable): The elements of the container. Sequences are sampled by index,
+                anything else (like dict views) with a reservoir.
+            length (int): Exact number of elements of the container.
+            seed (int): Seed of the sample.
+        """
+        if length <= self.threshold or length <= self.size:
+            return ContentSample(
+                items if isinstance(items, list) else list(items), length
+            )
+        random_ = random.Random(seed)
+        if hasattr(items, "__getitem__"):
+            indexes = sorted(random_.sample(range(length), self.size))
+            return ContentSample([items[index] for index in indexes], length)
+        return ContentSample(reservoir_sample(items, self.size, random_), length)
+
+
+SAMPLER = Sampler(os.environ.get(SAMPLING_ENV, ""))
+CONTENT_SAMPLER = ContentSampler()
+CONTENT_SAMPLER.configure(os.environ.get(CONTENT_SAMPLING_ENV, ""))
+
+
+def configure(spec: str) -> Sampler:
+    """
+    Replace the sampling policies of the current process (and of its child processes).
+    """
+    SAMPLER.configure(spec)
+    os.environ[SAMPLING_ENV] = spec
+    return SAMPLER
+
+
+def configure_content_sampling(spec: str) -> ContentSampler:
+    """
+    Replace the content sampling options of the current process (and of its child processes).
+    """
+    CONTENT_SAMPLER.configure(spec)
+    os.environ[CONTENT_SAMPLING_ENV] = spec
+    return CONTENT_SAMPLER
@@ -0,0 +1,91 @@
+"""
+Estimated savings of the suggestions.
+
+Checks of an observable can have an estimator (see Observable.SAVINGS), which tells how much the
+suggested structure would save on the observed data:
+
+    memory      the sys.getsizeof footprint of the container and of the elements only it holds,
+                minus the footprint of the suggested structure (negative when the suggestion
+                trades memory for speed)
+    operations  element operations counted on the container (e.g. `in` checks times the length
+                they scanned) minus the operations the suggested structure would do
+
+Both are estimates: footprints of large containers are extrapolated from a content sample, and
+operation counts assume the worst case (a scan of the whole container).
+The collector sums the savings of every instance of an allocation site, and can sort the report by
+them (PYGGESTER_REPORT_SORT, see pyggester.observable_collector).
+"""
+
+import sys
+from typing import Any, List, NamedTuple, Optional, Set
+from pyggester.sampling import ContentSample
+
+__all__: List[str] = ["Saving", "format_size", "get_deep_size", "get_footprint"]
+
+_CONTAINERS = (list, tuple, set, frozenset)
+
+
+class Saving(NamedTuple):
+    # Bytes saved, negative when the suggestion uses more memory
+    nbytes: float = 0
+    # Element operations saved
+    operations: float = 0
+
+    def merge(self, other: "Saving") -> "Saving":
+        return Saving(self.nbytes + other.nbytes, self.operations + other.operations)
+
+    def scale(self, factor: float) -> "Saving":
+        return Saving(self.nbytes * factor, self.operations * factor)
+
+    def __str__(self) -> str:
+        parts = []
+        if self.nbytes >= 1:
+            parts.append(f"~{format_size(self.nbytes)} of memory")
+        if self.operations >= 1:
+            parts.append(f"~{self.operations:.0f} operations")
+        if self.nbytes <= -1:
+            parts.append(f"at the cost of ~{format_size(-self.nbytes)} of memory")
+        return ", ".join(parts) or "none"
+
+
+def format_size(nbytes: float) -> str:
+    """
+    Human readable size, in powers of 1024 (the units of pyggester.helpers.parse_size).
+    """
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(nbytes) < 1024:
+            return f"{nbytes:.0f}{unit}" if unit == "B" else f"{nbytes:.1f}{unit}"
+        nbytes /= 1024
+    return f"{nbytes:.1f}TB"
+
+
+def get_deep_size(item: Any, seen: Optional[Set[int]] = None) -> int:
+    """
+    sys.getsizeof of an object and of the elements of nested lists, tuples, sets and dicts.
+    Objects in `seen` (shared objects, like the small ints) are only counted once.
+    """
+    if seen is None:
+        seen = set()
+    if id(item) in seen:
+        return 0
+    seen.add(id(item))
+    size = sys.getsizeof(item)
+    if isinstance(item, _CONTAINERS):
+        size += sum(get_deep_size(element, seen) for element in item)
+    elif isinstance(item, dict):
+        size += sum(
+            get_deep_size(key, seen) + get_deep_size(value, seen)
+            for key, value in item.items()
+        )
+    return size
+
+
+def get_footprint(container: Any, sample: ContentSample) -> float:
+    """
+    Footprint of a container and of its elements, extrapolated from a sample of the elements.
+    """
+    seen = {id(container)}
+    elements = sum(get_deep_size(item, seen) for item in sample.items)
+    if sample.items:
+        elements *= sample.size / len(sample.items)
+    return sys.getsizeof(container) + elements
@@ -0,0 +1,154 @@
+"""
+Key schemas of dicts, for the record type suggestion.
+
+A dict literal in a loop often builds records: millions of dicts with the same few string keys.
+Every one of them holds its own hash table, while an instance of a class with __slots__ (or of a
+dataclass(slots=True), or a NamedTuple) only holds one pointer per field. No single dict can
+tell that, so every dict reports its key schema when it gets evaluated, and the SchemaSummary of
+its allocation site counts the instances of each schema.
+
+A site gets the suggestion when at least MIN_RECORDS of its dicts, and at least STABLE_SHARE of
+them, have the same key set. The estimated saving is the sys.getsizeof of each of
+those dicts minus the size of a __slots__ instance with the same fields, summed over them.
+Only keys that are valid attribute names can become fields, and a summary keeps at most
+MAX_SCHEMAS distinct schemas, so it never grows with the number of instances.
+"""
+
+import keyword
+import sys
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, List, NamedTuple, Optional, Tuple
+from pyggester.savings import Saving
+
+__all__: List[str] = ["Schema", "SchemaSummary", "get_record_size", "get_schema"]
+
+# Instances of a site below which a record type is not worth a suggestion
+MIN_RECORDS: int = 100
+# Smallest share of the instances of a site that must have the same keys
+STABLE_SHARE: float = 0.9
+# Dicts with more keys than this are not records
+MAX_FIELDS: int = 32
+# Distinct schemas kept per site, the other ones are only counted
+MAX_SCHEMAS: int = 8
+# Fields shown in the suggestion
+SHOWN_FIELDS: int = 8
+
+
+class Schema(NamedTuple):
+    # Keys of the dict, in insertion order
+    keys: Tuple[str, ...]
+    # sys.getsizeof of the dict, minus the size of a __slots__ instance with the same fields
+    saved: int
+    # Whether values got assigned after the dict was built, which a NamedTuple doesn't allow
+    mutated: bool
+
+
+@lru_cache(maxsize=None)
+def get_record_size(fields: int) -> int:
+    """
+    sys.getsizeof of an instance of a class with `fields` __slots__.
+    """
+    record = type("Record", (), {"__slots__": tuple(f"f{i}" for i in range(fields))})
+    return sys.getsizeof(record())
+
+
+def get_schema(mapping: Dict[Any, Any], mutated: bool = False) -> Optional[Schema]:
+    """
+    The schema of a dict whose keys can be the fields of a class, None for any other dict.
+    """
+    if not mapping or len(mapping) > MAX_FIELDS:
+        return None
+    keys = tuple(dict.keys(mapping))
+    if not all(
+        type(key) is str and key.isidentifier() and not keyword.iskeyword(key)
+        for key in keys
+    ):
+        return None
+    saved = sys.getsizeof(dict(mapping)) - get_record_size(len(keys))
+    return Schema(keys, saved, mutated)
+
+
+class SchemaCount:
+    """
+    Instances of a single schema.
+    """
+
+    __slots__: Tuple[str] = ("keys", "instances", "saved", "mutated")
+
+    def __init__(self, keys: Tuple[str, ...]) -> None:
+        self.keys = keys
+        self.instances: int = 0
+        self.saved: int = 0
+        self.mutated: int = 0
+
+
+class SchemaSummary:
+    """
+    Aggregated key schemas of the dicts of a single allocation site. Dicts without a schema
+    are only counted by the instances of the SiteSummary.
+    """
+
+    __slots__: Tuple[str] = ("schemas", "dropped")
+
+    def __init__(self) -> None:
+        self.schemas: Dict[FrozenSet[str], SchemaCount] = {}
+        # Dicts whose schema came after MAX_SCHEMAS other ones
+        self.dropped: int = 0
+
+    def add(self, schema: Schema) -> None:
+        key = frozenset(schema.keys)
+        count = self.schemas.get(key)
+        if count is None:
+            if len(self.schemas) >= MAX_SCHEMAS:
+                self.dropped += 1
+                return
+            count = self.schemas[key] = SchemaCount(schema.keys)
+        count.instances += 1
+        count.saved += schema.saved
+        count.mutated += schema.mutated
+
+    def get_dominant(self) -> Optional[SchemaCount]:
+        return max(
+            self.schemas.values(), key=lambda count: count.instances, default=None
+        )
+
+    def check_records(self, instances: int) -> Optional[Tuple[str, int, Saving]]:
+        """
+        The record type suggestion for a site of `instances` dicts, with the number of instances
+        it applies to and the memory it saves over all of them.
+        """
+        count = self.get_dominant()
+        if (
+            count is None
+            or count.instances < MIN_RECORDS
+            or count.instances < STABLE_SHARE * instances
+        ):
+            return None
+        fields = ", ".join(count.keys[:SHOWN_FIELDS])
+        if len(count.keys) > SHOWN_FIELDS:
+            fields += ", ..."
+        types = (
+            "a class with __slots__ or a dataclass(slots=True)"
+            if count.mutated
+            else "a class with __slots__, a dataclass(slots=True) or a NamedTuple"
+        )
+        message = (
+            f"The dicts are records with the same {len(count.keys)} keys ({fields}). "
+            f"Consider using {types} instead, which doesn't hold a hash table per instance"
+        )
+        return message, count.instances, Saving(nbytes=count.saved)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "dropped": self.dropped,
+            "schemas": [
+                {
+                    "keys": list(count.keys),
+                    "instances": count.instances,
+                    "mutated": count.mutated,
+                }
+                for count in sorted(
+                    self.schemas.values(), key=lambda count: -count.instances
+                )
+            ],
+        }
@@ -0,0 +1,235 @@
+"""
+Where the suggestions of transformed code are reported.
+
+Observables and the collector don't print anything themselves: they emit Report objects to the
+REPORT_WRITER, which hands them over to a background thread. That thread writes them in batches
+to every configured sink, so reporting never blocks the program, and reports are never written
+in the middle of each other. The writer is flushed at the end of the report
+(OBSERVABLE_COLLECTOR.run) and when the interpreter exits.
+
+Sinks are configured with the PYGGESTER_REPORT_SINK environment variable, a comma separated list of:
+
+    rich            panels on the standard output, through a single shared rich Console (default)
+    text[:<path>]   plain text, to the file or to the standard error
+    jsonl:<path>    one JSON object per report, appended to the file
+"""
+
+import abc
+import atexit
+import json
+import os
+import queue
+import sys
+import threading
+from typing import Any, Dict, List, NamedTuple, Optional, TextIO, Tuple
+from rich.console import Console
+from pyggester.text_formatters import make_panel
+
+__all__: List[str] = [
+    "Report",
+    "Sink",
+    "RichSink",
+    "PlainTextSink",
+    "JsonLinesSink",
+    "ReportWriter",
+    "REPORT_WRITER",
+    "parse_sinks",
+    "configure_sinks",
+]
+
+REPORT_SINK_ENV: str = "PYGGESTER_REPORT_SINK"
+
+
+class Report(NamedTuple):
+    # Human readable report, the text of a panel
+    text: str
+    # Machine readable report, written by JsonLinesSink
+    data: Dict[str, Any]
+    border_style: str = "green"
+    title: str = ""
+
+
+class Sink(abc.ABC):
+    """
+    Writes batches of reports somewhere. Sinks are only used by the writer thread.
+    """
+
+    __slots__: Tuple[str] = ()
+
+    @abc.abstractmethod
+    def write(self, reports: List[Report]) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class RichSink(Sink):
+    """
+    Panels on the standard output. Every batch is printed by the same Console in a single call.
+    """
+
+    __slots__: Tuple[str] = ("console",)
+
+    def __init__(self, console: Optional[Console] = None) -> None:
+        self.console = console or Console()
+
+    def write(self, reports: List[Report]) -> None:
+        self.console.print(
+            *(
+                make_panel(
+                    report.text, border_style=report.border_style, title=report.title
+                )
+                for report in reports
+            )
+        )
+
+
+class FileSink(Sink):
+    """
+    A sink writing lines to a file, opened when the first batch arrives.
+    """
+
+    __slots__: Tuple[str] = ("path", "stream")
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        self.path = path
+        self.stream: Optional[TextIO] = None
+
+    def get_stream(self) -> TextIO:
+        if self.stream is None:
+            if self.path is None:
+                return sys.stderr
+            self.stream = open(self.path, "a", encoding="UTF-8")
+        return self.stream
+
+    @abc.abstractmethod
+    def format(self, report: Report) -> str:
+        pass
+
+    def write(self, reports: List[Report]) -> None:
+        stream = self.get_stream()
+        stream.write("".join(self.format(report) for report in reports))
+        stream.flush()
+
+    def close(self) -> None:
+        if self.stream is not None:
+            self.stream.close()
+            self.stream = None
+
+
+class PlainTextSink(FileSink):
+    __slots__: Tuple[str] = ()
+
+    def format(self, report: Report) -> str:
+        title = f"[{report.title}]\n" if report.title else ""
+        return f"{title}{report.text}\n\n"
+
+
+class JsonLinesSink(FileSink):
+    __slots__: Tuple[str] = ()
+
+    def __init__(self, path: str) -> None:
+        super().__init__(path)
+
+    def format(self, report: Report) -> str:
+        return json.dumps(report.data, default=str) + "\n"
+
+
+def parse_sinks(spec: str) -> List[Sink]:
+    """
+    Parse the value of PYGGESTER_REPORT_SINK (see the module docstring).
+    """
+    sinks: List[Sink] = []
+    for part in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, path = part.partition(":")
+        if name == "rich" and not path:
+            sinks.append(RichSink())
+        elif name == "text":
+            sinks.append(PlainTextSink(path or None))
+        elif name == "jsonl" and path:
+            sinks.append(JsonLinesSink(path))
+        else:
+            raise ValueError(
+                f"Invalid report sink '{part}', use rich, text[:<path>] or jsonl:<path>."
+            )
+    return sinks or [RichSink()]
+
+
+class ReportWriter:
+    """
+    Queues reports and writes them to the sinks in batches, on a background (daemon) thread
+    started by the first report.
+    """
+
+    __slots__: Tuple[str] = ("sinks", "queue", "thread", "lock")
+
+    BATCH_SIZE: int = 1024
+
+    def __init__(self, sinks: Optional[List[Sink]] = None) -> None:
+        self.sinks: List[Sink] = sinks if sinks is not None else [RichSink()]
+        self.queue: "queue.Queue[Optional[Report]]" = queue.Queue()
+        self.thread: Optional[threading.Thread] = None
+        self.lock = threading.Lock()
+
+    def configure(self, spec: str) -> None:
+        sinks = parse_sinks(spec)
+        self.flush()
+        for sink in self.sinks:
+            sink.close()
+        self.sinks = sinks
+
+    def emit(self, report: Report) -> None:
+        if self.thread is None or not self.thread.is_alive():
+            with self.lock:
+                if self.thread is None or not self.thread.is_alive():
+                    self.thread = threading.Thread(
+                        target=self.work, name="pyggester-report-writer", daemon=True
+                    )
+                    self.thread.start()
+        self.queue.put(report)
+
+    def work(self) -> None:
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < self.BATCH_SIZE:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            reports = [report for report in batch if report is not None]
+            try:
+                if reports:
+                    for sink in self.sinks:
+                        sink.write(reports)
+            except Exception as ex:
+                # A broken sink must not take the program down
+                print(f"pyggester: could not write the report: {ex}", file=sys.stderr)
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+    def flush(self) -> None:
+        """
+        Wait until every emitted report has been written.
+        """
+        if self.thread is not None and self.thread.is_alive():
+            self.queue.join()
+
+    def close(self) -> None:
+        self.flush()
+        for sink in self.sinks:
+            sink.close()
+
+
+REPORT_WRITER = ReportWriter(parse_sinks(os.environ.get(REPORT_SINK_ENV, "")))
+atexit.register(REPORT_WRITER.close)
+
+
+def configure_sinks(spec: str) -> ReportWriter:
+    """
+    Replace the sinks of the current process (and of its child processes).
+    """
+    REPORT_WRITER.configure(spec)
+    os.environ[REPORT_SINK_ENV] = spec
+    return REPORT_WRITER
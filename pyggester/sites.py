@@ -0,0 +1,118 @@
+"""
+Allocation sites of observables.
+
+Every container that pyggester wraps is created at an allocation site (a literal or a constructor
+call in the analyzed code). The sites of a module are collected while transforming it (SiteCollector)
+and registered once, when the transformed module starts running (register_sites).
+Each wrapped call gets the id of its site as an extra argument, so observables only store
+that small integer, instead of inspecting the caller's frame every time they get constructed.
+"""
+
+import ast
+import sys
+import threading
+from typing import Dict, List, NamedTuple, Sequence, Tuple
+
+__all__: List[str] = [
+    "Site",
+    "SiteCollector",
+    "register_sites",
+    "get_site",
+    "get_caller_site_id",
+]
+
+# Private, so that `from transformed_module import *` never overwrites the base of the importer
+SITE_BASE_NAME: str = "_PYGGESTER_SITE_BASE"
+
+
+class Site(NamedTuple):
+    file_path: str
+    line_nr: int
+    col: int
+    function: str
+
+
+SITES: List[Site] = []
+_FRAME_SITES: Dict[Tuple[str, int], int] = {}
+_SITES_LOCK = threading.Lock()
+
+
+def register_sites(file_path: str, sites: Sequence[Tuple[int, int, str]]) -> int:
+    """
+    Register the (line, col, function) sites of a module and return the id of its first site.
+    The id of each site is the returned base plus the index of the site inside `sites`.
+    """
+    with _SITES_LOCK:
+        base = len(SITES)
+        SITES.extend(
+            Site(file_path, line_nr, col, function) for line_nr, col, function in sites
+        )
+    return base
+
+
+def get_site(site_id: int) -> Site:
+    return SITES[site_id]
+
+
+def get_caller_site_id(depth: int = 2) -> int:
+    """
+    Fallback for observables constructed without a site id (by hand, or by modules transformed
+    by older pyggester versions). The site is looked up from the frame `depth` levels above
+    this function, which is the caller of the observable's constructor by default.
+    Each (file, line) pair is registered only once.
+    """
+    frame = sys._getframe(depth)
+    key = (frame.f_globals.get("__file__", "<unknown>"), frame.f_lineno)
+    with _SITES_LOCK:
+        site_id = _FRAME_SITES.get(key)
+        if site_id is None:
+            code = frame.f_code
+            site_id = _FRAME_SITES[key] = len(SITES)
+            SITES.append(
+                Site(key[0], key[1], 0, getattr(code, "co_qualname", code.co_name))
+            )
+    return site_id
+
+
+class SiteCollector:
+    """
+    Collects the allocation sites of a module while it gets transformed.
+
+    The transformer keeps `scopes` up to date with the enclosing classes/functions, the wrappers
+    call `add` for each call they wrap and pass the returned expression as the site id.
+    """
+
+    __slots__: Tuple[str] = ("sites", "scopes")
+
+    def __init__(self) -> None:
+        self.sites: List[Tuple[int, int, str]] = []
+        self.scopes: List[str] = []
+
+    @property
+    def function(self) -> str:
+        return ".".join(self.scopes) or "<module>"
+
+    def add(self, node: ast.AST) -> str:
+        """
+        Register the site of `node` and return the code of its site id (base of the module + index).
+        """
+        self.sites.append(
+            (getattr(node, "lineno", 0), getattr(node, "col_offset", 0), self.function)
+        )
+        return f"{SITE_BASE_NAME} + {len(self.sites) - 1}"
+
+    def keyword(self, node: ast.AST) -> ast.keyword:
+        """
+        Same as `add`, but returns the `site_id_=...` keyword argument of the wrapping call.
+        """
+        return ast.keyword(
+            arg="site_id_", value=ast.parse(self.add(node), mode="eval").body
+        )
+
+    def registration(self) -> ast.stmt:
+        """
+        The statement that registers the collected sites, when the transformed module runs.
+        """
+        return ast.parse(
+            f"{SITE_BASE_NAME} = register_sites(__file__, {tuple(self.sites)!r})"
+        ).body[0]
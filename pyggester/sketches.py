@@ -0,0 +1,115 @@
+"""
+Fixed size sketches, used by observables to estimate properties of data that is too large
+(or lives too long) to be kept or scanned in full.
+"""
+
+import heapq
+from typing import Any, List, Set, Tuple
+import numpy
+
+__all__: List[str] = ["KMinValues", "hash_array"]
+
+_MASK_64: int = (1 << 64) - 1
+
+
+def mix_hash(value: int) -> int:
+    """
+    Spread a python hash over 64 bits (splitmix64 finalizer). Python hashes of small ints are
+    the ints themselves, which are far from uniformly distributed.
+    """
+    value = (value + 0x9E3779B97F4A7C15) & _MASK_64
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & _MASK_64
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & _MASK_64
+    return value ^ (value >> 31)
+
+
+def mix_hashes(values: numpy.ndarray) -> numpy.ndarray:
+    """
+    mix_hash over a numpy uint64 array (arithmetic wraps around, just like the masked ints).
+    """
+    values = values + numpy.uint64(0x9E3779B97F4A7C15)
+    values ^= values >> numpy.uint64(30)
+    values *= numpy.uint64(0xBF58476D1CE4E5B9)
+    values ^= values >> numpy.uint64(27)
+    values *= numpy.uint64(0x94D049BB133111EB)
+    values ^= values >> numpy.uint64(31)
+    return values
+
+
+def hash_array(values: numpy.ndarray) -> numpy.ndarray:
+    """
+    64 bit hash of every element of a (non object) numpy array, computed from the bytes of the
+    elements, so equal elements get equal hashes. Temporaries are as large as `values`.
+    """
+    if values.dtype.kind in "fc":
+        # -0.0 and 0.0 are equal but have different bytes
+        values = values + 0
+    data = numpy.ascontiguousarray(values).reshape(-1)
+    raw = data.view(numpy.uint8).reshape(len(data), data.dtype.itemsize)
+    if data.dtype.itemsize % 8:
+        raw = numpy.pad(raw, ((0, 0), (0, 8 - data.dtype.itemsize % 8)))
+    hashes = None
+    for word in raw.view(numpy.uint64).T:
+        hashes = mix_hashes(word if hashes is None else hashes ^ word)
+    return hashes
+
+
+class KMinValues:
+    """
+    K minimum values sketch: estimates the number of distinct elements added to it, while only
+    keeping the `k` smallest (mixed) hashes. Memory stays the same however many elements get added.
+    Up to `k` distinct elements the count is exact, after that the relative error is about 1/sqrt(k).
+    """
+
+    __slots__: Tuple[str] = ("k", "heap", "members")
+
+    def __init__(self, k: int = 256) -> None:
+        self.k = k
+        # Max-heap (negated hashes) of the k smallest hashes seen so far
+        self.heap: List[int] = []
+        self.members: Set[int] = set()
+
+    def add(self, item: Any) -> None:
+        self.add_hash(mix_hash(hash(item) & _MASK_64))
+
+    def add_hash(self, value: int) -> None:
+        """
+        Add an already uniformly distributed 64 bit hash.
+        """
+        if value in self.members:
+            return
+        if len(self.heap) < self.k:
+            heapq.heappush(self.heap, -value)
+            self.members.add(value)
+        elif value < -self.heap[0]:
+            self.members.discard(-heapq.heappushpop(self.heap, -value))
+            self.members.add(value)
+
+    def add_hashes(self, hashes: numpy.ndarray) -> None:
+        """
+        Add a numpy array of already uniformly distributed 64 bit hashes (see hash_array).
+        Only the hashes that can still get into the sketch reach python, at most k per call.
+        """
+        if len(self.heap) == self.k:
+            hashes = hashes[hashes < numpy.uint64(-self.heap[0])]
+        # numpy.unique is a lot slower than sorting and dropping the repeated neighbours
+        hashes = numpy.sort(hashes)
+        if len(hashes) > 1:
+            hashes = hashes[numpy.append(True, hashes[1:] != hashes[:-1])]
+        for value in hashes[: self.k].tolist():
+            self.add_hash(value)
+
+    @property
+    def exact(self) -> bool:
+        """
+        Whether the estimate is an exact count (fewer than k distinct elements were added).
+        """
+        return len(self.heap) < self.k
+
+    def estimate(self) -> float:
+        """
+        Estimated number of distinct elements.
+        """
+        if len(self.heap) < self.k:
+            return float(len(self.heap))
+        return (self.k - 1) / ((-self.heap[0] + 1) / (1 << 64))
@@ -1,5 +1,19 @@
+import pathlib
+from typing import Sequence
 from rich.console import Console
 from rich.panel import Panel
+from rich.table import Table
+
+
+def make_panel(
+    message: str, style: str = "bold", border_style: str = "", title: str = ""
+) -> Panel:
+    return Panel(
+        f"[bold yellow]{message}",
+        style=style,
+        border_style=border_style,
+        title=title,
+    )
 
 
 def custom_print(
@@ -9,10 +23,32 @@ def custom_print(
     title: str = "",
 ):
     if message:
-        panel_ = Panel(
-            f"[bold yellow]{message}",
-            style=style,
-            border_style=border_style,
-            title=title,
+        Console().print(make_panel(message, style, border_style, title))
+
+
+def print_transform_profiles(profiles: Sequence, root: pathlib.Path) -> None:
+    """
+    Print the per-file timings (pyggester.pyggester.TransformProfile) of
+    `pyggest transform --profile`, slowest files first, followed by the totals.
+    """
+    steps = ("read", "parse", "transform", "emit", "write")
+    table = Table(title="Transformation profile (ms)", show_footer=True)
+    table.add_column("file", footer="total")
+    for step in steps:
+        total = sum(getattr(profile, step) for profile in profiles)
+        table.add_column(step, justify="right", footer=f"{total * 1000:.2f}")
+    table.add_column(
+        "total",
+        justify="right",
+        footer=f"{sum(profile.total for profile in profiles) * 1000:.2f}",
+    )
+    table.add_column("cached", justify="center")
+
+    for profile in sorted(profiles, key=lambda profile: profile.total, reverse=True):
+        table.add_row(
+            str(pathlib.Path(profile.file_path).relative_to(root)),
+            *(f"{getattr(profile, step) * 1000:.2f}" for step in steps),
+            f"{profile.total * 1000:.2f}",
+            "yes" if profile.cached else "",
         )
-        Console().print(panel_)
+    Console().print(table)
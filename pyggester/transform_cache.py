@@ -0,0 +1,150 @@
+"""
+Persistent on-disk cache for transformed modules.
+
+Every transformed module is stored under a key that is derived from the content of the
+original module, the pyggester version, the set of active wrappers and the source code of the
+transformations themselves. Re-transforming a
+project after a small edit only needs to transform the modules that actually changed,
+everything else is copied from the cache.
+"""
+
+import hashlib
+import os
+import pathlib
+import shutil
+import tempfile
+from functools import lru_cache
+from typing import List, Optional, Tuple
+from pyggester.helpers import get_pyggester_version
+from pyggester.wrappers import WRAPPERS, get_wrappers_as_strings
+
+__all__: List[str] = ["TransformCache", "CACHE_DIR_NAME"]
+
+CACHE_DIR_NAME: str = ".pyggester_cache"
+
+# Modules whose code decides what the transformed code looks like
+TRANSFORMER_MODULES: Tuple[str] = (
+    "module_importer.py",
+    "observable_transformations.py",
+    "sites.py",
+    "wrappers.py",
+)
+
+
+@lru_cache
+def get_transformer_hash() -> str:
+    """
+    Hash of the source code of the transformations, so that changing them (even without a new
+    pyggester version) never serves transformed code of the previous transformations.
+    """
+    digest = hashlib.sha256()
+    package_dir = pathlib.Path(__file__).parent
+    for name in TRANSFORMER_MODULES:
+        digest.update((package_dir / name).read_bytes())
+    return digest.hexdigest()
+
+
+@lru_cache
+def get_cache_salt() -> bytes:
+    """
+    Get the part of the cache key that is shared by every module transformed by this process.
+
+    It changes whenever the pyggester version, the set of active wrappers or the transformations
+    change, because all of them change the transformed code.
+    """
+    wrappers = sorted(
+        f"{group}.{name}" for group, wrappers_ in WRAPPERS.items() for name in wrappers_
+    )
+    salt = "|".join(
+        [
+            get_pyggester_version(),
+            get_transformer_hash(),
+            ",".join(wrappers),
+            ",".join(sorted(get_wrappers_as_strings())),
+        ]
+    )
+    return salt.encode("UTF-8")
+
+
+class TransformCache:
+    """
+    Content addressed cache of transformed modules.
+
+    Args:
+        cache_dir (pathlib.Path): Directory where the transformed modules are stored.
+
+    Methods:
+        key(code, run_observable): Computes the cache key of a module.
+        get(key): Gets the path of a cached transformed module, if there is one.
+        put(key, transformed_code): Stores a transformed module.
+        restore(key, transformed_file_path): Copies a cached module to its final path.
+    """
+
+    __slots__: Tuple[str] = ("cache_dir",)
+
+    def __init__(self, cache_dir: pathlib.Path) -> None:
+        self.cache_dir = pathlib.Path(cache_dir)
+
+    def key(self, code: str, run_observable: bool) -> str:
+        """
+        Computes the cache key of a module from its source code.
+
+        Args:
+            code (str): Source code of the original module.
+            run_observable (bool): Whether the observables get run in this module.
+
+        Returns:
+            str: Hex digest used as the name of the cached module.
+        """
+        digest = hashlib.sha256(get_cache_salt())
+        digest.update(b"run" if run_observable else b"collect")
+        digest.update(code.encode("UTF-8"))
+        return digest.hexdigest()
+
+    def _entry_path(self, key: str) -> pathlib.Path:
+        return self.cache_dir / key[:2] / f"{key}.py"
+
+    def get(self, key: str) -> Optional[pathlib.Path]:
+        entry_path = self._entry_path(key)
+        if entry_path.exists():
+            return entry_path
+        return None
+
+    def put(self, key: str, transformed_code: str) -> None:
+        """
+        Stores a transformed module.
+
+        The module is first written to a temporary file and then renamed, so that concurrent
+        workers (pyggest transform --jobs N) never see partially written entries.
+        """
+        entry_path = self._entry_path(key)
+        entry_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=entry_path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f_stream:
+                f_stream.write(transformed_code)
+            os.replace(tmp_path, entry_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def restore(self, key: str, transformed_file_path: pathlib.Path) -> bool:
+        """
+        Copies a cached module to `transformed_file_path`.
+
+        If the transformed file is already there with the same content, it is kept untouched.
+
+        Returns:
+            bool: True if the module was found in the cache, False otherwise.
+        """
+        entry_path = self.get(key)
+        if entry_path is None:
+            return False
+        if transformed_file_path.exists():
+            if (
+                transformed_file_path.stat().st_size == entry_path.stat().st_size
+                and transformed_file_path.read_bytes() == entry_path.read_bytes()
+            ):
+                return True
+        shutil.copyfile(entry_path, transformed_file_path)
+        return True
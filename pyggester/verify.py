@@ -0,0 +1,152 @@
+"""
+Verification mode: measure the suggestions on the observed data instead of trusting them.
+
+With `pyggest run --verify` (or the PYGGESTER_VERIFY environment variable for transformed files),
+checks that have a trial (see Observable.VERIFICATIONS) replay the operations recorded on the
+container against a copy of (a sample of) its data, once in the original structure and once in the
+suggested one. The replay is timed with timeit and the memory held by each structure is measured
+with tracemalloc, so the report shows the speedup and the memory difference measured on the
+program's own data.
+
+PYGGESTER_VERIFY is '1' for the defaults, or options separated by commas:
+
+    size=<n>        copy at most n elements of the observed data (default 10000)
+    repeat=<n>      time the replay n times and keep the fastest (default 3)
+
+Verification is slow (every trial runs for tens of milliseconds) and is meant for a few runs
+while deciding on a change, not for every run.
+"""
+
+import os
+import pickle
+import timeit
+import tracemalloc
+from typing import Any, Callable, Dict, List, NamedTuple, Tuple
+from pyggester.sampling import parse_options
+from pyggester.savings import format_size
+
+__all__: List[str] = ["Trial", "Verification", "Verifier", "VERIFIER", "configure"]
+
+VERIFY_ENV: str = "PYGGESTER_VERIFY"
+
+VERIFY_OPTIONS: Dict[str, Tuple[str, Callable, Callable]] = {
+    "size": ("size", int, lambda value: value >= 1),
+    "repeat": ("repeat", int, lambda value: value >= 1),
+}
+
+# Each timing runs the replay enough times to take at least this long
+MIN_TIMING: float = 0.005
+
+
+class Trial(NamedTuple):
+    """
+    How to verify a suggestion: both structures are built from a fresh copy of `data`, then
+    `replay` runs the recorded operations on each of them.
+    """
+
+    data: Any
+    original: Callable[[Any], Any]
+    suggested: Callable[[Any], Any]
+    replay: Callable[[Any], Any]
+    # Number of elements in `data`
+    elements: int
+
+
+class Verification(NamedTuple):
+    elements: int
+    # Seconds a replay took, on the original and on the suggested structure
+    original_time: float
+    suggested_time: float
+    # Bytes held by the original structure minus the bytes held by the suggested one
+    memory_delta: int
+
+    @property
+    def speedup(self) -> float:
+        return self.original_time / self.suggested_time if self.suggested_time else 1.0
+
+    def __str__(self) -> str:
+        memory = (
+            f"{format_size(self.memory_delta)} less memory"
+            if self.memory_delta >= 0
+            else f"{format_size(-self.memory_delta)} more memory"
+        )
+        return f"{self.speedup:.2f}x the speed, {memory} (on {self.elements} elements)"
+
+
+def measure_memory(build: Callable[[Any], Any], blob: bytes) -> Tuple[Any, int]:
+    """
+    Build a structure from a fresh copy of the pickled data, and return it with the bytes
+    it holds, as traced by tracemalloc.
+    """
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        data = pickle.loads(blob)
+        structure = build(data)
+        del data
+        return structure, tracemalloc.get_traced_memory()[0] - before
+    finally:
+        if not tracing:
+            tracemalloc.stop()
+
+
+def measure_time(replay: Callable[[Any], Any], structure: Any, repeat: int) -> float:
+    """
+    Fastest time of a single replay on the structure.
+    """
+    timer = timeit.Timer(lambda: replay(structure))
+    number = 1
+    while timer.timeit(number) < MIN_TIMING:
+        number *= 10
+    return min(timer.repeat(repeat, number)) / number
+
+
+class Verifier:
+    """
+    Runs the trials of the suggestions, when verification is enabled.
+    """
+
+    __slots__: Tuple[str] = ("enabled", "size", "repeat")
+
+    def __init__(
+        self, enabled: bool = False, size: int = 10_000, repeat: int = 3
+    ) -> None:
+        self.enabled = enabled
+        self.size = size
+        self.repeat = repeat
+
+    def configure(self, spec: str) -> None:
+        """
+        Configure from the value of PYGGESTER_VERIFY, see the module docstring.
+        """
+        spec = spec.strip()
+        self.enabled = spec not in ("", "0")
+        options = {} if spec in ("", "0", "1") else parse_options(spec, VERIFY_OPTIONS)
+        self.size = options.get("size", 10_000)
+        self.repeat = options.get("repeat", 3)
+
+    def verify(self, trial: Trial) -> Verification:
+        blob = pickle.dumps(trial.data)
+        original, original_memory = measure_memory(trial.original, blob)
+        suggested, suggested_memory = measure_memory(trial.suggested, blob)
+        return Verification(
+            elements=trial.elements,
+            original_time=measure_time(trial.replay, original, self.repeat),
+            suggested_time=measure_time(trial.replay, suggested, self.repeat),
+            memory_delta=original_memory - suggested_memory,
+        )
+
+
+VERIFIER = Verifier()
+VERIFIER.configure(os.environ.get(VERIFY_ENV, ""))
+
+
+def configure(spec: str) -> Verifier:
+    """
+    Replace the verification options of the current process (and of its child processes).
+    """
+    VERIFIER.configure(spec)
+    os.environ[VERIFY_ENV] = spec
+    return VERIFIER
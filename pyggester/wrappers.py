@@ -1,12 +1,9 @@
 from _ast import AST, Assert, Assign, ClassDef, Expr, Module, Tuple
 import ast
 import inspect
-from astor import to_source
-from typing import Any, ClassVar, Tuple, Union, Set
-import pathlib
-from pyggester.helpers import source_code_to_str
+from typing import Any, ClassVar, FrozenSet, List, Optional, Tuple, Union, Set
 from pyggester.module_importer import add_imports
-
+from pyggester.sites import SiteCollector
 
 # ----------------------------------------------------------
 
@@ -26,10 +23,32 @@ from pyggester.module_importer import add_imports
 # ----------------------------------------------------------
 
 
+def site_keywords(sites: Optional[SiteCollector], node: ast.AST) -> List[ast.keyword]:
+    """
+    The site id keyword of a wrapping call, when the allocation sites are being collected.
+    """
+    return [] if sites is None else [sites.keyword(node)]
+
+
+def site_argument(sites: Optional[SiteCollector], node: ast.AST) -> str:
+    """
+    Same as site_keywords, for wrappers that build their statements from code.
+    """
+    return "" if sites is None else f", site_id_={sites.add(node)}"
+
+
 class ObservableListWrapper(ast.NodeTransformer):
     """AST transformer to wrap lists with ObservableList."""
 
-    __slots__: Tuple[str] = ()
+    __slots__: Tuple[str] = ("sites",)
+
+    def __init__(self, sites: Optional[SiteCollector] = None) -> None:
+        """
+        Args:
+            sites (Optional[SiteCollector]): When given, every wrapping call gets the id of its
+                allocation site (see pyggester.sites).
+        """
+        self.sites = sites
 
     def visit_List(self, node: ast.List) -> Union[ast.Call, ast.AST]:
         """
@@ -41,8 +60,13 @@ class ObservableListWrapper(ast.NodeTransformer):
         Returns:
             Union[ast.Call, ast.AST]: The transformed node.
         """
+        if not isinstance(node.ctx, ast.Load):
+            # Unpacking targets ([a, b] = ...) can't be wrapped
+            return node
         return ast.Call(
-            func=ast.Name(id="ObservableList", ctx=ast.Load()), args=[node], keywords=[]
+            func=ast.Name(id="ObservableList", ctx=ast.Load()),
+            args=[node],
+            keywords=site_keywords(self.sites, node),
         )
 
     def visit_Call(self, node: ast.Call) -> Union[ast.Call, ast.AST]:
@@ -50,7 +74,7 @@ class ObservableListWrapper(ast.NodeTransformer):
             return ast.Call(
                 func=ast.Name(id="ObservableList", ctx=ast.Load()),
                 args=[node],
-                keywords=[],
+                keywords=site_keywords(self.sites, node),
             )
         return node
 
@@ -58,7 +82,10 @@ class ObservableListWrapper(ast.NodeTransformer):
 class ObservableDictWrapper(ast.NodeTransformer):
     """AST transformer to wrap dicts with ObservableDict."""
 
-    __slots__: Tuple[str] = ()
+    __slots__: Tuple[str] = ("sites",)
+
+    def __init__(self, sites: Optional[SiteCollector] = None) -> None:
+        self.sites = sites
 
     def visit_Dict(self, node: ast.Dict) -> Union[ast.Call, ast.AST]:
         """
@@ -71,7 +98,9 @@ class ObservableDictWrapper(ast.NodeTransformer):
             Union[ast.Call, ast.AST]: The transformed node.
         """
         return ast.Call(
-            func=ast.Name(id="ObservableDict", ctx=ast.Load()), args=[node], keywords=[]
+            func=ast.Name(id="ObservableDict", ctx=ast.Load()),
+            args=[node],
+            keywords=site_keywords(self.sites, node),
         )
 
     def visit_Call(self, node: ast.Call) -> Union[ast.Call, ast.AST]:
@@ -79,7 +108,7 @@ class ObservableDictWrapper(ast.NodeTransformer):
             return ast.Call(
                 func=ast.Name(id="ObservableDict", ctx=ast.Load()),
                 args=[node],
-                keywords=[],
+                keywords=site_keywords(self.sites, node),
             )
         return node
 
@@ -87,7 +116,10 @@ class ObservableDictWrapper(ast.NodeTransformer):
 class ObservableTupleWrapper(ast.NodeTransformer):
     """AST transformer to wrap tuples with ObservableTuple."""
 
-    __slots__: Tuple[str] = ()
+    __slots__: Tuple[str] = ("sites",)
+
+    def __init__(self, sites: Optional[SiteCollector] = None) -> None:
+        self.sites = sites
 
     def visit_Tuple(self, node: ast.Tuple) -> Union[ast.Call, ast.AST]:
         """
@@ -99,10 +131,13 @@ class ObservableTupleWrapper(ast.NodeTransformer):
         Returns:
             Union[ast.Call, ast.AST]: The transformed node.
         """
+        if not isinstance(node.ctx, ast.Load):
+            # Unpacking targets (a, b = ...) can't be wrapped
+            return node
         return ast.Call(
             func=ast.Name(id="ObservableTuple", ctx=ast.Load()),
             args=[node],
-            keywords=[],
+            keywords=site_keywords(self.sites, node),
         )
 
     def visit_Call(self, node: ast.Call) -> Union[ast.Call, ast.AST]:
@@ -110,7 +145,7 @@ class ObservableTupleWrapper(ast.NodeTransformer):
             return ast.Call(
                 func=ast.Name(id="ObservableTuple", ctx=ast.Load()),
                 args=[node],
-                keywords=[],
+                keywords=site_keywords(self.sites, node),
             )
         return node
 
@@ -118,7 +153,10 @@ class ObservableTupleWrapper(ast.NodeTransformer):
 class ObservableSetWrapper(ast.NodeTransformer):
     """AST transformer to wrap tuples with ObservableTuple."""
 
-    __slots__: Tuple[str] = ()
+    __slots__: Tuple[str] = ("sites",)
+
+    def __init__(self, sites: Optional[SiteCollector] = None) -> None:
+        self.sites = sites
 
     def visit_Set(self, node: ast.Set) -> Union[ast.Call, ast.AST]:
         """
@@ -133,7 +171,7 @@ class ObservableSetWrapper(ast.NodeTransformer):
         return ast.Call(
             func=ast.Name(id="ObservableSet", ctx=ast.Load()),
             args=[node],
-            keywords=[],
+            keywords=site_keywords(self.sites, node),
         )
 
     def visit_Call(self, node: ast.Call) -> Union[ast.Call, ast.AST]:
@@ -141,7 +179,7 @@ class ObservableSetWrapper(ast.NodeTransformer):
             return ast.Call(
                 func=ast.Name(id="ObservableSet", ctx=ast.Load()),
                 args=[node],
-                keywords=[],
+                keywords=site_keywords(self.sites, node),
             )
         return node
 
@@ -194,12 +232,18 @@ class ObservableNamedTupleWrapper(ast.NodeTransformer):
                                 if isinstance(target, ast.Name):
                                     self.namedtuple_instances.add(target.id)
 
-    def __init__(self, tree) -> None:
+    def __init__(self, tree=None, namedtuple_visitor=None, sites=None) -> None:
         """
         Immediatly initialize the tuple visitor and collect all namedtuple constructor declarations.
+        An already populated `namedtuple_visitor` can be given instead of the tree, when the module
+        has already been scanned (see observable_transformations.ModuleFacts).
+        When `sites` is given, the wrappers get the id of their allocation site.
         """
-        self.namedtuple_visitor = self.NamedTupleVisitor()
-        self.namedtuple_visitor.visit(tree)
+        if namedtuple_visitor is None:
+            namedtuple_visitor = self.NamedTupleVisitor()
+            namedtuple_visitor.visit(tree)
+        self.namedtuple_visitor = namedtuple_visitor
+        self.sites = sites
         self.modified_nodes = []
 
     def visit_Assign(self, node: ast.Assign) -> Any:
@@ -217,7 +261,7 @@ class ObservableNamedTupleWrapper(ast.NodeTransformer):
                     ):
                         for target in node.targets:
                             if isinstance(target, ast.Name):
-                                wrapper_code = f"{target.id}_wrapper = ObservableNamedTuple(*{target.id})"
+                                wrapper_code = f"{target.id}_wrapper = ObservableNamedTuple(*{target.id}{site_argument(self.sites, node)})"
                                 wrapper_node = ast.parse(wrapper_code).body[0]
                                 return [node, wrapper_node]
         return node
@@ -243,6 +287,12 @@ class ObservableNamedTupleWrapper(ast.NodeTransformer):
 class ObservableNumpyArrayWrapper(ast.NodeTransformer):
     """AST transformer to wrap NumPy array instances with ObservableNumpyArray."""
 
+    # numpy functions that return a copy of their array argument with elements added, so
+    # `arr = np.append(arr, x)` rebuilds the whole array (see pyggester.growth)
+    REBUILDING_FUNCTIONS: ClassVar[FrozenSet[str]] = frozenset(
+        ("append", "concatenate", "hstack", "vstack", "insert")
+    )
+
     class NumpyImportsVisitor(ast.NodeVisitor):
         def __init__(self):
             self.alias_name = None
@@ -280,15 +330,20 @@ class ObservableNumpyArrayWrapper(ast.NodeTransformer):
                     if getattr(name, "asname"):
                         self.alias_asname = name.asname
 
-    def __init__(self, tree) -> None:
-        self.imports_visitor = self.NumpyImportsVisitor()
-        self.imports_visitor.visit(tree)
+    def __init__(self, tree=None, imports_visitor=None, sites=None) -> None:
+        if imports_visitor is None:
+            imports_visitor = self.NumpyImportsVisitor()
+            imports_visitor.visit(tree)
+        self.imports_visitor = imports_visitor
+        self.sites = sites
 
     def visit_Assign(self, node: ast.Assign) -> ast.AST:
         """
         Now visit each Assign node and check if that node is a numpy array instance. If thats the case, wrap each instance into an ObservableNumpyArray,
         so that we can analyze its internal structure for potential suggestions.
         """
+        if not isinstance(node.targets[0], ast.Name):
+            return node
         if getattr(node, "value") and isinstance(node.value, ast.Call):
             if getattr(node.value, "func"):
                 if isinstance(node.value.func, ast.Name):
@@ -298,7 +353,10 @@ class ObservableNumpyArrayWrapper(ast.NodeTransformer):
 
                 elif isinstance(node.value.func, ast.Attribute):
                     id_ = self.get_alias_name()
-                    if node.value.func.value.id == id_:
+                    if (
+                        isinstance(node.value.func.value, ast.Name)
+                        and node.value.func.value.id == id_
+                    ):
                         return self.wrap_numpy_array(node)
 
         return node
@@ -306,8 +364,25 @@ class ObservableNumpyArrayWrapper(ast.NodeTransformer):
     def get_alias_name(self):
         return self.imports_visitor.alias_asname or self.imports_visitor.alias_name
 
+    def is_rebuild(self, node: ast.Assign) -> bool:
+        """
+        Whether the assignment rebuilds the array of its target from its previous value:
+        `arr = np.append(arr, x)` or `arr = np.concatenate((arr, chunk))`.
+        """
+        func, args = node.value.func, node.value.args
+        if not isinstance(func, ast.Attribute) or not args:
+            return False
+        if func.attr not in self.REBUILDING_FUNCTIONS:
+            return False
+        parts = args[0].elts if isinstance(args[0], (ast.Tuple, ast.List)) else args[:1]
+        return any(
+            isinstance(part, ast.Name) and part.id == node.targets[0].id
+            for part in parts
+        )
+
     def wrap_numpy_array(self, node):
-        wrapper_code = f"{node.targets[0].id}_numpy_wrapper = ObservableNumpyArray({node.targets[0].id})"
+        rebuilt = ", rebuilt_=True" if self.is_rebuild(node) else ""
+        wrapper_code = f"{node.targets[0].id}_numpy_wrapper = ObservableNumpyArray({node.targets[0].id}{site_argument(self.sites, node)}{rebuilt})"
         wrapper_node = ast.parse(wrapper_code).body[0]
         return [node, wrapper_node]
 
@@ -351,11 +426,16 @@ class ObservablePandasDataFrameWrapper(ast.NodeTransformer):
                     if getattr(name, "asname"):
                         self.alias_asname = name.asname
 
-    def __init__(self, tree) -> None:
-        self.imports_visitor = self.PandasImportsVisitor()
-        self.imports_visitor.visit(tree)
+    def __init__(self, tree=None, imports_visitor=None, sites=None) -> None:
+        if imports_visitor is None:
+            imports_visitor = self.PandasImportsVisitor()
+            imports_visitor.visit(tree)
+        self.imports_visitor = imports_visitor
+        self.sites = sites
 
     def visit_Assign(self, node: ast.Assign) -> ast.AST:
+        if not isinstance(node.targets[0], ast.Name):
+            return node
         if getattr(node, "value") and isinstance(node.value, ast.Call):
             if getattr(node.value, "func"):
                 if isinstance(node.value.func, ast.Name):
@@ -365,7 +445,10 @@ class ObservablePandasDataFrameWrapper(ast.NodeTransformer):
 
                 elif isinstance(node.value.func, ast.Attribute):
                     id_ = self.get_alias_name()
-                    if node.value.func.value.id == id_:
+                    if (
+                        isinstance(node.value.func.value, ast.Name)
+                        and node.value.func.value.id == id_
+                    ):
                         return self.wrap_numpy_array(node)
 
         return node
@@ -374,7 +457,7 @@ class ObservablePandasDataFrameWrapper(ast.NodeTransformer):
         return self.imports_visitor.alias_asname or self.imports_visitor.alias_name
 
     def wrap_numpy_array(self, node):
-        wrapper_code = f"{node.targets[0].id}_pandas_wrapper = ObservablePandasDataFrame({node.targets[0].id})"
+        wrapper_code = f"{node.targets[0].id}_pandas_wrapper = ObservablePandasDataFrame({node.targets[0].id}{site_argument(self.sites, node)})"
         wrapper_node = ast.parse(wrapper_code).body[0]
         return [node, wrapper_node]
 
@@ -404,18 +487,6 @@ class WrapperCollector(ast.NodeVisitor):
             self.observables.add(node.name.split("Wrapper")[0])
 
 
-def get_wrappers_as_strings() -> Set[str]:
-    """
-    Get observable wrappers as a set of strings.
-    This will be used by module importer to import these wrappers in each module selected for
-    transformation
-
-    """
-    wrapper_visitor = WrapperCollector()
-    wrapper_visitor.visit(ast.parse(source_code_to_str(path=pathlib.Path(__file__))))
-    return wrapper_visitor.observables
-
-
 WRAPPERS = {
     "standard_containers": {
         "list": ObservableListWrapper,
@@ -432,6 +503,26 @@ WRAPPERS = {
 }
 
 
+# Names of the observables that every transformed module imports from pyggester.observables.
+# Computed once per process from the WRAPPERS registry: each wrapper is named after the
+# observable it wraps with ('ObservableList' + 'Wrapper').
+OBSERVABLES: FrozenSet[str] = frozenset(
+    wrapper.__name__.split("Wrapper")[0]
+    for wrappers in WRAPPERS.values()
+    for wrapper in wrappers.values()
+)
+
+
+def get_wrappers_as_strings() -> FrozenSet[str]:
+    """
+    Get observable wrappers as a set of strings.
+    This will be used by module importer to import these wrappers in each module selected for
+    transformation
+
+    """
+    return OBSERVABLES
+
+
 def apply_wrappers(tree: ast.AST) -> ast.AST:
     """
     Function that offers api wrapper functionality.
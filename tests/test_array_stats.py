@@ -0,0 +1,102 @@
+import numpy
+import pytest
+from pyggester.array_stats import (
+    compute_array_stats,
+    get_chunk_size,
+    get_page_releaser,
+    iter_chunks,
+)
+
+
+def test_iter_chunks_covers_the_array_with_views():
+    arr = numpy.arange(24).reshape(6, 4)
+    chunks = list(iter_chunks(arr, chunk_size=10))
+    assert [len(chunk) for _, chunk in chunks] == [2, 2, 2]
+    assert all(numpy.shares_memory(chunk, arr) for _, chunk in chunks)
+    assert numpy.array_equal(numpy.concatenate([chunk for _, chunk in chunks]), arr)
+
+    # Lines longer than a chunk are split, the pieces after the first continue the line
+    chunks = list(iter_chunks(arr, chunk_size=3))
+    assert [continued for continued, _ in chunks] == [False, True] * 6
+    assert numpy.array_equal(
+        numpy.concatenate([chunk for _, chunk in chunks]), arr.ravel()
+    )
+
+    transposed = numpy.arange(24).reshape(2, 3, 4).transpose(2, 1, 0)
+    chunks = [chunk for _, chunk in iter_chunks(transposed, chunk_size=100)]
+    assert len(chunks) == 4 and all(chunk.base is not None for chunk in chunks)
+
+
+def test_chunk_size_follows_the_memory_budget():
+    arr = numpy.zeros(10, dtype=numpy.float64)
+    assert get_chunk_size(arr, memory_budget=1 << 20) == (1 << 20) // 52
+    assert get_chunk_size(arr, memory_budget=1) == 1
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 1 << 20])
+def test_stats_do_not_depend_on_chunks(chunk_size):
+    arr = numpy.array([3, 1, 0, 0, 7, 7, 7, 2, 0, 5])
+    stats = compute_array_stats(arr, chunk_size=chunk_size)
+    assert (stats.min, stats.max, stats.nonzero, stats.size) == (0, 7, 7, 10)
+    assert stats.distinct == 6 and stats.distinct_exact
+    assert not (stats.increasing or stats.decreasing or stats.constant)
+
+    stats = compute_array_stats(numpy.arange(10)[::-1], chunk_size=chunk_size)
+    assert stats.decreasing and not stats.increasing
+
+    # Monotonic along the last axis, each row on its own
+    stats = compute_array_stats(numpy.array([[1, 2, 3], [0, 5, 6]]), chunk_size)
+    assert stats.increasing and not stats.decreasing
+
+
+def test_stats_of_floats_strings_and_matrices():
+    stats = compute_array_stats(numpy.array([1.0, numpy.nan, -0.0, 0.0]))
+    assert stats.nan and not stats.constant
+    assert stats.distinct == 3
+
+    stats = compute_array_stats(numpy.array(["a", "a", "a"]))
+    assert stats.min is None and stats.constant and stats.increasing
+
+    matrix = numpy.array([[1, 2, 3], [2, 5, 6], [3, 6, 9]])
+    assert compute_array_stats(matrix, chunk_size=3).symmetric
+    matrix[2, 0] = 0
+    assert not compute_array_stats(matrix, chunk_size=3).symmetric
+    assert not compute_array_stats(numpy.arange(5)).symmetric
+
+
+def test_distinct_values_are_estimated_with_bounded_memory():
+    arr = numpy.arange(200_000) % 50_000
+    stats = compute_array_stats(arr, chunk_size=10_000, sketch_size=512)
+    assert not stats.distinct_exact
+    assert stats.distinct == pytest.approx(50_000, rel=0.15)
+    assert compute_array_stats(numpy.array([], dtype=int)) is None
+    assert compute_array_stats(numpy.array([[1], [[2]]], dtype=object)).distinct is None
+
+
+@pytest.mark.parametrize("mode", ["r", "c"])
+def test_memory_mapped_arrays_are_streamed(tmp_path, mode):
+    arr = numpy.arange(100_000, dtype=numpy.float64) % 700
+    arr[5] = numpy.nan
+    path = tmp_path / "data.npy"
+    numpy.save(path, arr)
+    mapped = numpy.load(path, mmap_mode=mode)
+
+    assert (get_page_releaser(mapped) is None) == (mode == "c")
+    assert get_page_releaser(arr) is None
+    stats = compute_array_stats(mapped, memory_budget=64 * 1024)
+    # NaN min/max never compare equal
+    expected = compute_array_stats(arr)._replace(min=None, max=None)
+    assert stats._replace(min=None, max=None) == expected
+    assert numpy.isnan(stats.max) and stats.nan and stats.distinct == 701
+
+
+def test_symmetry_of_memory_mapped_matrices(tmp_path):
+    matrix = numpy.arange(300 * 300, dtype=numpy.int32).reshape(300, 300)
+    matrix = matrix + matrix.T
+    mapped = numpy.memmap(
+        tmp_path / "matrix", dtype=numpy.int32, mode="w+", shape=matrix.shape
+    )
+    mapped[:] = matrix
+    assert compute_array_stats(mapped, chunk_size=1000).symmetric
+    mapped[299, 0] = -1
+    assert not compute_array_stats(mapped, chunk_size=1000).symmetric
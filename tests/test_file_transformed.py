@@ -1,10 +1,6 @@
 from pyggester.observable_collector import OBSERVABLE_COLLECTOR
-from pyggester.observables import ObservableList, ObservableNamedTuple, ObservableSet, ObservableDict, ObservableTuple, ObservableNumpyArray, ObservablePandasDataFrame
-
+from pyggester.observables import ObservableDict, ObservableList, ObservableNamedTuple, ObservableNumpyArray, ObservablePandasDataFrame, ObservableSet, ObservableTuple
 
 def func1():
     pass
-
-
-for observable in OBSERVABLE_COLLECTOR:
-    observable.run()
+OBSERVABLE_COLLECTOR.run()
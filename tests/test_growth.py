@@ -0,0 +1,76 @@
+import sys
+from pyggester.growth import (
+    MIN_REBUILDS,
+    Growth,
+    GrowthSummary,
+    get_reallocations,
+)
+
+
+def test_reallocations_follow_cpython_lists():
+    for size in (1, 5, 17, 100, 1000, 12345):
+        items = []
+        for item in range(size):
+            items.append(item)
+        _, _, allocated = get_reallocations(size)
+        assert sys.getsizeof(items) == sys.getsizeof([]) + 8 * allocated
+    assert get_reallocations(0) == (0, 0, 0)
+    reallocations, moved, _ = get_reallocations(1000)
+    assert 20 < reallocations < 40
+    assert 1000 < moved < 10 * 1000
+
+
+def test_predictable_list_sizes():
+    summary = GrowthSummary()
+    for size in (1000, 1050, 980):
+        summary.add(Growth(size=size, peak=size, operations=size))
+    assert (summary.min_size, summary.max_size) == (980, 1050)
+    assert summary.spread == (1050 - 980) / 1050
+    message, instances, saving = summary.check_list()
+    assert "980-1050 elements" in message and "[None] * n" in message
+    assert instances == 3
+    assert saving.nbytes > 0 and saving.operations > 3000
+
+    # Sizes that vary a lot can't be preallocated
+    summary.add(Growth(size=100, peak=100, operations=100))
+    assert summary.check_list() is None
+
+
+def test_lists_that_shrink_or_barely_grow_are_not_preallocated():
+    shrunk = GrowthSummary()
+    shrunk.add(Growth(size=1000, peak=1000, operations=1000))
+    shrunk.add(Growth(size=10, peak=1000, operations=1000))
+    assert (shrunk.grown, shrunk.shrunk) == (2, 1)
+    assert shrunk.check_list() is None
+
+    small = GrowthSummary()
+    small.add(Growth(size=10, peak=10, operations=10))
+    assert small.check_list() is None
+
+    # A single instance always has a predictable size
+    single = GrowthSummary()
+    single.add(Growth(size=1000, peak=1000, operations=1000))
+    assert single.check_list() is None
+
+    # Queues get the deque suggestion instead
+    queues = GrowthSummary()
+    for _ in range(3):
+        queues.add(Growth(size=1000, peak=1000, operations=1000, queued=True))
+    assert queues.queued == 3
+    assert queues.check_list() is None
+
+
+def test_rebuilt_arrays():
+    summary = GrowthSummary()
+    for size in range(1, MIN_REBUILDS):
+        summary.add(Growth(size=size, peak=size, operations=1, rebuilt=True))
+    assert summary.check_array() is None
+    summary.add(
+        Growth(size=MIN_REBUILDS, peak=MIN_REBUILDS, operations=1, rebuilt=True)
+    )
+    message, instances, saving = summary.check_array()
+    assert "np.empty(n)" in message
+    assert instances == MIN_REBUILDS
+    copied = MIN_REBUILDS * (MIN_REBUILDS + 1) // 2
+    assert saving.operations == copied - MIN_REBUILDS
+    assert summary.to_dict()["copied"] == copied
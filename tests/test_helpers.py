@@ -3,6 +3,7 @@ from pyggester.helpers import (
     source_code_to_str,
     PathMissingSourceCodeConversionError,
     not_implemented,
+    parse_size,
 )
 
 
@@ -44,3 +45,12 @@ def test_not_implemented_decorator():
         NotImplementedError, match="example_function is not yet implemented"
     ):
         example_function()
+
+
+def test_parse_size():
+    assert parse_size("4096") == 4096
+    assert parse_size("64k") == 64 * 1024
+    assert parse_size("512MB") == 512 * 1024**2
+    assert parse_size("1.5 GB") == int(1.5 * 1024**3)
+    with pytest.raises(ValueError):
+        parse_size("lots")
@@ -0,0 +1,85 @@
+import sys
+import pathlib
+import tempfile
+from unittest.mock import patch
+import pytest
+from pyggester import hook
+from pyggester.observables import ObservableList
+
+
+@pytest.fixture
+def project_dir():
+    with tempfile.TemporaryDirectory() as tmpdirname:
+        project_dir = pathlib.Path(tmpdirname)
+        (project_dir / "hooked_module.py").write_text("values = [1, 2, 3]\n")
+        sys.path.insert(0, str(project_dir))
+        yield project_dir
+        sys.path.remove(str(project_dir))
+        sys.modules.pop("hooked_module", None)
+
+
+@pytest.fixture
+def finder(project_dir):
+    finder = hook.install(root=project_dir)
+    yield finder
+    hook.uninstall(finder)
+
+
+def test_finder_matches_globs():
+    finder = hook.ObservableFinder(include=["app", "app.*"], exclude=["app.tests.*"])
+    assert finder.matches("app")
+    assert finder.matches("app.models")
+    assert not finder.matches("app.tests.test_models")
+    assert not finder.matches("other")
+    assert not finder.matches("pyggester.hook")
+
+
+def test_module_is_transformed_while_imported(finder, project_dir):
+    with patch.object(sys, "dont_write_bytecode", False):
+        import hooked_module
+
+    assert isinstance(hooked_module.values, ObservableList)
+    assert isinstance(hooked_module.__loader__, hook.ObservableLoader)
+    assert not (project_dir / "hooked_module_transformed.py").exists()
+    assert pathlib.Path(
+        hook.get_bytecode_cache_path(str(project_dir / "hooked_module.py"))
+    ).exists()
+
+
+def test_unchanged_module_is_loaded_from_bytecode_cache(finder, project_dir):
+    source_path = str(project_dir / "hooked_module.py")
+    with patch.object(sys, "dont_write_bytecode", False):
+        hook.ObservableLoader("hooked_module", source_path).get_code("hooked_module")
+
+    with patch("pyggester.hook.compile_observable_transformations") as mock_compile:
+        code = hook.ObservableLoader("hooked_module", source_path).get_code(
+            "hooked_module"
+        )
+
+    mock_compile.assert_not_called()
+    namespace = {"__file__": source_path}
+    exec(code, namespace)
+    assert isinstance(namespace["values"], ObservableList)
+
+
+def test_modules_outside_root_are_not_transformed(project_dir):
+    finder = hook.ObservableFinder(root=project_dir / "elsewhere")
+    assert finder.find_spec("hooked_module", None) is None
+
+
+def test_installed_packages_are_not_transformed(project_dir):
+    packages_dir = project_dir / ".venv" / "lib" / "site-packages"
+    packages_dir.mkdir(parents=True)
+    (packages_dir / "installed_module.py").write_text("values = [1]\n")
+    with patch.object(sys, "prefix", str(project_dir / ".venv")):
+        finder = hook.ObservableFinder(root=project_dir)
+    assert finder.find_spec("installed_module", [str(packages_dir)]) is None
+    assert finder.find_spec("hooked_module", None) is not None
+
+    with patch("site.getsitepackages", return_value=[str(packages_dir)]):
+        finder = hook.ObservableFinder(root=project_dir)
+    assert finder.find_spec("installed_module", [str(packages_dir)]) is None
+
+    # An environment directory that contains the project doesn't exclude it
+    finder = hook.ObservableFinder(root=project_dir, excluded_dirs=[project_dir.parent])
+    assert finder.find_spec("hooked_module", None) is not None
@@ -0,0 +1,260 @@
+import gc
+import pickle
+from unittest.mock import patch
+import numpy
+import pytest
+from pyggester.observable_collector import ObservableCollector, SiteSummary
+from pyggester.report_budget import BudgetTracker, ReportBudget
+from pyggester.observables import (
+    ObservableDict,
+    ObservableList,
+    ObservableNumpyArray,
+    ObservableSet,
+)
+from pyggester.sites import register_sites
+from pyggester.verify import Verifier
+
+
+@pytest.fixture
+def collector():
+    collector = ObservableCollector()
+    with patch("pyggester.observables.OBSERVABLE_COLLECTOR", collector):
+        yield collector
+
+
+def test_collector_does_not_keep_observables_alive(collector):
+    site_id = register_sites("module.py", ((1, 0, "<module>"),))
+    for _ in range(100):
+        collector.append(ObservableList([1, 2, 3], site_id_=site_id))
+    gc.collect()
+
+    assert len(collector) == 0
+    summary = collector.summaries[site_id]
+    assert summary.instances == 100
+    assert summary.checks["check_array_instead_of_list"] == 100
+    assert summary.messages["check_array_instead_of_list"] == (
+        "Consider using an array.array instead of a list, for optimal memory consumption"
+    )
+
+
+def test_observables_in_reference_cycles_are_evaluated(collector):
+    site_id = register_sites("cycles.py", ((1, 0, "<module>"),))
+    items = ObservableList([1, 2], site_id_=site_id)
+    items.append(items)
+    collector.append(items)
+
+    class Node:
+        pass
+
+    node = Node()
+    node.node = node
+    node.mapping = ObservableDict({"a": 1}, site_id_=site_id)
+    collector.append(node.mapping)
+    del items, node
+    gc.collect()
+
+    assert len(collector) == 0
+    assert collector.summaries[site_id].instances == 2
+
+
+def test_only_collected_observables_are_finalized(collector):
+    site_id = register_sites("module.py", ((1, 4, "<module>"),))
+    items = ObservableList([1, 2, 3], site_id_=site_id)
+    assert not hasattr(items, "__del__")
+
+    collector.append(items)
+    assert hasattr(items, "__del__") and isinstance(items, ObservableList)
+    assert type(pickle.loads(pickle.dumps(items))) is ObservableList
+
+
+def test_run_evaluates_alive_observables_once(collector, capsys):
+    site_id = register_sites("module.py", ((2, 0, "<module>"),))
+    alive = [ObservableSet({1, 2}, site_id_=site_id) for _ in range(3)]
+    for observable in alive:
+        collector.append(observable)
+    assert list(collector) == alive
+
+    collector.run()
+    output = capsys.readouterr().out
+    assert output.count("Suggestions(module.py)") == 1
+    assert "frozenset" in output
+    assert len(collector) == 0
+
+    del alive
+    gc.collect()
+    assert collector.summaries == {}
+
+
+def test_uncollected_observables_are_not_evaluated(collector):
+    ObservableList([1, 2, 3])
+    gc.collect()
+    assert collector.summaries == {}
+
+
+def test_plain_objects_are_ignored(collector):
+    collector.append(None)
+    assert len(collector) == 0
+
+
+def test_site_summary_aggregates_instances(collector, capsys):
+    site_id = register_sites("module.py", ((3, 4, "handler"),))
+    for size in range(1, 2001):
+        items = ObservableList(range(size), site_id_=site_id)
+        if size % 2:
+            items.count(0)
+        collector.append(items)
+    del items
+    gc.collect()
+
+    summary = collector.summaries[site_id]
+    assert summary.instances == 2000
+    assert summary.checks["check_Counter_insteaf_of_list"] == 1000
+    assert (summary.min_size, summary.max_size) == (1, 2000)
+    assert len(summary.size_samples) == SiteSummary.SIZE_SAMPLES
+    assert 800 < summary.median_size < 1200
+
+    collector.run()
+    output = capsys.readouterr().out
+    assert output.count("Suggestions(module.py)") == 1
+    assert "2000 instance(s) in handler" in output
+    assert "(1000/2000 instances)" in output
+
+
+def test_report_sorted_by_saving(collector, capsys):
+    small, large = (
+        register_sites("savings.py", ((line, 0, "<module>"),)) for line in (1, 2)
+    )
+    collector.append(ObservableList([1.5, 2.5], site_id_=small))
+    collector.append(ObservableList([float(i) for i in range(1000)], site_id_=large))
+    collector.sort = "memory"
+    collector.run()
+    output = capsys.readouterr().out
+    assert output.index("2 | Suggestions") < output.index("1 | Suggestions")
+    assert "estimated saving: ~" in output
+
+    collector.append(ObservableList([1.5, 2.5], site_id_=small))
+    collector.append(ObservableList([float(i) for i in range(1000)], site_id_=large))
+    collector.sort = "site"
+    collector.run()
+    output = capsys.readouterr().out
+    assert output.index("1 | Suggestions") < output.index("2 | Suggestions")
+
+
+def test_report_shows_verifications(collector, capsys):
+    site_id = register_sites("verify.py", ((1, 0, "<module>"),))
+    with patch(
+        "pyggester.observable_collector.VERIFIER", Verifier(enabled=True, repeat=1)
+    ), patch("pyggester.observables.VERIFIER", Verifier(enabled=True, repeat=1)):
+        for size in (10, 100):
+            collector.append(
+                ObservableList([float(i) for i in range(size)], site_id_=site_id)
+            )
+        gc.collect()
+    verification = collector.summaries[site_id].verifications[
+        "check_array_instead_of_list"
+    ]
+    assert verification.elements == 100
+    collector.run()
+    assert "measured: " in capsys.readouterr().out
+
+
+def test_site_suggests_preallocation(collector, capsys):
+    lists, arrays = (
+        register_sites("growth.py", ((line, 0, "<module>"),)) for line in (1, 2)
+    )
+    for _ in range(5):
+        items = ObservableList([], site_id_=lists)
+        for item in range(1000):
+            items.append(item)
+        collector.append(items)
+    arr = numpy.empty(0)
+    for item in range(20):
+        arr = numpy.append(arr, item)
+        collector.append(ObservableNumpyArray(arr, site_id_=arrays, rebuilt_=True))
+    del items, arr
+    gc.collect()
+
+    summary = collector.summaries[lists]
+    assert summary.growth.grown == 5
+    summary.analyze()
+    assert summary.checks["check_preallocated_list"] == 5
+    assert summary.savings["check_preallocated_list"].operations > 5000
+    assert summary.to_dict()["growth"]["spread"] == 0.0
+
+    collector.run()
+    output = capsys.readouterr().out
+    assert "[None] * n" in output and "(5/5 instances)" in output
+    assert "rebuilt 20 times" in output and "(20/20 instances)" in output
+
+
+def test_site_suggests_record_type(collector, capsys):
+    site_id = register_sites("records.py", ((1, 0, "<module>"),))
+    for index in range(200):
+        collector.append(
+            ObservableDict({"id": index, "name": str(index)}, site_id_=site_id)
+        )
+    gc.collect()
+    summary = collector.summaries[site_id]
+    summary.analyze()
+    assert summary.checks["check_record_type"] == 200
+    assert summary.savings["check_record_type"].nbytes > 200 * 50
+
+    collector.run()
+    output = capsys.readouterr().out
+    assert "records with the same 2 keys (id, name)" in output
+    assert "(200/200 instances)" in output
+
+
+@pytest.mark.parametrize("spec", ["threads=4", "threads=2,processes=2"])
+def test_concurrent_report_matches_serial_report(collector, capsys, spec):
+    site_ids = [
+        register_sites("workers.py", ((line, 0, "<module>"),)) for line in range(1, 5)
+    ]
+    alive = []
+    for index in range(40):
+        site_id = site_ids[index % 4]
+        alive.append(ObservableList(range(index), site_id_=site_id))
+        alive.append(ObservableSet({index, lambda: index}, site_id_=site_id))
+        alive.append(ObservableNumpyArray(numpy.arange(index + 1), site_id_=site_id))
+
+    def report(spec):
+        collector.configure(spec)
+        for observable in alive:
+            collector.append(observable)
+        collector.run()
+        return capsys.readouterr().out
+
+    serial = report("")
+    assert serial.count("Suggestions(workers.py)") == 4
+    assert report(spec) == serial
+
+
+def test_configure_workers(collector):
+    collector.configure("threads=3, processes=2")
+    assert (collector.threads, collector.processes) == (3, 2)
+    with pytest.raises(ValueError):
+        collector.configure("threads=0")
+
+
+def test_budget_evaluates_highest_impact_first(collector, capsys):
+    site_ids = [
+        register_sites("budget.py", ((line, 0, "<module>"),)) for line in (1, 2)
+    ]
+    small = [ObservableList([1, 2], site_id_=site_ids[0]) for _ in range(3)]
+    large = [ObservableList(range(1000), site_id_=site_ids[1]) for _ in range(2)]
+    for observable in small + large:
+        collector.append(observable)
+
+    class TwoEvaluations(BudgetTracker):
+        def exhausted(self):
+            self.reason = "time"
+            self.calls = getattr(self, "calls", 0) + 1
+            return self.calls > 2
+
+    collector.budget = ReportBudget(seconds=5)
+    with patch("pyggester.observable_collector.BudgetTracker", TwoEvaluations):
+        collector.run()
+    output = capsys.readouterr().out
+    assert "Suggestions(budget.py)" in output and "2 instance(s)" in output
+    assert "ran out of time: 3 observable(s) were not evaluated" in output
+    assert "budget.py:1 in <module>: 3 instance(s)" in output
@@ -1,10 +1,45 @@
 import ast
-import astor
+import importlib
+import sys
+import types
+import pytest
+from pyggester.module_importer import add_imports
 from pyggester.observable_transformations import (
     ObservableCollectorAppender,
     ObservableRunner,
+    apply_observable_collector_modifications,
     apply_observable_collector_transformations,
+    transform_tree,
 )
+from pyggester.sites import SITE_BASE_NAME, get_site
+from pyggester.wrappers import apply_wrappers, get_wrappers_as_strings
+
+MODULE_CODE = """
+import numpy as np
+import pandas as pd
+from collections import namedtuple
+Point = namedtuple('Point', ['x', 'y'])
+items = [1, 2, 3]
+pairs = {'a': 1}
+unique = {1, 2}
+pair = (1, 2)
+point = Point(1, 2)
+arr = np.array([1, 2, 3])
+df = pd.DataFrame({'A': [1, 2]})
+copied = list(range(3))
+nested = {'a': [1, 2], 'b': ({3}, [4]), 'c': {'d': 1}}
+rows = [{'x': (1, [2])}, [5], list(range(2)), {6, (7, 8)}]
+pairs_of_sets = ({1}, {'e': [9]}, (10,), dict(f=[11]))
+unique_tuples = {(1, [2]), frozenset([3])}
+def function(x=[1]):
+    y = dict(a=1)
+    for i in [1, 2]:
+        z = {3}
+    print([1, 2], (3, 4))
+    return y
+class Class:
+    attrs = [1]
+"""
 
 
 def test_observable_collector_appender():
@@ -13,7 +48,7 @@ def test_observable_collector_appender():
     transformer = ObservableCollectorAppender()
     transformed_tree = transformer.visit(tree)
 
-    transformed_code = astor.to_source(transformed_tree)
+    transformed_code = ast.unparse(transformed_tree)
     assert "OBSERVABLE_COLLECTOR.append(list_)" in transformed_code
 
 
@@ -22,10 +57,9 @@ def test_observable_runner():
     transformer = ObservableRunner()
     transformed_tree = transformer.visit(tree)
 
-    transformed_code = astor.to_source(transformed_tree)
+    transformed_code = ast.unparse(transformed_tree)
 
-    assert "for observable in OBSERVABLE_COLLECTOR:" in transformed_code
-    assert "observable.run()" in transformed_code
+    assert "OBSERVABLE_COLLECTOR.run()" in transformed_code
 
 
 def test_apply_observable_collector_transformations():
@@ -39,3 +73,92 @@ def test_apply_observable_collector_transformations():
         "from pyggester.observables import" in transformed_code
         or "import pyggester.observables" in transformed_code
     )
+
+
+class SiteIdRemover(ast.NodeTransformer):
+    def visit_Call(self, node):
+        self.generic_visit(node)
+        node.keywords = [kw for kw in node.keywords if kw.arg != "site_id_"]
+        return node
+
+    def visit_ImportFrom(self, node):
+        return None if node.module == "pyggester.sites" else node
+
+    def visit_Assign(self, node):
+        if ast.unparse(node.targets[0]) == SITE_BASE_NAME:
+            return None
+        return self.generic_visit(node)
+
+
+def test_single_pass_matches_multi_pass_pipeline():
+    tree = ast.parse(MODULE_CODE)
+    tree = add_imports(tree, "pyggester.observables", get_wrappers_as_strings())
+    tree = add_imports(tree, "pyggester.observable_collector", ["OBSERVABLE_COLLECTOR"])
+    tree = apply_wrappers(tree)
+    tree = apply_observable_collector_modifications(tree, run_observables=True)
+
+    single_pass_tree = transform_tree(ast.parse(MODULE_CODE), run_observables=True)
+    single_pass_tree = SiteIdRemover().visit(single_pass_tree)
+
+    assert ast.unparse(single_pass_tree) == ast.unparse(tree)
+
+
+def test_unpacking_targets_are_not_wrapped():
+    tree = transform_tree(ast.parse("a, b = 1, 2\n[c, d] = [3, 4]"))
+    transformed_code = ast.unparse(tree)
+
+    assert "a, b = ObservableTuple((1, 2), site_id_=" in transformed_code
+    assert "[c, d] = ObservableList([3, 4], site_id_=" in transformed_code
+
+
+def test_imports_are_added_after_future_imports():
+    tree = transform_tree(ast.parse('"""doc"""\nfrom __future__ import annotations'))
+    compile(ast.fix_missing_locations(tree), "<test>", "exec")
+
+
+def test_emitted_source_and_code_object_are_equivalent():
+    source = apply_observable_collector_transformations(
+        ast.parse(MODULE_CODE), run_observables=True
+    )
+    code = apply_observable_collector_transformations(
+        ast.parse(MODULE_CODE), run_observables=True, emit="code"
+    )
+    tree = transform_tree(ast.parse(MODULE_CODE), run_observables=True)
+
+    assert ast.dump(ast.parse(source)) == ast.dump(tree)
+    assert isinstance(code, types.CodeType)
+    assert set(compile(source, "<pyggester>", "exec").co_names) == set(code.co_names)
+
+
+def test_unknown_emit_mode():
+    with pytest.raises(ValueError):
+        apply_observable_collector_transformations(ast.parse(""), emit="bytes")
+
+
+def test_allocation_sites_are_registered():
+    code = "def outer():\n    class Inner:\n        def method(self):\n            return [1]\n"
+    transformed_code = apply_observable_collector_transformations(ast.parse(code))
+    namespace = {"__file__": "module.py"}
+    exec(transformed_code, namespace)
+
+    site = get_site(namespace[SITE_BASE_NAME])
+    assert site.file_path == "module.py"
+    assert (site.line_nr, site.col) == (4, 19)
+    assert site.function == "outer.Inner.method"
+
+
+def test_star_import_keeps_the_site_base(tmp_path, monkeypatch):
+    for name, code in (
+        ("star_b", "helpers = [1]\nmapping = {'b': 1}\n"),
+        ("star_a", "from star_b import *\nitems = [1, 2, 3]\n"),
+    ):
+        transformed_code = apply_observable_collector_transformations(ast.parse(code))
+        (tmp_path / f"{name}.py").write_text(transformed_code)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, "star_a", raising=False)
+    monkeypatch.delitem(sys.modules, "star_b", raising=False)
+
+    module = importlib.import_module("star_a")
+
+    assert get_site(module.items.site_id_).file_path.endswith("star_a.py")
+    assert get_site(module.helpers.site_id_).file_path.endswith("star_b.py")
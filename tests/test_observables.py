@@ -1,5 +1,8 @@
 from collections import namedtuple
+import pickle
 import numpy
+from unittest.mock import patch
+import pytest
 import pandas as pd
 from pyggester.observables import (
     ObservableList,
@@ -9,7 +12,11 @@ from pyggester.observables import (
     ObservablePandasDataFrame,
     ObservableSet,
     ObservableTuple,
+    get_element_kind,
 )
+from pyggester.growth import Growth
+from pyggester.sampling import ContentSampler
+from pyggester.verify import Verifier
 
 
 def test_different_ways_of_list_initialization():
@@ -65,14 +72,14 @@ def test_check_numpy_array_instead_of_list():
     obs_list.check_numpy_array_instead_of_list()
 
     assert (
-        "Consider using a numpy array instead of a list, for faster computations and optimized memory utilization"
+        "Consider using a numpy array instead of a list, for faster computations and optimized memory utilization [exact]"
         in obs_list.message_handler.messages
     )
 
     obs_list = ObservableList([1, 2, 3])
     obs_list.check_numpy_array_instead_of_list()
     assert (
-        "Consider using a numpy array instead of a list, for faster computations and optimized memory utilization"
+        "Consider using a numpy array instead of a list, for faster computations and optimized memory utilization [exact]"
         not in obs_list.message_handler.messages
     )
 
@@ -105,18 +112,20 @@ def test_check_list_to_set_conversion():
 
 def test_check_set_instead_of_list():
     obs_list = ObservableList([1, 2, 3])
-    obs_list.in_operator_used = True
+    # The lookups compared more elements (3 + 2 + 3) than the list has
+    assert 3 in obs_list and 2 in obs_list and 4 not in obs_list
     obs_list.check_set_instead_of_list()
     assert (
-        "Consider using a set instead of a list, because of unique elements and element existence checking"
+        "Consider using a set instead of a list, because of unique elements and element existence checking [exact]"
         in obs_list.message_handler.messages
     )
 
     obs_list = ObservableList([1, 2, 3])
-    obs_list.in_operator_used = False
+    # A single lookup is cheaper than building a set
+    assert 1 in obs_list
     obs_list.check_set_instead_of_list()
     assert (
-        "Consider using a set instead of a list, because of unique elements"
+        "Consider using a set instead of a list, because of unique elements [exact]"
         in obs_list.message_handler.messages
     )
 
@@ -163,6 +172,76 @@ def test_check_tuple_instead_of_list():
     )
 
 
+def test_list_element_kinds_follow_mutations():
+    obs_list = ObservableList([1, 2.0, "a"])
+    obs_list.append([1])
+    obs_list.extend(x for x in (3, "bc"))
+    obs_list += [4.5]
+    obs_list.insert(0, True)
+    obs_list[1] = "z"
+    obs_list[2:4] = [7, 8, 9]
+    obs_list.remove(1.0)
+    obs_list.pop()
+    del obs_list[:1]
+    obs_list *= 2
+
+    expected = [0] * 5
+    for item in obs_list:
+        expected[get_element_kind(item)] += 1
+    assert obs_list.kinds == expected
+    assert obs_list == [7, 8, 9, [1], 3, "bc"] * 2
+
+    obs_list.clear()
+    assert obs_list.kinds == [0] * 5
+
+
+def test_list_counts_the_kinds_of_its_initial_elements():
+    class Name(str):
+        pass
+
+    items = [1, True, 2.5, "a", "bc", Name("d"), Name("ef"), [1], None, 3]
+    obs_list = ObservableList(items)
+
+    expected = [0] * 5
+    for item in items:
+        expected[get_element_kind(item)] += 1
+    assert obs_list.kinds == expected
+    # Counting the elements is not a scan of the list
+    assert (obs_list.rescans, obs_list.rescanned) == (0, 0)
+
+
+def test_list_sets_its_counters_lazily():
+    items = ObservableList(range(10))
+    for name in ObservableList.DEFAULTS:
+        with pytest.raises(AttributeError):
+            getattr(ObservableList, name).__get__(items)
+    assert (items.appended, items.rescans, items.peak) == (0, 0, 0)
+
+    # The peak length is kept from the first time the length changes
+    for _ in range(5):
+        items.pop()
+    items.append("a")
+    assert items.get_growth() == Growth(size=6, peak=10, operations=1)
+    assert items.kinds == [5, 0, 1, 0, 0]
+
+
+def test_list_checks_use_element_kinds():
+    obs_list = ObservableList([1, 2, 3])
+    obs_list.append(4.0)
+    obs_list.check_array_instead_of_list()
+    assert obs_list.message_handler_ is None
+
+    obs_list.remove(4.0)
+    obs_list.check_array_instead_of_list()
+    assert (
+        "Consider using an array.array instead of a list, for optimal memory consumption"
+        in obs_list.message_handler.messages
+    )
+
+    obs_list.append([5, 6])
+    assert not obs_list.check_list_to_set_conversion()
+
+
 def test_different_ways_of_set_initialization():
     assert isinstance(ObservableSet({1, 2, 3}), set)
     assert isinstance(ObservableSet(set({1, 2, 3})), set)
@@ -215,7 +294,8 @@ def check_observable_set_additional_attributes_test():
     assert hasattr(obs_set, "removed")
     assert hasattr(obs_set, "added")
     assert hasattr(obs_set, "updated")
-    assert hasattr(obs_set, "if_it_was_a_list")
+    assert hasattr(obs_set, "insert_attempts")
+    assert hasattr(obs_set, "insertions")
     assert hasattr(obs_set, "message_handler")
 
 
@@ -240,6 +320,48 @@ def test_check_list_instead_of_set():
     )
 
 
+def test_set_duplicate_tracking_uses_constant_memory():
+    obs_set = ObservableSet({1})
+    for i in range(10000):
+        obs_set.add(i % 10)
+    obs_set.update(range(5), (x for x in [42]))
+    obs_set |= {43}
+
+    assert obs_set.insert_attempts == 10007
+    assert obs_set.insertions == 11
+    assert obs_set.get_duplicate_rate() == pytest.approx(9996 / 10007)
+    obs_set.check_list_instead_of_set()
+    assert obs_set.message_handler_ is not None
+
+    unique_set = ObservableSet(set())
+    unique_set.update(range(100))
+    unique_set.check_list_instead_of_set()
+    assert unique_set.message_handler_ is None
+
+
+def test_set_ior_only_takes_sets():
+    obs_set = ObservableSet({1})
+    obs_set |= frozenset({2})
+    assert obs_set == {1, 2} and obs_set.insert_attempts == 1
+    with pytest.raises(TypeError):
+        obs_set |= [3]
+    assert obs_set == {1, 2} and obs_set.insert_attempts == 1
+
+
+def test_set_duplicate_sketch(monkeypatch):
+    monkeypatch.setattr(ObservableSet, "SKETCH_SIZE", 64)
+    obs_set = ObservableSet(set())
+    for i in range(1000):
+        obs_set.add(i)
+        obs_set.remove(i)
+        obs_set.add(i)
+
+    # Re-adding removed elements are new insertions, but the sketch still sees duplicates
+    assert obs_set.insertions == obs_set.insert_attempts
+    assert obs_set.get_duplicate_rate() == pytest.approx(0.5, abs=0.15)
+    assert len(obs_set.sketch.heap) == 64
+
+
 def test_different_ways_of_tuple_initialization():
     assert isinstance(ObservableTuple((1, 2, 3)), tuple)
     assert isinstance(ObservableTuple(tuple([1, 2, 3])), tuple)
@@ -348,11 +470,29 @@ def check_observable_dict_additional_attributes_test():
     assert hasattr(obs_dict, "message_handler")
 
 
+def test_content_checks_sample_large_containers():
+    with patch("pyggester.observables.CONTENT_SAMPLER", ContentSampler(10, 5)):
+        obs_list = ObservableList(range(100))
+        obs_list.check_set_instead_of_list()
+        assert obs_list.message_handler.messages == [
+            "Consider using a set instead of a list, because of unique elements [sampled: 5 of 100 elements]"
+        ]
+        obs_list = ObservableList([[1, 2]] * 100)
+        obs_list.check_numpy_array_instead_of_list()
+        assert obs_list.message_handler.messages[0].endswith(
+            "[sampled: 5 of 100 elements]"
+        )
+        obs_dict = ObservableDict((key, str(key)) for key in range(100))
+        obs_dict.check_Counter_instead_of_dict()
+        assert obs_dict.message_handler_ is None
+        assert not obs_dict.values_
+
+
 def test_check_Counter_instead_of_dict():
     obs_dict = ObservableDict(a=1, b=2, c=3)
     obs_dict.check_Counter_instead_of_dict()
     assert (
-        "If you are using this dict to store occurences of elements, consider using a collections.Counter"
+        "If you are using this dict to store occurences of elements, consider using a collections.Counter [exact]"
         in obs_dict.message_handler.messages
     )
 
@@ -450,6 +590,19 @@ def test_check_for_constant_values():
     )
 
 
+def test_numpy_checks_share_one_pass():
+    obs_array = ObservableNumpyArray(numpy.array([3, -100, 3]))
+    assert [check for check, _ in obs_array.evaluate()] == ["check_array_data_type"]
+    assert "Consider using int8" in obs_array.message_handler.messages[0]
+
+    # 1-D arrays are not symmetric matrices, string arrays have no integer data type to shrink
+    obs_array = ObservableNumpyArray(numpy.array(["b", "a", "b", "b", "b"]))
+    assert [check for check, _ in obs_array.evaluate()] == [
+        "check_for_categorical_data"
+    ]
+    assert ObservableNumpyArray(numpy.array([], dtype=int)).evaluate() == []
+
+
 def test_check_for_missing_values():
     df = pd.DataFrame({"A": [1, 2, None], "B": [4, 5, 6]})
     observable_df = ObservablePandasDataFrame(df)
@@ -532,3 +685,263 @@ def test_check_for_ignoring_namedtuple_advantages():
         "Consider using namedtuples for simpler data structures with fewer fields for better readability."
         in observable_tuple.message_handler.messages
     )
+
+
+def test_savings_of_list_suggestions():
+    numbers = ObservableList(range(1000, 2000))
+    for _ in range(3):
+        assert 1500 in numbers
+    numbers.count(1000)
+    numbers.count(1001)
+    savings = numbers.estimate_savings(numbers.evaluate())
+    assert set(savings) == {
+        "check_array_instead_of_list",
+        "check_set_instead_of_list",
+        "check_Counter_insteaf_of_list",
+    }
+    # 1000 int objects and their pointers, against 8 bytes per element
+    assert savings["check_array_instead_of_list"].nbytes > 1000 * 20
+    # A set uses more memory than a list, but saves the scans of `in`
+    assert savings["check_set_instead_of_list"].nbytes < 0
+    assert savings["check_set_instead_of_list"].operations > 0
+
+
+def test_savings_of_numpy_suggestions():
+    obs_array = ObservableNumpyArray(numpy.zeros((100, 100), dtype=numpy.int64))
+    savings = obs_array.estimate_savings(obs_array.evaluate())
+    assert savings["check_array_data_type"].nbytes == 100 * 100 * 7
+    assert savings["check_for_constant_values"].nbytes == 100 * 100 * 8 - 8
+    assert savings["check_array_sparsity"].nbytes == 100 * 100 * 8
+    assert savings["check_for_symmetry"].nbytes == 100 * 99 // 2 * 8
+    # Checks without an estimator don't get a saving
+    assert "check_for_monotonicity" not in savings
+
+
+def test_verify_list_suggestions():
+    numbers = ObservableList(range(2000))
+    assert 1000 in numbers
+    with patch("pyggester.observables.VERIFIER", Verifier(enabled=True, repeat=1)):
+        verifications = numbers.verify(numbers.evaluate())
+    assert set(verifications) == {
+        "check_array_instead_of_list",
+        "check_set_instead_of_list",
+    }
+    assert verifications["check_array_instead_of_list"].memory_delta > 0
+    assert verifications["check_set_instead_of_list"].speedup > 1
+
+
+def test_list_counts_operations_and_scanned_elements():
+    obs_list = ObservableList([5, 6, 7, 8])
+    obs_list.append(9)
+    obs_list.append(10)
+    assert 7 in obs_list and 11 not in obs_list
+    assert obs_list.index(8) == 3
+    assert obs_list.index(9, 2) == 4
+    with pytest.raises(ValueError):
+        obs_list.index(5, -3)
+    assert obs_list.count(6) == 1
+    assert (obs_list.appended, obs_list.in_operator_used, obs_list.index_) == (2, 2, 3)
+    # in: 3 + 6, index: 4 + 3 + 3, count: 6
+    assert obs_list.scanned == 25
+    assert obs_list.get_access_count() == 1 + 2 + 2 + 3 + 1
+
+
+def test_dict_and_set_count_operations():
+    obs_dict = ObservableDict({"a": 1})
+    for _ in range(3):
+        obs_dict["a"]
+    obs_dict.pop("a")
+    with pytest.raises(KeyError):
+        obs_dict.pop("a")
+    assert obs_dict.pop("a", None) is None
+    assert (obs_dict.getitem_, obs_dict.pop_) == (3, 2)
+
+    obs_set = ObservableSet(set())
+    obs_set.add(1)
+    obs_set.add(2)
+    obs_set.remove(1)
+    assert (obs_set.added, obs_set.removed) == (2, 1)
+
+
+def test_check_deque_instead_of_list():
+    queue = ObservableList(range(10))
+    for item in range(10, 30):
+        queue.append(item)
+        queue.pop(0)
+    queue.insert(0, -1)
+    del queue[:2]
+    queue.remove(queue[0])
+    assert (queue.front_removed, queue.front_inserted) == (23, 1)
+    # pop(0) of 11 elements: 20 * 10, insert(0, x): 10, del [:2]: 9, remove(): 8
+    assert queue.shifted == 200 + 10 + 9 + 8
+    queue.check_deque_instead_of_list()
+    assert "Consider using a collections.deque" in queue.message_handler.messages[0]
+    assert (
+        queue.estimate_savings([("check_deque_instead_of_list", "")])[
+            "check_deque_instead_of_list"
+        ].operations
+        == 227 - 24
+    )
+
+    # Removing from the end shifts nothing
+    stack = ObservableList(range(10))
+    stack.pop()
+    del stack[-1]
+    stack.check_deque_instead_of_list()
+    assert (stack.front_removed, stack.shifted) == (0, 0)
+    assert stack.message_handler_ is None
+
+
+def test_check_bisect_instead_of_sort():
+    scores = ObservableList([5, 1, 3])
+    scores.sort()
+    for score in range(10, 110):
+        scores.append(score % 7)
+        scores.sort()
+        4 in scores
+    assert (scores.sorts, scores.resorts, scores.sorted_lookups) == (101, 100, 100)
+    scores.check_bisect_instead_of_sort()
+    assert "bisect.insort" in scores.message_handler.messages[0]
+    assert scores.saving_bisect_instead_of_sort().operations == scores.bisect_saved > 0
+
+    # Sorted once, then only read
+    ranking = ObservableList(range(100, 0, -1))
+    ranking.sort()
+    assert 50 in ranking
+    ranking.check_bisect_instead_of_sort()
+    assert ranking.message_handler_ is None
+
+    # Ordered by a key, lookups of elements can't use bisect
+    words = ObservableList(["bb", "a", "ccc"])
+    words.sort(key=len)
+    assert "a" in words
+    assert (words.sorted_, words.sorted_lookups, words.bisect_saved) == (False, 0, 0)
+
+
+def test_check_heapq_instead_of_list():
+    tasks = ObservableList([4.0, 2.0, 8.0])
+    for task in range(50):
+        smallest = min(tasks)
+        tasks.remove(smallest)
+        tasks.append(smallest + task)
+    # The first min() doesn't follow a change
+    assert (tasks.rescans, tasks.rescanned) == (49, 147)
+    tasks.check_heapq_instead_of_list()
+    assert "heapq.heappush" in tasks.message_handler.messages[0]
+
+    # Iterating over a list that doesn't change is a single scan
+    constants = ObservableList([1, 2, 3])
+    constants.append(4)
+    for _ in range(10):
+        max(constants)
+    assert constants.rescans == 1
+    assert [check for check, _ in constants.evaluate()][0] != (
+        "check_heapq_instead_of_list"
+    )
+
+    # Building (or refilling) a list and then iterating over it is not a rescan
+    batches = ObservableList([])
+    for batch in range(20):
+        batches.extend(range(batch * 10, batch * 10 + 10))
+        for _ in batches:
+            pass
+        del batches[:5]
+    assert batches.rescans == 0
+    batches.check_heapq_instead_of_list()
+    assert batches.message_handler_ is None
+
+
+def test_list_imul_tracks_the_changed_elements():
+    items = ObservableList([3, 1, 2])
+    items.sort()
+    items.append(0)
+    items *= 1
+    assert (items.added_since_sort, items.sorted_) == (1, False)
+    items *= 0
+    assert items == [] and items.added_since_sort == 0
+    items *= 3
+    assert items.added_since_sort == 0 and items.kinds == [0] * 5
+
+
+def test_list_records_growth():
+    items = ObservableList([1, 2])
+    assert items.get_growth() is None
+    for item in range(10):
+        items.append(item)
+    items.extend([1, 2, 3])
+    items.insert(5, 0)
+    assert items.get_growth() == Growth(size=16, peak=16, operations=12)
+
+    # The peak length stays when the list shrinks
+    items.pop()
+    del items[-5:]
+    assert items.get_growth() == Growth(size=10, peak=16, operations=12)
+    # Removals from the front make it a queue
+    del items[:1]
+    assert items.get_growth().queued
+
+    arr = ObservableNumpyArray(numpy.arange(5), rebuilt_=True)
+    assert arr.get_growth() == Growth(size=5, peak=5, operations=1, rebuilt=True)
+    assert ObservableNumpyArray(numpy.arange(5)).get_growth() is None
+
+
+def test_dict_schema():
+    record = ObservableDict({"id": 1, "name": "a"})
+    assert record.get_schema().keys == ("id", "name")
+    assert not record.get_schema().mutated
+    record["name"] = "b"
+    assert record.get_schema().mutated
+    assert ObservableDict({1: 2}).get_schema() is None
+    assert ObservableList([1]).get_schema() is None
+
+
+def test_list_pickle_round_trip():
+    items = ObservableList([1, 2.5])
+    items.append("a")
+    items.count(1)
+    copy = pickle.loads(pickle.dumps(items))
+    assert type(copy) is ObservableList and copy == [1, 2.5, "a"]
+    assert (copy.appended, copy.count_, copy.kinds) == (1, 1, items.kinds)
+    # Pickling is not a scan of the list
+    assert items.rescans == 0
+
+
+PickledPoint = namedtuple("PickledPoint", ["x", "y"])
+
+
+@pytest.mark.parametrize(
+    "make, data",
+    [
+        (lambda: ObservableList([1, 2]), lambda obs: list(obs)),
+        (lambda: ObservableSet({1, 2}), lambda obs: set(obs)),
+        (lambda: ObservableTuple((1, 2)), lambda obs: tuple(obs)),
+        (lambda: ObservableDict({"a": 1}), lambda obs: dict(obs)),
+        (
+            lambda: ObservableNumpyArray(numpy.arange(3)),
+            lambda obs: obs.arr__.tolist(),
+        ),
+        (
+            lambda: ObservablePandasDataFrame(pd.DataFrame({"A": [1, 2]})),
+            lambda obs: obs.df__.to_dict(),
+        ),
+        (
+            lambda: ObservableNamedTuple(PickledPoint(1, 2)),
+            lambda obs: obs.namedtuple__,
+        ),
+    ],
+)
+def test_pickle_round_trip(make, data):
+    observable = make()
+    copy = pickle.loads(pickle.dumps(observable))
+    assert type(copy) is type(observable)
+    assert data(copy) == data(observable)
+    assert copy.site_id_ == observable.site_id_
+
+
+def test_dict_pickle_keeps_counters():
+    mapping = ObservableDict({"a": 1})
+    mapping["b"] = 2
+    mapping.pop("a")
+    copy = pickle.loads(pickle.dumps(mapping))
+    assert copy == {"b": 2}
+    assert (copy.setitem_, copy.pop_) == (1, 1)
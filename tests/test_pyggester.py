@@ -4,6 +4,7 @@ import pathlib
 from unittest.mock import patch
 from pyggester.pyggester import (
     PyggesterDynamic,
+    transform_file,
 )
 
 
@@ -47,3 +48,55 @@ def test_directory_transformation(temp_dir, temp_file):
         pyggester.run()
         transformed_dir = temp_dir.parent / f"{temp_dir.name}_transformed"
         assert transformed_dir.exists() and transformed_dir.is_dir()
+
+
+def _transform_directory(directory, jobs_):
+    with patch("builtins.input", return_value="main.py"):
+        PyggesterDynamic(str(directory), jobs_=jobs_).run()
+    transformed_dir = directory.parent / f"{directory.name}_transformed"
+    return {
+        path.relative_to(transformed_dir): path.read_bytes()
+        for path in transformed_dir.rglob("*")
+        if path.is_file()
+    }
+
+
+def test_parallel_directory_transformation_matches_serial(temp_dir):
+    for name in ("serial", "parallel"):
+        project = temp_dir / name
+        (project / "pkg").mkdir(parents=True)
+        (project / "main.py").write_text("from pkg import mod\nitems = [1, 2]\n")
+        (project / "pkg" / "__init__.py").write_text("")
+        (project / "pkg" / "mod.py").write_text("values = {'a': 1}\n")
+        (project / "pkg" / "data.txt").write_text("not python")
+
+    serial = _transform_directory(temp_dir / "serial", jobs_=1)
+    parallel = _transform_directory(temp_dir / "parallel", jobs_=2)
+
+    assert serial.keys() == parallel.keys()
+    assert pathlib.Path("pkg", "data.txt") in serial
+    assert serial == parallel
+
+
+def test_transform_file_profile(temp_dir, temp_file):
+    transformed_file = temp_dir / "transformed.py"
+    cache_dir = temp_dir / ".cache"
+
+    profile = transform_file(temp_file, transformed_file, True, cache_dir=cache_dir)
+    assert profile.file_path == temp_file and not profile.cached
+    assert profile.parse > 0 and profile.transform > 0 and profile.emit > 0
+    assert profile.total == pytest.approx(
+        profile.read + profile.parse + profile.transform + profile.emit + profile.write
+    )
+
+    cached_profile = transform_file(temp_file, transformed_file, True, cache_dir)
+    assert cached_profile.cached
+    assert cached_profile.parse == cached_profile.transform == cached_profile.emit == 0
+
+
+def test_directory_transformation_profile(temp_dir, temp_file, capsys):
+    with patch("builtins.input", return_value="test_file.py"):
+        PyggesterDynamic(str(temp_dir), profile_=True).run()
+    output = capsys.readouterr().out
+    assert "Transformation profile" in output
+    assert "transform" in output and "emit" in output
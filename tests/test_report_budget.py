@@ -0,0 +1,30 @@
+import time
+import pytest
+from pyggester.report_budget import BudgetTracker, ReportBudget, get_rss, parse_budget
+
+
+def test_parse_budget():
+    assert parse_budget("") == ReportBudget()
+    assert parse_budget("5s,512MB") == ReportBudget(5.0, 512 * 1024**2)
+    assert parse_budget("250ms") == ReportBudget(0.25, None)
+    assert parse_budget("2m, 1GB") == ReportBudget(120.0, 1024**3)
+    assert str(parse_budget("5s,512MB")) == "5s, 512MB"
+    with pytest.raises(ValueError):
+        parse_budget("soon")
+
+
+def test_tracker_runs_out_of_time():
+    tracker = BudgetTracker(ReportBudget(seconds=0.05))
+    assert not tracker.exhausted()
+    time.sleep(0.06)
+    assert tracker.exhausted() and tracker.reason == "time"
+
+
+def test_tracker_runs_out_of_memory():
+    if get_rss() is None:
+        pytest.skip("no /proc on this platform")
+    tracker = BudgetTracker(ReportBudget(memory=1 << 20))
+    assert not tracker.exhausted()
+    allocated = bytearray(8 << 20)
+    assert tracker.exhausted() and tracker.reason == "memory"
+    del allocated
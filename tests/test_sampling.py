@@ -0,0 +1,141 @@
+import gc
+import random
+from unittest.mock import patch
+import pytest
+from pyggester.observable_collector import ObservableCollector
+from pyggester.observables import ObservableList, ObservableNumpyArray, ObservableTuple
+from pyggester.sampling import (
+    ContentSampler,
+    Sampler,
+    SamplingPolicy,
+    parse_policy,
+    reservoir_sample,
+    wilson_interval,
+)
+from pyggester.sites import register_sites
+
+
+@pytest.fixture
+def sampler():
+    sampler = Sampler()
+    with patch("pyggester.observables.SAMPLER", sampler), patch(
+        "pyggester.observable_collector.SAMPLER", sampler
+    ):
+        yield sampler
+
+
+def test_parse_policy():
+    assert parse_policy("") == SamplingPolicy()
+    assert parse_policy("every=10, max=5") == SamplingPolicy(every=10, max_instances=5)
+    assert parse_policy("fraction=0.25").fraction == 0.25
+    for spec in ("every=0", "fraction=2", "max=x", "often=3"):
+        with pytest.raises(ValueError):
+            parse_policy(spec)
+
+
+def test_every_nth_and_max_per_site():
+    site_id = register_sites("module.py", ((1, 0, "<module>"),))
+    sampler = Sampler("every=3,max=2")
+    decisions = [sampler.sample(site_id) for _ in range(10)]
+    assert decisions == [True, False, False, True] + [False] * 6
+    assert sampler.get_allocations(site_id) == 10
+
+
+def test_random_fraction_is_deterministic():
+    site_id = register_sites("module.py", ((1, 0, "<module>"),))
+    sampler_a, sampler_b = Sampler("fraction=0.1"), Sampler("fraction=0.1")
+    decisions = [sampler_a.sample(site_id) for _ in range(10000)]
+    assert decisions == [sampler_b.sample(site_id) for _ in range(10000)]
+    assert 800 < sum(decisions) < 1200
+
+
+def test_per_site_policies():
+    default_site = register_sites(
+        "/app/main.py", ((1, 0, "<module>"), (42, 0, "handler"))
+    )
+    hot_site = default_site + 1
+    sampler = Sampler("every=2;max=1@*/main.py:42")
+    assert sampler.get_policy(default_site) == SamplingPolicy(every=2)
+    assert sampler.get_policy(hot_site) == SamplingPolicy(max_instances=1)
+
+
+def test_unsampled_allocations_are_plain_objects(sampler):
+    sampler.configure("every=2")
+    site_id = register_sites("module.py", ((1, 0, "<module>"), (2, 0, "<module>")))
+    items = [1, 2]
+    observed = ObservableList(items, site_id_=site_id)
+    unobserved = ObservableList(items, site_id_=site_id)
+    assert type(observed) is ObservableList
+    assert unobserved is items
+
+    assert type(ObservableTuple((1, 2), site_id_=site_id + 1)) is ObservableTuple
+    assert type(ObservableTuple((1, 2), site_id_=site_id + 1)) is tuple
+    assert (
+        type(ObservableNumpyArray(None, site_id_=site_id + 1)) is ObservableNumpyArray
+    )
+    assert ObservableNumpyArray(None, site_id_=site_id + 1) is None
+
+
+def test_sampled_report_is_extrapolated(sampler, capsys):
+    sampler.configure("every=10")
+    site_id = register_sites("module.py", ((1, 0, "<module>"),))
+    collector = ObservableCollector()
+    with patch("pyggester.observables.OBSERVABLE_COLLECTOR", collector):
+        for _ in range(1000):
+            collector.append(ObservableList([1, 2, 3], site_id_=site_id))
+        gc.collect()
+        collector.run()
+
+    output = " ".join(capsys.readouterr().out.split())
+    assert "100 of 1000 instance(s) sampled" in output
+    assert "~1000 of 1000 estimated" in output
+
+
+def test_wilson_interval():
+    low, high = wilson_interval(50, 100)
+    assert low < 0.5 < high
+    assert wilson_interval(0, 0) == (0.0, 1.0)
+    assert wilson_interval(10, 10)[1] == 1.0
+
+
+def test_content_sampler_keeps_small_containers_exact():
+    items = list(range(100))
+    sample = ContentSampler(threshold=100, size=10).sample(items, len(items))
+    assert sample.items is items
+    assert not sample.sampled
+    assert sample.mark("Use a set") == "Use a set [exact]"
+
+
+def test_content_sampler_samples_large_containers():
+    sampler = ContentSampler(threshold=100, size=10)
+    items = list(range(1000))
+    sample = sampler.sample(items, len(items), seed=3)
+    assert sample.sampled and sample.size == 1000
+    assert len(set(sample.items)) == 10
+    assert sample.items == sorted(sample.items)
+    assert sampler.sample(items, len(items), seed=3) == sample
+    assert sample.mark("Use a set") == "Use a set [sampled: 10 of 1000 elements]"
+
+    values = {key: key for key in range(1000)}.values()
+    sample = sampler.sample(values, len(values), seed=3)
+    assert len(set(sample.items)) == 10 and set(sample.items) <= set(values)
+
+
+def test_content_sampler_configure():
+    sampler = ContentSampler()
+    sampler.configure("threshold=5, size=2")
+    assert (sampler.threshold, sampler.size) == (5, 2)
+    for spec in ("size=0", "threshold=-1", "limit=3"):
+        with pytest.raises(ValueError):
+            sampler.configure(spec)
+
+
+def test_reservoir_sample_is_uniform():
+    random_ = random.Random(0)
+    counts = [0] * 100
+    for _ in range(2000):
+        for item in reservoir_sample(iter(range(100)), 10, random_):
+            counts[item] += 1
+    # Each element is expected 200 times
+    assert min(counts) > 130 and max(counts) < 270
+    assert reservoir_sample(range(3), 10, random_) == [0, 1, 2]
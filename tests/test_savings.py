@@ -0,0 +1,37 @@
+import sys
+from pyggester.sampling import ContentSample
+from pyggester.savings import Saving, format_size, get_deep_size, get_footprint
+
+
+def test_saving_arithmetic_and_format():
+    saving = Saving(1536, 10).merge(Saving(512, 30))
+    assert saving == Saving(2048, 40)
+    assert saving.scale(0.5) == Saving(1024, 20)
+    assert str(saving) == "~2.0KB of memory, ~40 operations"
+    assert str(Saving(-300, 5)) == "~5 operations, at the cost of ~300B of memory"
+    assert str(Saving()) == "none"
+    assert format_size(3 * 1024**3) == "3.0GB"
+
+
+def test_deep_size_counts_shared_objects_once():
+    shared = "x" * 100
+    nested = [[shared, shared], (shared,)]
+    assert get_deep_size(nested) == (
+        sys.getsizeof(nested)
+        + sys.getsizeof(nested[0])
+        + sys.getsizeof(nested[1])
+        + sys.getsizeof(shared)
+    )
+    assert get_deep_size({"key": [1.5]}) == (
+        sys.getsizeof({"key": [1.5]})
+        + sys.getsizeof("key")
+        + sys.getsizeof([1.5])
+        + sys.getsizeof(1.5)
+    )
+
+
+def test_footprint_extrapolates_samples():
+    container = [float(i) for i in range(100)]
+    exact = get_footprint(container, ContentSample(container, 100))
+    assert exact == sys.getsizeof(container) + 100 * sys.getsizeof(1.0)
+    assert get_footprint(container, ContentSample(container[:10], 100)) == exact
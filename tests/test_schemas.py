@@ -0,0 +1,58 @@
+import sys
+from pyggester.schemas import (
+    MAX_SCHEMAS,
+    MIN_RECORDS,
+    Schema,
+    SchemaSummary,
+    get_record_size,
+    get_schema,
+)
+
+
+def test_get_schema():
+    record = {"id": 1, "name": "a", "score": 0.5}
+    schema = get_schema(record)
+    assert schema.keys == ("id", "name", "score")
+    assert schema.saved == sys.getsizeof(record) - get_record_size(3) > 0
+    assert not schema.mutated
+    assert get_schema(record, mutated=True).mutated
+
+    # Keys that can't be attribute names
+    assert get_schema({1: "a"}) is None
+    assert get_schema({"first name": "a"}) is None
+    assert get_schema({"class": "a"}) is None
+    assert get_schema({}) is None
+    assert get_schema({f"k{i}": i for i in range(100)}) is None
+
+
+def test_stable_schema_suggests_record_type():
+    summary = SchemaSummary()
+    for _ in range(MIN_RECORDS):
+        summary.add(Schema(("id", "name"), 100, False))
+    # Same key set, other order
+    summary.add(Schema(("name", "id"), 100, False))
+    message, instances, saving = summary.check_records(MIN_RECORDS + 1)
+    assert "same 2 keys (id, name)" in message and "NamedTuple" in message
+    assert instances == MIN_RECORDS + 1
+    assert saving.nbytes == 100 * (MIN_RECORDS + 1)
+
+    summary.add(Schema(("id", "name"), 100, True))
+    message, _, _ = summary.check_records(MIN_RECORDS + 2)
+    assert "dataclass(slots=True)" in message and "NamedTuple" not in message
+
+    # Too few of the instances share the schema
+    assert summary.check_records(10 * MIN_RECORDS) is None
+
+
+def test_few_or_varied_dicts_get_no_record_type():
+    summary = SchemaSummary()
+    for index in range(MIN_RECORDS - 1):
+        summary.add(Schema(("id",), 100, False))
+    assert summary.check_records(MIN_RECORDS - 1) is None
+
+    varied = SchemaSummary()
+    for index in range(MAX_SCHEMAS + 2):
+        varied.add(Schema((f"key{index}",), 100, False))
+    assert len(varied.schemas) == MAX_SCHEMAS
+    assert varied.dropped == 2
+    assert varied.check_records(MAX_SCHEMAS + 2) is None
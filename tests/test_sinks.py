@@ -0,0 +1,103 @@
+import io
+import json
+import threading
+import pytest
+from rich.console import Console
+from pyggester.sinks import (
+    FileSink,
+    JsonLinesSink,
+    PlainTextSink,
+    Report,
+    ReportWriter,
+    RichSink,
+    Sink,
+    parse_sinks,
+)
+
+
+class RecordingSink(Sink):
+    __slots__ = ("batches", "thread")
+
+    def __init__(self):
+        self.batches = []
+        self.thread = None
+
+    def write(self, reports):
+        self.thread = threading.current_thread()
+        self.batches.append(list(reports))
+
+
+def test_parse_sinks(tmp_path):
+    assert [type(sink) for sink in parse_sinks("")] == [RichSink]
+    sinks = parse_sinks(f"rich, text, jsonl:{tmp_path / 'report.jsonl'}")
+    assert [type(sink) for sink in sinks] == [RichSink, PlainTextSink, JsonLinesSink]
+    assert sinks[1].path is None
+    with pytest.raises(ValueError):
+        parse_sinks("jsonl")
+    with pytest.raises(ValueError):
+        parse_sinks("html:report.html")
+
+
+def test_writer_writes_batches_on_a_background_thread():
+    sink = RecordingSink()
+    writer = ReportWriter([sink])
+    reports = [Report(f"report {i}", {"index": i}) for i in range(3000)]
+    for report in reports:
+        writer.emit(report)
+    writer.flush()
+    assert sink.thread is not threading.current_thread()
+    assert [report for batch in sink.batches for report in batch] == reports
+    assert all(len(batch) <= ReportWriter.BATCH_SIZE for batch in sink.batches)
+
+
+def test_broken_sink_does_not_stop_the_writer(capsys):
+    class BrokenSink(Sink):
+        __slots__ = ()
+
+        def write(self, reports):
+            raise OSError("disk full")
+
+    sink = RecordingSink()
+    writer = ReportWriter([BrokenSink(), sink])
+    writer.emit(Report("first", {}))
+    writer.flush()
+    assert "disk full" in capsys.readouterr().err
+    writer.sinks = [sink]
+    writer.emit(Report("second", {}))
+    writer.flush()
+    assert sink.batches == [[Report("second", {})]]
+
+
+def test_file_sinks(tmp_path):
+    jsonl, text = tmp_path / "report.jsonl", tmp_path / "report.txt"
+    writer = ReportWriter([JsonLinesSink(str(jsonl)), PlainTextSink(str(text))])
+    writer.emit(Report("1 | Suggestions(a.py):", {"type": "site", "line_nr": 1}))
+    writer.emit(Report("skipped", {"type": "budget"}, title="REPORT BUDGET"))
+    writer.close()
+    assert [json.loads(line) for line in jsonl.read_text().splitlines()] == [
+        {"type": "site", "line_nr": 1},
+        {"type": "budget"},
+    ]
+    assert text.read_text() == "1 | Suggestions(a.py):\n\n[REPORT BUDGET]\nskipped\n\n"
+
+
+def test_rich_sink_shares_one_console():
+    output = io.StringIO()
+    sink = RichSink(Console(file=output, width=60))
+    sink.write([Report("first report", {}), Report("second report", {}, title="T")])
+    assert output.getvalue().index("first report") < output.getvalue().index(
+        "second report"
+    )
+
+
+def test_incomplete_sinks_fail_when_created():
+    class NoWrite(Sink):
+        __slots__ = ()
+
+    class NoFormat(FileSink):
+        __slots__ = ()
+
+    with pytest.raises(TypeError):
+        NoWrite()
+    with pytest.raises(TypeError):
+        NoFormat()
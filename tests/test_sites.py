@@ -0,0 +1,39 @@
+from unittest.mock import patch
+from pyggester.observables import ObservableDict, ObservableList
+from pyggester.sites import get_caller_site_id, get_site, register_sites
+
+
+def test_register_sites_returns_base_of_consecutive_ids():
+    base = register_sites("module.py", ((1, 0, "<module>"), (2, 4, "function")))
+    assert get_site(base).line_nr == 1
+    assert get_site(base + 1).function == "function"
+    assert register_sites("other.py", ((1, 0, "<module>"),)) == base + 2
+
+
+def test_caller_site_is_registered_once_per_line():
+    site_ids = set()
+    for _ in range(3):
+        site_ids.add(get_caller_site_id(depth=1))
+    (site_id,) = site_ids
+    assert get_site(site_id).file_path == __file__
+    assert get_site(site_id).function.endswith(
+        "test_caller_site_is_registered_once_per_line"
+    )
+
+
+def test_observable_with_site_id_does_not_inspect_frames():
+    site_id = register_sites("module.py", ((7, 3, "<module>"),))
+    with patch("pyggester.observables.get_caller_site_id") as mock_caller_site:
+        obs_list = ObservableList([1, 2], site_id_=site_id)
+    mock_caller_site.assert_not_called()
+    assert obs_list.site_id_ == site_id
+    assert obs_list.message_handler_ is None
+    assert obs_list.message_handler.line_nr == 7
+    assert obs_list.message_handler.file_path == "module.py"
+
+
+def test_observable_without_site_id_uses_its_caller():
+    obs_dict = ObservableDict({"a": 1})
+    site = get_site(obs_dict.site_id_)
+    assert site.file_path == __file__
+    assert obs_dict.message_handler.line_nr == site.line_nr
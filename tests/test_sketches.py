@@ -0,0 +1,38 @@
+import numpy
+import pytest
+from pyggester.sketches import KMinValues, hash_array
+
+
+def test_kmv_is_exact_below_k():
+    sketch = KMinValues(k=128)
+    for i in list(range(100)) * 3:
+        sketch.add(i)
+    assert sketch.estimate() == 100
+
+
+@pytest.mark.parametrize("distinct", [1000, 50000])
+def test_kmv_estimate_with_bounded_memory(distinct):
+    sketch = KMinValues(k=512)
+    for i in range(distinct):
+        sketch.add(i)
+        sketch.add(str(i % 100))
+    assert len(sketch.heap) == len(sketch.members) == 512
+    assert sketch.estimate() == pytest.approx(distinct + 100, rel=0.15)
+
+
+def test_hash_array_matches_equal_elements():
+    hashes = hash_array(numpy.array(["dog", "cat", "dog", "bird"]))
+    assert hashes[0] == hashes[2] and len(set(hashes.tolist())) == 3
+    hashes = hash_array(numpy.array([0.0, -0.0, 1.0], dtype=numpy.float32))
+    assert hashes[0] == hashes[1] != hashes[2]
+
+
+def test_kmv_add_hashes_matches_add_hash():
+    hashes = hash_array(numpy.arange(5000) % 3000)
+    batched, single = KMinValues(k=128), KMinValues(k=128)
+    for chunk in numpy.array_split(hashes, 7):
+        batched.add_hashes(chunk)
+    for value in hashes.tolist():
+        single.add_hash(value)
+    assert sorted(batched.members) == sorted(single.members)
+    assert not batched.exact
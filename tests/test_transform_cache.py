@@ -0,0 +1,64 @@
+import pathlib
+import tempfile
+from unittest.mock import patch
+import pytest
+from pyggester.pyggester import transform_file
+from pyggester.transform_cache import TransformCache, get_cache_salt
+
+
+@pytest.fixture
+def temp_dir():
+    with tempfile.TemporaryDirectory() as tmpdirname:
+        yield pathlib.Path(tmpdirname)
+
+
+def test_key_depends_on_content_and_run_observable(temp_dir):
+    cache = TransformCache(temp_dir)
+    key = cache.key("x = [1]", run_observable=False)
+
+    assert key == cache.key("x = [1]", run_observable=False)
+    assert key != cache.key("x = [2]", run_observable=False)
+    assert key != cache.key("x = [1]", run_observable=True)
+
+
+def test_salt_depends_on_the_transformations():
+    salt = get_cache_salt.__wrapped__()
+    with patch(
+        "pyggester.transform_cache.get_transformer_hash", return_value="changed"
+    ):
+        assert get_cache_salt.__wrapped__() != salt
+
+
+def test_put_and_restore(temp_dir):
+    cache = TransformCache(temp_dir / "cache")
+    key = cache.key("x = [1]", run_observable=False)
+    destination = temp_dir / "x_transformed.py"
+
+    assert cache.get(key) is None
+    assert not cache.restore(key, destination)
+
+    cache.put(key, "transformed")
+    assert cache.get(key) is not None
+    assert cache.restore(key, destination)
+    assert destination.read_text() == "transformed"
+
+
+def test_unchanged_file_is_not_transformed_again(temp_dir):
+    source = temp_dir / "app.py"
+    source.write_text("items = [1, 2, 3]\n")
+    destination = temp_dir / "app_transformed.py"
+    cache_dir = temp_dir / "cache"
+
+    transform_file(source, destination, run_observable=True, cache_dir=cache_dir)
+    transformed_code = destination.read_text()
+    destination.unlink()
+
+    with patch("pyggester.pyggester.transform_tree") as mock_transform:
+        transform_file(source, destination, run_observable=True, cache_dir=cache_dir)
+
+    mock_transform.assert_not_called()
+    assert destination.read_text() == transformed_code
+
+    source.write_text("items = [1, 2, 3, 4]\n")
+    transform_file(source, destination, run_observable=True, cache_dir=cache_dir)
+    assert "4" in destination.read_text()
@@ -0,0 +1,41 @@
+import pytest
+from pyggester.verify import Trial, Verification, Verifier
+
+
+def test_configure_verifier():
+    verifier = Verifier()
+    verifier.configure("")
+    assert not verifier.enabled
+    verifier.configure("1")
+    assert (verifier.enabled, verifier.size, verifier.repeat) == (True, 10_000, 3)
+    verifier.configure("size=500,repeat=1")
+    assert (verifier.enabled, verifier.size, verifier.repeat) == (True, 500, 1)
+    with pytest.raises(ValueError):
+        verifier.configure("size=0")
+
+
+def test_verify_measures_time_and_memory():
+    data = list(range(10_000))
+
+    def replay(structure):
+        for probe in (2500, 5000, 7500):
+            probe in structure
+
+    verification = Verifier(enabled=True, repeat=1).verify(
+        Trial(
+            data,
+            original=lambda items: items,
+            suggested=set,
+            replay=replay,
+            elements=10_000,
+        )
+    )
+    assert verification.elements == 10_000
+    assert verification.speedup > 1
+    # Both hold the same int objects, the hash table of a set is larger than a list
+    assert verification.memory_delta < 0
+
+
+def test_verification_format():
+    verification = Verification(100, 0.002, 0.001, -2048)
+    assert str(verification) == "2.00x the speed, 2.0KB more memory (on 100 elements)"
@@ -9,7 +9,11 @@ from pyggester.wrappers import (
     ObservableNamedTupleWrapper,
     ObservableNumpyArrayWrapper,  # noqa: F401
     ObservablePandasDataFrameWrapper,  # noqa: F401
+    WrapperCollector,
+    get_wrappers_as_strings,
 )
+from pyggester import wrappers
+from pyggester.helpers import source_code_to_str
 
 from pyggester.observables import (
     ObservableDict,  # noqa: F401
@@ -142,6 +146,26 @@ nested_arr_numpy_wrapper = ObservableNumpyArray(nested_arr)
     assert transformed_code.strip() == expected_result.strip()
 
 
+def test_wrap_rebuilt_numpy_array():
+    code = """
+import numpy as np
+arr = np.append(arr, 1)
+parts = np.concatenate((parts, chunk))
+other = np.append(arr, 1)
+    """
+    expected_result = """
+import numpy as np
+arr = np.append(arr, 1)
+arr_numpy_wrapper = ObservableNumpyArray(arr, rebuilt_=True)
+parts = np.concatenate((parts, chunk))
+parts_numpy_wrapper = ObservableNumpyArray(parts, rebuilt_=True)
+other = np.append(arr, 1)
+other_numpy_wrapper = ObservableNumpyArray(other)
+    """
+    transformed_code = transform_code_numpy_array(code)
+    assert transformed_code.strip() == expected_result.strip()
+
+
 def transform_code_numpy_array(code):
     tree = ast.parse(code)
     transformer = ObservableNumpyArrayWrapper(tree)
@@ -184,3 +208,10 @@ def transform_code_pandas_data_frame(code):
     transformed_tree = transformer.visit(tree)
     transformed_code = ast.unparse(transformed_tree)
     return transformed_code
+
+
+def test_wrappers_registry_matches_wrapper_classes():
+    collector = WrapperCollector()
+    collector.visit(ast.parse(source_code_to_str(path=wrappers.__file__)))
+    assert get_wrappers_as_strings() == collector.observables
+    assert get_wrappers_as_strings() is get_wrappers_as_strings()